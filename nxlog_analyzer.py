@@ -16,8 +16,34 @@ import os
 import sys
 import re
 import argparse
+import bisect
+import cProfile
 import json
-from collections import defaultdict, OrderedDict
+import io
+import math
+import multiprocessing
+import contextlib
+import fnmatch
+import glob
+import hashlib
+import mmap
+import pickle
+import platform
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from array import array
+from collections import Counter, defaultdict, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape as xml_escape
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    # Python < 3.11
+    import sre_parse
 
 # Import optionnel de tabulate pour un meilleur affichage
 try:
@@ -26,11 +52,26 @@ try:
 except ImportError:
     TABULATE_AVAILABLE = False
 
+# Import optionnel de resource pour la mémoire maximale (absent sous Windows)
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Import optionnel d'inotify_simple pour le mode --watch (sinon scrutation des dates de modification)
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
 # Import optionnel d'openpyxl pour Excel
 try:
     import openpyxl
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, PatternFill, Alignment
-    from openpyxl.utils.dataframe import dataframe_to_rows
+    from openpyxl.utils import get_column_letter
     OPENPYXL_AVAILABLE = True
 except ImportError:
     OPENPYXL_AVAILABLE = False
@@ -219,148 +260,992 @@ def simple_table_format(data, headers):
     result.append(separator)
     return "\n".join(result)
 
-def parse_nxlog_config(file_path):
+# Version du format des résultats de parsing: à incrémenter à chaque modification
+# du parser pour invalider les entrées du cache sur disque
+PARSE_CACHE_VERSION = 6
+
+# Taille maximale par défaut du cache de parsing (en Mo)
+DEFAULT_CACHE_MAX_SIZE = 512
+
+# Taille indicative (en octets) des lots de lignes lus par le tokenizer
+STREAM_CHUNK_SIZE = 1 << 20
+
+# Expressions régulières précompilées du tokenizer en flux
+SECTION_OPEN_RE = re.compile(r'<(\w+)\s+([^>]+)>', re.IGNORECASE)
+SECTION_PARTIAL_RE = re.compile(r'<\w+(?:\s[^>]*)?\Z')
+ROUTE_OPEN_RE = re.compile(r'<(Route)\s+([^>]+)>', re.IGNORECASE)
+ROUTE_PARTIAL_RE = re.compile(r'<Route(?:\s[^>]*)?\Z', re.IGNORECASE)
+ROUTE_HINT_RE = re.compile(r'<Route', re.IGNORECASE)
+PARAM_RE = re.compile(r'(\w+)\s+(.+?)(?=\n\w+\s+|$)', re.DOTALL)
+PATH_RE = re.compile(r'Path\s+(.+?)(?=\n\w+\s+|$)', re.DOTALL)
+DIRECTIVE_RE = re.compile(r'^(include|include_dir|define|envvar)[ \t]+(.+)$', re.IGNORECASE | re.MULTILINE)
+DEFINE_RE = re.compile(r'(\w+)[ \t]*(.*)$')
+VARIABLE_RE = re.compile(r'%(\w+)%')
+MODULE_RE = re.compile(r'Module\s+(\w+)', re.IGNORECASE)
+PRIORITY_RE = re.compile(r'Priority\s+(\d+)', re.IGNORECASE)
+CONDITION_RE = re.compile(r'Condition\s+(.+?)(?=\n\w+\s+|$)', re.DOTALL | re.IGNORECASE)
+
+# Mode --mmap: lignes débarrassées des blancs ASCII (les autres cas sont décodés)
+MAPPED_LINE_RE = re.compile(rb'[ \t\x0b\x0c\r]*([^\n]*?)[ \t\x0b\x0c\r]*(?:\n|\Z)')
+MAPPED_MAX_OPEN = 32
+
+class StageTimings:
     """
-    Parse un fichier de configuration nxlog et extrait les paramètres
+    Chronométrage par étape (temps mural et CPU) et compteurs d'une exécution
+
+    Désactivé par défaut: les étapes instrumentées ne coûtent alors qu'un test
+    de l'attribut enabled. Les mesures faites dans les processus du pool sont
+    récupérées avec snapshot() puis fusionnées avec merge().
     """
-    config_data = []
-    flow_data = {
-        'routes': [],
-        'sections': {},
-        'flows': []
-    }
+
+    def __init__(self):
+        self.enabled = False
+        self.stages = OrderedDict()
+        self.counters = OrderedDict()
+
+    def add(self, name, wall, cpu, calls=1):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = [0, 0.0, 0.0]
+        stage[0] += calls
+        stage[1] += wall
+        stage[2] += cpu
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def wall(self, name):
+        stage = self.stages.get(name)
+        return (stage[1], stage[2]) if stage else (0.0, 0.0)
+
+    def snapshot(self):
+        return {
+            'stages': {name: {'calls': calls, 'wall_s': round(wall, 6), 'cpu_s': round(cpu, 6)}
+                       for name, (calls, wall, cpu) in self.stages.items()},
+            'counters': dict(self.counters)
+        }
+
+    def merge(self, snapshot):
+        for name, stage in snapshot['stages'].items():
+            self.add(name, stage['wall_s'], stage['cpu_s'], stage['calls'])
+        for name, value in snapshot['counters'].items():
+            self.count(name, value)
+
+    def reset(self):
+        self.stages.clear()
+        self.counters.clear()
+
+# Mesures de l'exécution courante (--timings / --profile)
+TIMINGS = StageTimings()
+
+def iter_config_chunks(stream, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Lit un flux par lots de lignes en supprimant les lignes vides et les commentaires
+
+    Chaque lot est une suite de lignes nettoyées jointes par des retours à la ligne.
+    """
+    while True:
+        with TIMINGS.stage('io'):
+            lines = stream.readlines(chunk_size)
+        if not lines:
+            return
+        kept = [line for line in (raw.strip() for raw in lines)
+                if line and not line.startswith('#') and not line.startswith('//')]
+        if kept:
+            yield '\n'.join(kept)
+
+class _BlockScanner:
+    """
+    Automate reconnaissant les blocs <Type nom> ... </Type> par lots de lignes.
+
+    Reproduit la sémantique de l'expression régulière DOTALL appliquée au texte
+    complet tout en ne conservant en mémoire que le bloc en cours. Si directive_re
+    est fourni, les directives situées hors des blocs sont également émises.
+    """
+
+    def __init__(self, kind, open_re, partial_re, directive_re=None):
+        self.kind = kind
+        self.open_re = open_re
+        self.partial_re = partial_re
+        self.directive_re = directive_re
+        self.close_res = {}
+        self.carry = ''
+        self.block = None
+        self.open_text = ''
+        self.pieces = []
+
+    def _close_re(self, block_type):
+        close_re = self.close_res.get(block_type)
+        if close_re is None:
+            close_re = re.compile('</' + re.escape(block_type) + '>', re.IGNORECASE)
+            self.close_res[block_type] = close_re
+        return close_re
+
+    def _directives(self, text, start, end):
+        if self.directive_re is None:
+            return []
+        return [('directive', directive.group(1), directive.group(2).strip(), None)
+                for directive in self.directive_re.finditer(text, start, end)]
+
+    def feed(self, text):
+        """
+        Consomme un lot de lignes et retourne les événements (genre, type, nom, contenu) terminés
+        """
+        events = []
+        if self.block is None and self.carry:
+            text = self.carry + '\n' + text
+            self.carry = ''
+        pos = 0
+        
+        while True:
+            if self.block is None:
+                match = self.open_re.search(text, pos)
+                if not match:
+                    # Balise ouvrante potentiellement coupée en fin de lot
+                    partial = self.partial_re.search(text, pos)
+                    end = partial.start() if partial else len(text)
+                    events.extend(self._directives(text, pos, end))
+                    self.carry = text[end:]
+                    return events
+                events.extend(self._directives(text, pos, match.start()))
+                block_type = match.group(1)
+                self.block = (block_type, match.group(2).strip(), self._close_re(block_type))
+                self.open_text = match.group(0)
+                self.pieces = []
+                pos = match.end()
+            
+            close_match = self.block[2].search(text, pos)
+            if not close_match:
+                self.pieces.append(text[pos:])
+                return events
+            
+            self.pieces.append(text[pos:close_match.start()])
+            events.append((self.kind, self.block[0], self.block[1], '\n'.join(self.pieces).strip()))
+            self.block = None
+            self.pieces = []
+            pos = close_match.end()
+
+    def finish(self):
+        """
+        Termine le flux; un bloc jamais fermé est réanalysé après son '<'
+        comme le faisait la recherche par expression régulière
+        """
+        if self.block is None:
+            return []
+        raw = self.open_text + '\n'.join(self.pieces)
+        self.block = None
+        self.pieces = []
+        rescanner = _BlockScanner(self.kind, self.open_re, self.partial_re, self.directive_re)
+        events = []
+        for line in raw[1:].split('\n'):
+            events.extend(rescanner.feed(line))
+        events.extend(rescanner.finish())
+        return events
+
+class ConfigSpan:
+    """
+    Portion (offset, longueur) d'un fichier de configuration, décodée à la demande
+
+    text() relit la portion dans le fichier projeté en mémoire et applique le même
+    nettoyage que le tokenizer (lignes sans blancs, commentaires et lignes vides
+    retirés). La signature du fichier est vérifiée pour ne jamais décoder un fichier
+    modifié depuis l'analyse.
+    """
+    __slots__ = ('file_path', 'offset', 'length', 'signature')
+
+    def __init__(self, file_path, offset, length, signature):
+        self.file_path = file_path
+        self.offset = offset
+        self.length = length
+        self.signature = signature
+
+    def __getstate__(self):
+        return (self.file_path, self.offset, self.length, self.signature)
+
+    def __setstate__(self, state):
+        self.file_path, self.offset, self.length, self.signature = state
+
+    def text(self):
+        mapped = _mapped_file(self.file_path, self.signature)
+        raw = mapped[self.offset:self.offset + self.length].decode('utf-8', errors='ignore')
+        return clean_config_text(raw)
+
+# Fichiers projetés en mémoire (LRU) pour le décodage des ConfigSpan
+_MAPPED_FILES = OrderedDict()
+
+def _mapped_file(file_path, signature):
+    """
+    Retourne la projection mémoire d'un fichier en vérifiant qu'il n'a pas changé
+    """
+    entry = _MAPPED_FILES.get(file_path)
+    if entry is not None and entry[0] == signature:
+        _MAPPED_FILES.move_to_end(file_path)
+        return entry[1]
+    
+    if _file_signature(file_path) != signature:
+        raise ValueError(f"{file_path} a été modifié depuis son analyse, relancez l'analyse")
+    with open(file_path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _MAPPED_FILES[file_path] = (signature, mapped)
+    while len(_MAPPED_FILES) > MAPPED_MAX_OPEN:
+        _MAPPED_FILES.popitem(last=False)[1][1].close()
+    return mapped
+
+def clean_config_text(text):
+    """
+    Nettoie un texte comme iter_config_chunks (blancs, lignes vides et commentaires)
+    """
+    return '\n'.join(line for line in (raw.strip() for raw in text.split('\n'))
+                     if line and not line.startswith('#') and not line.startswith('//'))
+
+def _scan_mapped_config(mapped, file_path, signature):
+    """
+    Parcourt un fichier projeté en mémoire et retourne ses événements, ou None
+
+    Les sections sont retournées sous forme de ConfigSpan sans copier leur contenu.
+    Seules les lignes contenant '<' ou pouvant être une directive sont décodées.
+    None est retourné lorsque la mise en forme sort du cas simple (balise non seule
+    sur sa ligne, balise sur plusieurs lignes, route imbriquée, bloc non fermé,
+    retour chariot isolé): le fichier est alors analysé par le tokenizer standard.
+    """
+    events = []
+    block = None
+    body_start = 0
+    
+    for match in MAPPED_LINE_RE.finditer(mapped):
+        start, end = match.span(1)
+        if start == end:
+            if match.end() == len(mapped):
+                break
+            continue
+        
+        first = mapped[start]
+        if mapped.find(b'\r', start, end) != -1:
+            return None
+        has_tag = mapped.find(b'<', start, end) != -1
+        exotic = first >= 0x80 or 0x1c <= first <= 0x1f or mapped[end - 1] >= 0x80
+        
+        if block is None:
+            if not has_tag and not exotic and first not in b'iIdDeE':
+                continue
+        elif not has_tag:
+            continue
+        
+        line = mapped[start:end].decode('utf-8', errors='ignore').strip()
+        if not line or line.startswith('#') or line.startswith('//'):
+            continue
+        
+        if block is None:
+            open_match = SECTION_OPEN_RE.search(line)
+            if open_match is None:
+                if SECTION_PARTIAL_RE.search(line):
+                    return None
+                directive = DIRECTIVE_RE.match(line)
+                if directive:
+                    events.append(('directive', directive.group(1), directive.group(2).strip(), None))
+                continue
+            if open_match.start() != 0 or open_match.end() != len(line):
+                return None
+            block_type = open_match.group(1)
+            block = (block_type, open_match.group(2).strip(),
+                     re.compile('</' + re.escape(block_type) + '>', re.IGNORECASE))
+            body_start = match.end()
+            continue
+        
+        close_match = block[2].search(line)
+        if close_match is not None:
+            if close_match.start() != 0 or close_match.end() != len(line):
+                return None
+            span = ConfigSpan(file_path, body_start, match.start() - body_start, signature)
+            events.append(('section', block[0], block[1], span))
+            if block[0].lower() == 'route':
+                raw = mapped[body_start:match.start()].decode('utf-8', errors='ignore')
+                events.append(('route', block[0], block[1], clean_config_text(raw)))
+            block = None
+        elif block[0].lower() != 'route' and ROUTE_OPEN_RE.search(line):
+            return None
     
+    return events if block is None else None
+
+def tokenize_mapped_config(stream):
+    """
+    Variante de tokenize_nxlog_config qui projette le fichier en mémoire (mode --mmap)
+
+    Produit les mêmes événements, le contenu des sections étant un ConfigSpan.
+    Revient au tokenizer standard pour un fichier vide ou de mise en forme inhabituelle.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-    except Exception as e:
-        print(f"Erreur lors de la lecture du fichier {file_path}: {e}")
-        return config_data, flow_data
+        mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        yield from tokenize_nxlog_config(stream)
+        return
     
-    # Supprimer les commentaires (lignes commençant par # ou //)
-    lines = []
-    for line in content.split('\n'):
-        line = line.strip()
-        if line and not line.startswith('#') and not line.startswith('//'):
-            lines.append(line)
+    try:
+        stat = os.fstat(stream.fileno())
+        events = _scan_mapped_config(mapped, os.path.realpath(stream.name), (stat.st_mtime_ns, stat.st_size))
+    finally:
+        mapped.close()
+    
+    if events is None:
+        stream.seek(0)
+        yield from tokenize_nxlog_config(stream)
+        return
+    yield from events
+
+class SpanSection(dict):
+    """
+    Entrée de flow_data['sections'] dont 'content' et 'params' sont calculés à la demande
+
+    Seuls le type et le module sont conservés; le contenu provient d'un ConfigSpan
+    (ou d'une chaîne pour les fichiers inclus) et les constantes sont substituées
+    à chaque lecture si un MacroExpander est associé.
+    """
+    __slots__ = ('source', 'expander')
+
+    def __init__(self, section_type, source):
+        super().__init__(type=section_type)
+        self.source = source
+        self.expander = None
+
+    def raw_content(self):
+        return self.source.text() if isinstance(self.source, ConfigSpan) else self.source
+
+    def __missing__(self, key):
+        if key == 'content':
+            content = self.raw_content()
+            return self.expander.expand(content) if self.expander else content
+        if key == 'params':
+            expand = self.expander.expand if self.expander else str
+            return {name: expand(value) for name, value in iter_section_params(self.raw_content())}
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+class ConfigRows:
+    """
+    Lignes [type, nom, paramètre, valeur, description] stockées par colonnes
+
+    Chaque chaîne distincte est internée et rangée une seule fois dans la table de
+    l'instance; une ligne n'occupe que cinq indices dans des colonnes array('I').
+    S'itère et s'indexe comme l'ancienne liste de listes (chaque ligne lue est une
+    nouvelle liste). Après désérialisation (cache, pool), les chaînes sont internées
+    à nouveau et donc partagées entre les fichiers du processus.
+    """
+    __slots__ = ('strings', 'codes', 'columns')
+
+    def __init__(self, rows=()):
+        self.strings = []
+        self.codes = {}
+        self.columns = [array('I') for _ in range(5)]
+        for row in rows:
+            self.append(row)
+
+    def __getstate__(self):
+        return self.strings, self.columns
+
+    def __setstate__(self, state):
+        strings, self.columns = state
+        self.strings = [sys.intern(value) for value in strings]
+        self.codes = None
+
+    def _code(self, value):
+        if self.codes is None:
+            self.codes = {value: code for code, value in enumerate(self.strings)}
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(sys.intern(value))
+        return code
+
+    def append(self, row):
+        for column, value in zip(self.columns, row):
+            column.append(self._code(value))
+
+    def extend_section(self, section_type, section_name, params):
+        """
+        Ajoute les lignes (nom, valeur, description) d'une même section
+        """
+        code = self._code
+        type_code = code(section_type)
+        name_code = code(section_name)
+        types, names, param_names, values, descriptions = self.columns
+        for param_name, value, description in params:
+            types.append(type_code)
+            names.append(name_code)
+            param_names.append(code(param_name))
+            values.append(code(value))
+            descriptions.append(code(description))
+
+    def compact(self):
+        """
+        Libère l'index des chaînes une fois la construction terminée (reconstruit si besoin)
+        """
+        self.codes = None
+
+    def transform_values(self, function):
+        """
+        Remplace chaque valeur par function(valeur), calculée une fois par valeur distincte
+        """
+        mapping = {}
+        values = array('I')
+        for code in self.columns[3]:
+            new_code = mapping.get(code)
+            if new_code is None:
+                new_code = mapping[code] = self._code(function(self.strings[code]))
+            values.append(new_code)
+        self.columns[3] = values
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __iter__(self):
+        strings = self.strings
+        for section_type, section_name, param_name, value, description in zip(*self.columns):
+            yield [strings[section_type], strings[section_name], strings[param_name],
+                   strings[value], strings[description]]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        strings = self.strings
+        return [strings[column[index]] for column in self.columns]
+
+class SpanConfigRows:
+    """
+    Lignes [type, nom, paramètre, valeur, description] produites à la demande (mode --mmap)
+
+    S'itère comme la liste config_data: chaque section est décodée au moment où
+    ses lignes sont parcourues, puis libérée.
+    """
+    __slots__ = ('sections', 'expander', '_length')
+
+    def __init__(self):
+        self.sections = []
+        self.expander = None
+        self._length = None
+
+    def append_section(self, block_type, block_name, section):
+        self.sections.append((block_type, block_name, section))
+        self._length = None
+
+    def __iter__(self):
+        expand = self.expander.expand if self.expander else None
+        for block_type, block_name, section in self.sections:
+            for param_name, param_value in iter_section_params(section.raw_content()):
+                yield [
+                    block_type,
+                    block_name,
+                    param_name,
+                    expand(param_value) if expand else param_value,
+                    PARAMETER_DESCRIPTIONS.get(param_name, 'Paramètre non documenté')
+                ]
+
+    def __len__(self):
+        if self._length is None:
+            self._length = sum(len(PARAM_RE.findall(section.raw_content())) for _, _, section in self.sections)
+        return self._length
+
+    def __getitem__(self, index):
+        return list(self)[index]
+
+def iter_section_params(content):
+    """
+    Découpe le contenu d'une section en paramètres (nom, valeur)
+    """
+    for param_name, param_value in PARAM_RE.findall(content):
+        yield param_name, param_value.strip().strip('"\'')
+
+def tokenize_nxlog_config(stream):
+    """
+    Tokenizer à passe unique: émet les sections et les routes au fil de la lecture
+
+    Produit des tuples ('section', type, nom, contenu), ('route', type, nom, contenu)
+    et ('directive', mot-clé, valeur, None) pour les directives globales.
+    """
+    sections = _BlockScanner('section', SECTION_OPEN_RE, SECTION_PARTIAL_RE, DIRECTIVE_RE)
+    routes = _BlockScanner('route', ROUTE_OPEN_RE, ROUTE_PARTIAL_RE)
+    
+    for chunk in iter_config_chunks(stream):
+        yield from sections.feed(chunk)
+        
+        if routes.block is not None or routes.carry or ROUTE_HINT_RE.search(chunk):
+            yield from routes.feed(chunk)
     
-    content = '\n'.join(lines)
+    yield from sections.finish()
+    yield from routes.finish()
+
+def resolve_include_paths(directive, target, base_dir, globs=None):
+    """
+    Résout une directive include/include_dir en liste de fichiers (motifs glob acceptés)
+
+    Les motifs résolus par glob (include_dir compris) sont ajoutés à globs: un fichier
+    ajouté plus tard qui leur correspond change le résultat (voir _glob_signature).
+    """
+    target = os.path.expanduser(target.strip('"\''))
+    if not os.path.isabs(target):
+        target = os.path.join(base_dir, target)
     
-    # Pattern pour identifier les sections
-    section_pattern = r'<(\w+)\s+([^>]+)>\s*(.*?)\s*</\1>'
+    if directive.lower() == 'include_dir':
+        pattern = os.path.join(target, '*.conf')
+        if globs is not None:
+            globs.append(pattern)
+        if not os.path.isdir(target):
+            print(f"Avertissement: répertoire inclus introuvable: {target}")
+            return []
+    else:
+        pattern = target
     
-    # Trouver toutes les sections
-    sections = re.findall(section_pattern, content, re.DOTALL | re.IGNORECASE)
+    if any(char in pattern for char in '*?['):
+        if globs is not None and directive.lower() != 'include_dir':
+            globs.append(pattern)
+        return sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
     
-    for section_type, section_name, section_content in sections:
-        # Nettoyer le nom de section
-        section_name = section_name.strip()
+    if not os.path.isfile(pattern):
+        print(f"Avertissement: fichier inclus introuvable: {pattern}")
+        return []
+    return [pattern]
+
+def _file_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+def _glob_signature(pattern):
+    """
+    Signature d'un motif d'inclusion: date du répertoire et liste des fichiers correspondants
+    """
+    return (_file_signature(os.path.dirname(pattern)),
+            tuple(sorted(path for path in glob.glob(pattern) if os.path.isfile(path))))
+
+class MacroExpander:
+    """
+    Résolution des constantes define/envvar et substitution des références %NOM%.
+
+    Les valeurs sont résolues à la demande (références imbriquées comprises) puis
+    mémorisées; chaque valeur de paramètre est ensuite traitée en une seule passe
+    de l'expression régulière compilée, quel que soit le nombre de constantes.
+    """
+
+    def __init__(self, defines):
+        self.defines = defines
+        self.resolved = {}
+
+    def resolve(self, name, stack=()):
+        """
+        Retourne la valeur entièrement résolue d'une constante (None si inconnue ou circulaire)
+        """
+        if name in self.resolved:
+            return self.resolved[name]
+        if name not in self.defines:
+            return None
+        if name in stack:
+            print(f"Avertissement: définition circulaire ignorée: {' -> '.join(stack + (name,))}")
+            return None
         
-        # Stocker les informations de section pour la cartographie des flux
-        flow_data['sections'][section_name] = {
-            'type': section_type,
-            'content': section_content.strip()
-        }
+        def substitute(match):
+            value = self.resolve(match.group(1), stack + (name,))
+            return match.group(0) if value is None else value
         
-        # Parser les paramètres de la section
-        param_pattern = r'(\w+)\s+(.+?)(?=\n\w+\s+|$)'
-        params = re.findall(param_pattern, section_content, re.DOTALL)
+        value = VARIABLE_RE.sub(substitute, self.defines[name])
+        self.resolved[name] = value
+        return value
+
+    def resolve_all(self):
+        """
+        Retourne le dictionnaire de toutes les constantes résolues
+        """
+        for name in self.defines:
+            self.resolve(name)
+        return dict(self.resolved)
+
+    def _substitute(self, match):
+        value = self.resolve(match.group(1))
+        return match.group(0) if value is None else value
+
+    def expand(self, value):
+        """
+        Remplace les références %NOM% d'une valeur
+        """
+        if '%' not in value:
+            return value
+        return VARIABLE_RE.sub(self._substitute, value)
+
+def apply_define_directive(keyword, value, defines):
+    """
+    Enregistre une directive define/envvar dans le dictionnaire des constantes
+
+    Retourne le nom de la constante définie.
+    """
+    match = DEFINE_RE.match(value)
+    if not match:
+        return None
+    name = match.group(1)
+    if keyword.lower() == 'envvar':
+        defines[name] = os.environ.get(name, '')
+    else:
+        defines[name] = match.group(2).strip()
+    return name
+
+class IncludeGraph:
+    """
+    Graphe mémoïsé des fichiers inclus.
+
+    Chaque fichier inclus est tokenisé une seule fois; ses événements (sections,
+    routes et constantes, inclusions comprises) sont conservés tant que ni lui, ni
+    ses propres inclusions, ni la liste des fichiers correspondant à ses motifs
+    d'inclusion ne changent sur disque et que les constantes utilisées
+    dans ses chemins d'inclusion gardent la même valeur. Les inclusions circulaires
+    sont coupées.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self.cycles = 0
+
+    def iter_events(self, file_path, stack, includes, defines, used=None, tokenizer=None, globs=None):
+        """
+        Émet les événements d'un fichier en développant récursivement ses directives include
+
+        Les fichiers inclus (transitivement) sont ajoutés à la liste includes, les motifs
+        glob résolus à globs, et les directives define/envvar rencontrées mettent à jour
+        defines. Les constantes
+        lues pour résoudre les chemins d'inclusion sont notées dans used. tokenizer
+        remplace tokenize_nxlog_config pour ce fichier seulement (pas ses inclusions).
+        """
+        base_dir = os.path.dirname(file_path)
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            if TIMINGS.enabled:
+                TIMINGS.count('files_read')
+                TIMINGS.count('bytes_read', os.fstat(f.fileno()).st_size)
+            for event in (tokenizer or tokenize_nxlog_config)(f):
+                if event[0] != 'directive':
+                    yield event
+                    continue
+                
+                keyword = event[1].lower()
+                if keyword in ('define', 'envvar'):
+                    apply_define_directive(keyword, event[2], defines)
+                    yield event
+                    continue
+                
+                target = event[2]
+                if '%' in target:
+                    expander = MacroExpander(defines)
+                    if used is not None:
+                        for name in VARIABLE_RE.findall(target):
+                            used.setdefault(name, expander.resolve(name))
+                    target = expander.expand(target)
+                
+                for included in resolve_include_paths(keyword, target, base_dir, globs):
+                    events, dependencies, included_used, patterns = self.resolve(included, stack, defines)
+                    for path in dependencies:
+                        if path not in includes:
+                            includes.append(path)
+                    if globs is not None:
+                        globs.extend(pattern for pattern in patterns if pattern not in globs)
+                    if used is not None:
+                        for name, value in included_used.items():
+                            used.setdefault(name, value)
+                    
+                    for included_event in events:
+                        if included_event[0] == 'directive':
+                            apply_define_directive(included_event[1], included_event[2], defines)
+                        yield included_event
+
+    def resolve(self, file_path, stack, defines):
+        """
+        Retourne (événements, fichiers dont ils dépendent, constantes utilisées, motifs glob)
+        pour un fichier inclus
+        """
+        real_path = os.path.realpath(file_path)
+        if real_path in stack:
+            print(f"Avertissement: inclusion circulaire ignorée: {' -> '.join(stack + (real_path,))}")
+            self.cycles += 1
+            return [], [], {}, []
         
-        for param_name, param_value in params:
-            param_value = param_value.strip().strip('"\'')
-            description = PARAMETER_DESCRIPTIONS.get(param_name, 'Paramètre non documenté')
-            
-            config_data.append([
-                section_type,
-                section_name,
-                param_name,
-                param_value,
-                description
-            ])
-    
-    # Parser les routes pour la cartographie des flux
-    route_pattern = r'<Route\s+([^>]+)>\s*(.*?)\s*</Route>'
-    routes = re.findall(route_pattern, content, re.DOTALL | re.IGNORECASE)
-    
-    for route_name, route_content in routes:
-        route_name = route_name.strip()
+        node = self.nodes.get(real_path)
+        if (node is not None and all(_file_signature(path) == signature for path, signature in node[0])
+                and all(_glob_signature(pattern) == signature for pattern, signature in node[3])):
+            expander = MacroExpander(defines)
+            if all(expander.resolve(name) == value for name, value in node[2].items()):
+                return node[1], [path for path, _ in node[0]], node[2], [pattern for pattern, _ in node[3]]
         
-        # Chercher les définitions de flux dans la route
-        path_pattern = r'Path\s+(.+?)(?=\n\w+\s+|$)'
-        paths = re.findall(path_pattern, route_content, re.DOTALL)
+        signature = _file_signature(real_path)
+        includes = []
+        used = {}
+        globs = []
+        cycles = self.cycles
+        try:
+            # Les constantes définies par le fichier inclus sont rejouées par l'appelant
+            events = list(self.iter_events(real_path, stack + (real_path,), includes, dict(defines), used,
+                                           globs=globs))
+        except Exception as e:
+            print(f"Erreur lors de la lecture du fichier inclus {real_path}: {e}")
+            return [], [real_path], {}, []
         
-        for path in paths:
-            path = path.strip().strip('"\'')
-            flow_data['routes'].append({
-                'name': route_name,
-                'path': path,
-                'content': route_content.strip()
-            })
+        dependencies = [(real_path, signature)] + [(path, _file_signature(path)) for path in includes]
+        if self.cycles == cycles:
+            # Un résultat tronqué par une inclusion circulaire dépend de la pile courante
+            self.nodes[real_path] = (dependencies, events, used,
+                                     [(pattern, _glob_signature(pattern)) for pattern in globs])
+        return events, [path for path, _ in dependencies], used, globs
+
+# Graphe des inclusions partagé par toutes les analyses du processus
+INCLUDE_GRAPH = IncludeGraph()
+
+# Lignes (paramètre, valeur, description) déjà extraites, par contenu de section
+SECTION_PARAMS_MEMO = OrderedDict()
+SECTION_PARAMS_MEMO_MAX = 4096
+
+def parse_nxlog_config(file_path, use_mmap=False):
+    """
+    Parse un fichier de configuration nxlog et extrait les paramètres
+
+    Avec use_mmap, le fichier est projeté en mémoire: les sections sont conservées
+    sous forme de portions du fichier (SpanSection) et config_data est un
+    SpanConfigRows qui décode les valeurs seulement lorsqu'elles sont parcourues.
+    """
+    config_data = SpanConfigRows() if use_mmap else ConfigRows()
+    flow_data = {
+        'routes': [],
+        'sections': {},
+        'flows': [],
+        'includes': [],
+        'include_globs': [],
+        'defines': {},
+        'environment': {}
+    }
+    defines = {}
+    
+    # Temps passé dans l'extraction des paramètres, déduit de la tokenisation
+    timed = TIMINGS.enabled
+    if timed:
+        loop_wall, loop_cpu = time.perf_counter(), time.process_time()
+        io_wall, io_cpu = TIMINGS.wall('io')
+        params_wall = params_cpu = 0.0
     
-    # Analyser les flux de données
-    analyze_data_flows(flow_data)
+    try:
+        stack = (os.path.realpath(file_path),)
+        for kind, block_type, block_name, block_content in INCLUDE_GRAPH.iter_events(
+                file_path, stack, flow_data['includes'], defines,
+                tokenizer=tokenize_mapped_config if use_mmap else None, globs=flow_data['include_globs']):
+            if kind == 'section' and use_mmap:
+                section = SpanSection(block_type, block_content)
+                flow_data['sections'][block_name] = section
+                config_data.append_section(block_type, block_name, section)
+            elif kind == 'section':
+                if timed:
+                    wall, cpu = time.perf_counter(), time.process_time()
+                # Sections identiques (gabarits): réutiliser les paramètres déjà extraits
+                rows = SECTION_PARAMS_MEMO.get(block_content)
+                if rows is None:
+                    rows = []
+                    for param_name, param_value in iter_section_params(block_content):
+                        # Valeur internée, partagée entre section_params et config_data
+                        param_value = sys.intern(param_value)
+                        description = PARAMETER_DESCRIPTIONS.get(param_name, 'Paramètre non documenté')
+                        rows.append((param_name, param_value, description))
+                    rows = SECTION_PARAMS_MEMO[block_content] = tuple(rows)
+                    if len(SECTION_PARAMS_MEMO) > SECTION_PARAMS_MEMO_MAX:
+                        SECTION_PARAMS_MEMO.popitem(last=False)
+                else:
+                    SECTION_PARAMS_MEMO.move_to_end(block_content)
+                
+                # Stocker les informations de section pour la cartographie des flux
+                flow_data['sections'][block_name] = {
+                    'type': block_type,
+                    'content': block_content,
+                    'params': {param_name: param_value for param_name, param_value, _ in rows}
+                }
+                config_data.extend_section(block_type, block_name, rows)
+                if timed:
+                    params_wall += time.perf_counter() - wall
+                    params_cpu += time.process_time() - cpu
+            elif kind == 'route':
+                # Chercher les définitions de flux dans la route
+                for path in PATH_RE.findall(block_content):
+                    flow_data['routes'].append({
+                        'name': block_name,
+                        'path': path.strip().strip('"\''),
+                        'content': block_content
+                    })
+            elif block_type.lower() == 'envvar':
+                # Mémoriser les variables d'environnement lues (validation du cache)
+                name = apply_define_directive(block_type, block_name, {})
+                if name:
+                    flow_data['environment'][name] = os.environ.get(name)
+    except Exception as e:
+        print(f"Erreur lors de la lecture du fichier {file_path}: {e}")
+        return [], {'routes': [], 'sections': {}, 'flows': [], 'includes': [], 'include_globs': [], 'defines': {},
+                    'environment': {}}
     
+    if timed:
+        io_wall, io_cpu = (value - before for value, before in zip(TIMINGS.wall('io'), (io_wall, io_cpu)))
+        TIMINGS.add('tokenize', time.perf_counter() - loop_wall - params_wall - io_wall,
+                    time.process_time() - loop_cpu - params_cpu - io_cpu)
+        TIMINGS.add('params', params_wall, params_cpu)
+        TIMINGS.count('sections', len(flow_data['sections']))
+        TIMINGS.count('params', len(config_data))
+        TIMINGS.count('routes', len(flow_data['routes']))
+    
+    # Substituer les constantes %NOM% une fois toutes les définitions connues
+    if defines:
+        with TIMINGS.stage('macros'):
+            expand_config_macros(config_data, flow_data, MacroExpander(defines))
+    
+    # Indexer les sections et routes puis analyser les flux de données
+    with TIMINGS.stage('index'):
+        index_flow_data(flow_data)
+    with TIMINGS.stage('analyze_data_flows'):
+        analyze_data_flows(flow_data)
+    if timed:
+        TIMINGS.count('flows', len(flow_data['flows']))
+    
+    if isinstance(config_data, ConfigRows):
+        config_data.compact()
     return config_data, flow_data
 
+def expand_config_macros(config_data, flow_data, expander):
+    """
+    Applique la substitution des constantes aux valeurs des paramètres, sections et routes
+    """
+    expand = expander.expand
+    if isinstance(config_data, SpanConfigRows):
+        # Substitution différée au décodage des sections
+        config_data.expander = expander
+        for _, _, section in config_data.sections:
+            section.expander = expander
+    elif isinstance(config_data, ConfigRows):
+        config_data.transform_values(expand)
+    else:
+        for row in config_data:
+            row[3] = expand(row[3])
+    for section_info in flow_data['sections'].values():
+        if isinstance(section_info, SpanSection):
+            continue
+        section_info['content'] = expand(section_info['content'])
+        params = section_info['params']
+        for param_name, param_value in params.items():
+            params[param_name] = expand(param_value)
+    for route in flow_data['routes']:
+        route['path'] = expand(route['path'])
+        route['content'] = expand(route['content'])
+    flow_data['defines'] = expander.resolve_all()
+
+def index_flow_data(flow_data):
+    """
+    Précalcule l'index des sections (module) et les attributs des routes (priorité, condition)
+
+    Chaque regex n'est appliquée qu'une fois par section et par contenu de route,
+    quel que soit le nombre de flux qui y font référence.
+    """
+    for section_info in flow_data['sections'].values():
+        section_info['module'] = extract_module_from_content(section_info['content'])
+    
+    route_attributes = {}
+    for route in flow_data['routes']:
+        content = route['content']
+        attributes = route_attributes.get(content)
+        if attributes is None:
+            attributes = (extract_priority_from_route(content), extract_condition_from_route(content))
+            route_attributes[content] = attributes
+        route['priority'], route['condition'] = attributes
+
 def analyze_data_flows(flow_data):
     """
     Analyse les flux de données basés sur les routes et sections
     """
     flows = []
+    sections = flow_data['sections']
     
     for route in flow_data['routes']:
-        path = route['path']
-        route_name = route['name']
-        
-        # Parser les chemins de type "input1, input2 => processor1 => output1, output2"
-        # ou "input1 => output1"
-        if '=>' in path:
-            steps = [step.strip() for step in path.split('=>')]
-            
-            # Traiter chaque étape
-            for i in range(len(steps) - 1):
-                sources = [s.strip() for s in steps[i].split(',')]
-                destinations = [d.strip() for d in steps[i + 1].split(',')]
-                
-                for source in sources:
-                    for destination in destinations:
-                        if source in flow_data['sections'] and destination in flow_data['sections']:
-                            source_info = flow_data['sections'][source]
-                            dest_info = flow_data['sections'][destination]
-                            
-                            flows.append({
-                                'route': route_name,
-                                'source': source,
-                                'source_type': source_info['type'],
-                                'source_module': extract_module_from_content(source_info['content']),
-                                'destination': destination,
-                                'destination_type': dest_info['type'],
-                                'destination_module': extract_module_from_content(dest_info['content']),
-                                'priority': extract_priority_from_route(route['content']),
-                                'condition': extract_condition_from_route(route['content'])
-                            })
+        flows.extend(iter_route_flows(route, sections))
     
     flow_data['flows'] = flows
 
+def iter_route_flows(route, sections):
+    """
+    Produit les flux d'une route entre les sections connues de l'index sections
+    """
+    path = route['path']
+    route_name = route['name']
+    
+    # Parser les chemins de type "input1, input2 => processor1 => output1, output2"
+    # ou "input1 => output1"
+    if '=>' not in path:
+        return
+    
+    if 'priority' not in route:
+        route['priority'] = extract_priority_from_route(route['content'])
+        route['condition'] = extract_condition_from_route(route['content'])
+    priority = route['priority']
+    condition = route['condition']
+    
+    # Ne garder à chaque étape que les sections connues, avec leur entrée d'index
+    steps = []
+    for step in path.split('=>'):
+        known = []
+        for name in step.split(','):
+            name = name.strip()
+            section_info = sections.get(name)
+            if section_info is not None:
+                if 'module' not in section_info:
+                    section_info['module'] = extract_module_from_content(section_info['content'])
+                known.append((name, section_info))
+        steps.append(known)
+    
+    # Traiter chaque étape
+    for i in range(len(steps) - 1):
+        for source, source_info in steps[i]:
+            for destination, dest_info in steps[i + 1]:
+                yield {
+                    'route': route_name,
+                    'source': source,
+                    'source_type': source_info['type'],
+                    'source_module': source_info['module'],
+                    'destination': destination,
+                    'destination_type': dest_info['type'],
+                    'destination_module': dest_info['module'],
+                    'priority': priority,
+                    'condition': condition
+                }
+
 def extract_module_from_content(content):
     """
     Extrait le nom du module depuis le contenu d'une section
     """
-    module_match = re.search(r'Module\s+(\w+)', content, re.IGNORECASE)
+    module_match = MODULE_RE.search(content)
     return module_match.group(1) if module_match else 'N/A'
 
 def extract_priority_from_route(content):
     """
     Extrait la priorité depuis le contenu d'une route
     """
-    priority_match = re.search(r'Priority\s+(\d+)', content, re.IGNORECASE)
+    priority_match = PRIORITY_RE.search(content)
     return priority_match.group(1) if priority_match else '1'
 
 def extract_condition_from_route(content):
     """
     Extrait la condition depuis le contenu d'une route
     """
-    condition_match = re.search(r'Condition\s+(.+?)(?=\n\w+\s+|$)', content, re.DOTALL | re.IGNORECASE)
+    condition_match = CONDITION_RE.search(content)
     return condition_match.group(1).strip().strip('"\'') if condition_match else 'N/A'
 
 def display_config_table(config_data, format_type='table'):
@@ -411,7 +1296,23 @@ def display_statistics(config_data):
         print("Aucune donnée pour les statistiques.")
         return
     
-    total_params = len(config_data)
+    statistics = compute_statistics(config_data)
+    
+    print("=" * 50)
+    print("STATISTIQUES DE CONFIGURATION")
+    print("=" * 50)
+    print(f"Nombre total de paramètres: {statistics['parameters']}")
+    print(f"Nombre de sections: {statistics['sections']}")
+    print(f"Nombre de modules: {statistics['modules']}")
+    print()
+    print(f"Sections trouvées: {', '.join(statistics['section_types'])}")
+    print(f"Modules utilisés: {', '.join(statistics['module_names'])}")
+    print("=" * 50)
+
+def compute_statistics(config_data):
+    """
+    Calcule les statistiques de la configuration (types de sections, sections, modules)
+    """
     sections = set()
     modules = set()
     section_names = set()
@@ -422,18 +1323,50 @@ def display_statistics(config_data):
         if row[2] == 'Module':  # Si c'est un paramètre Module
             modules.add(row[3])  # Valeur du module
     
-    print("=" * 50)
-    print("STATISTIQUES DE CONFIGURATION")
-    print("=" * 50)
-    print(f"Nombre total de paramètres: {total_params}")
-    print(f"Nombre de sections: {len(section_names)}")
-    print(f"Nombre de modules: {len(modules)}")
-    print()
-    print(f"Sections trouvées: {', '.join(sorted(sections))}")
-    print(f"Modules utilisés: {', '.join(sorted(modules))}")
-    print("=" * 50)
+    return {
+        'parameters': len(config_data),
+        'sections': len(section_names),
+        'modules': len(modules),
+        'section_types': sorted(sections),
+        'module_names': sorted(modules)
+    }
 
-def display_flow_mapping(flow_data, config_name="CONFIGURATION"):
+def write_jsonl_records(config_file, config_data, flow_data, stats=False, flows=False, stream=None):
+    """
+    Écrit un objet JSON compact par ligne (paramètre, puis statistiques et flux si demandés)
+
+    Chaque fichier est écrit dès qu'il est analysé, sans construire de document
+    JSON global, ce qui permet d'enchaîner avec jq ou un pipeline d'ingestion.
+    """
+    stream = stream or sys.stdout
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    write = stream.write
+    
+    for row in config_data:
+        write(dumps({
+            'type': 'parameter',
+            'file': config_file,
+            'section': row[0],
+            'section_name': row[1],
+            'parameter': row[2],
+            'value': row[3],
+            'description': row[4]
+        }) + '\n')
+    
+    if stats and config_data:
+        record = {'type': 'statistics', 'file': config_file}
+        record.update(compute_statistics(config_data))
+        write(dumps(record) + '\n')
+    
+    if flows:
+        for flow in flow_data['flows']:
+            record = {'type': 'flow', 'file': config_file}
+            record.update(flow)
+            write(dumps(record) + '\n')
+    
+    stream.flush()
+
+def display_flow_mapping(flow_data, config_name="CONFIGURATION"):
     """
     Affiche la cartographie des flux de données
     """
@@ -584,174 +1517,711 @@ Pidfile /var/run/nxlog/nxlog.pid
     except Exception as e:
         print(f"Erreur lors de la création du fichier d'exemple: {e}")
 
-def process_directory(directory_path, stats=False, flows=False, format_type='table'):
+def file_content_hash(file_path):
+    """
+    Calcule l'empreinte SHA-256 du contenu d'un fichier
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(STREAM_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ParseCache:
+    """
+    Cache persistant des résultats de parse_nxlog_config.
+
+    Les résultats sont stockés par empreinte de contenu dans objects/; l'index associe
+    chaque chemin à son (mtime, taille, empreinte) pour éviter de relire les fichiers
+    inchangés. Un résultat qui dépend de fichiers inclus est stocké par empreinte et
+    répertoire, les inclusions relatives n'ayant de sens que depuis ce répertoire. Les
+    fichiers inclus, les motifs d'inclusion glob et les variables d'environnement
+    (envvar) d'une entrée sont revalidés à chaque utilisation.
+    Le cache est borné en taille avec une éviction LRU et entièrement invalidé
+    lorsque PARSE_CACHE_VERSION change.
+    """
+
+    def __init__(self, cache_dir, max_size=DEFAULT_CACHE_MAX_SIZE * 1024 * 1024):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.objects_dir = os.path.join(self.cache_dir, 'objects')
+        self.index_file = os.path.join(self.cache_dir, 'index.json')
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.files = {}
+        self.objects = {}
+        
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        
+        if index.get('version') == PARSE_CACHE_VERSION:
+            self.files = index.get('files', {})
+            self.objects = index.get('objects', {})
+        elif os.path.isdir(self.objects_dir):
+            # Entrées produites par une autre version du parser
+            shutil.rmtree(self.objects_dir, ignore_errors=True)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest + '.pickle')
+
+    @staticmethod
+    def _object_key(digest, base_dir):
+        """
+        Clé d'un résultat dépendant de fichiers inclus: empreinte du contenu et du répertoire
+        """
+        return digest + '-' + hashlib.blake2b(base_dir.encode('utf-8', 'surrogatepass'), digest_size=8).hexdigest()
+
+    def lookup(self, file_path):
+        """
+        Cherche le résultat d'un fichier dans le cache
+
+        Retourne (résultat ou None, clé) où la clé sert ensuite à store().
+        """
+        path = os.path.abspath(file_path)
+        try:
+            stat = os.stat(path)
+            entry = self.files.get(path)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                digest = entry[2]
+            else:
+                digest = file_content_hash(path)
+        except OSError:
+            self.misses += 1
+            return None, None
+        
+        key = (path, stat.st_mtime_ns, stat.st_size, digest)
+        object_key = self._object_key(digest, os.path.dirname(path))
+        if object_key not in self.objects:
+            object_key = digest
+        if object_key in self.objects:
+            try:
+                with open(self._object_path(object_key), 'rb') as f:
+                    version, base_dir, dependencies, globs, config_data, flow_data = pickle.load(f)
+                # Un résultat qui dépend de fichiers inclus n'est valide que pour le même
+                # répertoire et tant que les fichiers inclus et les listes de fichiers
+                # correspondant aux motifs d'inclusion n'ont pas changé
+                fresh = not (dependencies or globs) or (
+                    base_dir == os.path.dirname(path)
+                    and all(_file_signature(dep) == signature for dep, signature in dependencies)
+                    and all(_glob_signature(pattern) == signature for pattern, signature in globs))
+                fresh = fresh and all(os.environ.get(name) == value
+                                      for name, value in flow_data.get('environment', {}).items())
+                if version == PARSE_CACHE_VERSION and fresh:
+                    self.files[path] = [stat.st_mtime_ns, stat.st_size, digest]
+                    self.objects[object_key][1] = time.time()
+                    self.hits += 1
+                    return (config_data, flow_data), key
+            except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+                pass
+            del self.objects[object_key]
+        
+        self.misses += 1
+        return None, key
+
+    def store(self, key, config_data, flow_data):
+        """
+        Enregistre le résultat de parsing associé à une clé obtenue par lookup()
+        """
+        if key is None:
+            return
+        path, mtime_ns, size, digest = key
+        dependencies = [(dep, _file_signature(dep)) for dep in flow_data.get('includes', [])]
+        globs = [(pattern, _glob_signature(pattern)) for pattern in flow_data.get('include_globs', [])]
+        object_key = self._object_key(digest, os.path.dirname(path)) if dependencies or globs else digest
+        object_path = self._object_path(object_key)
+        try:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            data = pickle.dumps((PARSE_CACHE_VERSION, os.path.dirname(path), dependencies, globs, config_data,
+                                 flow_data), pickle.HIGHEST_PROTOCOL)
+            with open(object_path, 'wb') as f:
+                f.write(data)
+        except OSError:
+            return
+        self.files[path] = [mtime_ns, size, digest]
+        self.objects[object_key] = [len(data), time.time()]
+
+    def save(self):
+        """
+        Applique l'éviction LRU puis écrit l'index sur disque
+        """
+        total_size = sum(size for size, _ in self.objects.values())
+        if total_size > self.max_size:
+            for digest, (size, _) in sorted(self.objects.items(), key=lambda item: item[1][1]):
+                if total_size <= self.max_size:
+                    break
+                try:
+                    os.remove(self._object_path(digest))
+                except OSError:
+                    pass
+                del self.objects[digest]
+                total_size -= size
+            digests = {object_key.split('-', 1)[0] for object_key in self.objects}
+            self.files = {path: entry for path, entry in self.files.items() if entry[2] in digests}
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_file = self.index_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': PARSE_CACHE_VERSION, 'files': self.files, 'objects': self.objects}, f)
+            os.replace(temp_file, self.index_file)
+        except OSError as e:
+            print(f"Erreur lors de l'écriture du cache {self.cache_dir}: {e}")
+
+# Nombre de résultats de parsing conservés pour les fichiers de contenu identique
+CONTENT_VARIANTS_MAX = 256
+
+class ContentVariants:
+    """
+    Résultats de parsing partagés entre fichiers de contenu identique
+
+    Les fichiers sont identifiés par l'empreinte SHA-256 de leur contenu: un fichier
+    dont l'empreinte a déjà été analysée reprend le résultat existant (mêmes objets)
+    sans être tokenisé à nouveau, sauf s'il contient des inclusions ou des motifs
+    d'inclusion (même sans correspondance) et se trouve dans un autre répertoire. Les derniers résultats sont conservés (LRU), les empreintes
+    des fichiers et des sections servent au décompte des variantes uniques.
+    """
+
+    def __init__(self, max_results=CONTENT_VARIANTS_MAX):
+        self.max_results = max_results
+        self.results = OrderedDict()
+        self.inflight = set()
+        self.digests = set()
+        self.section_digests = set()
+        self.files = 0
+        self.sections = 0
+        self.reused = 0
+        self.unhashed = 0
+
+    def digest(self, config_file, key=None):
+        """
+        Retourne l'empreinte du fichier (reprise de la clé du cache de parsing si fournie)
+        """
+        if key is not None:
+            return key[3]
+        try:
+            return file_content_hash(config_file)
+        except OSError:
+            return None
+
+    def known(self, digest):
+        """
+        Indique si un résultat existe ou est en cours de calcul pour cette empreinte
+        """
+        return digest is not None and (digest in self.results or digest in self.inflight)
+
+    def claim(self, digest):
+        if digest is not None:
+            self.inflight.add(digest)
+
+    def lookup(self, config_file, digest):
+        """
+        Retourne (config_data, flow_data) d'un fichier de même contenu, ou None
+        """
+        entry = self.results.get(digest)
+        if entry is None:
+            return None
+        base_dir, config_data, flow_data = entry
+        # Les chemins d'inclusion relatifs dépendent du répertoire du fichier: un motif
+        # sans correspondance ici peut en avoir dans un autre répertoire
+        if (flow_data['includes'] or flow_data.get('include_globs')) and base_dir != os.path.dirname(os.path.abspath(config_file)):
+            return None
+        self.results.move_to_end(digest)
+        return config_data, flow_data
+
+    def add(self, config_file, digest, config_data, flow_data, output, reused=False):
+        """
+        Enregistre le résultat d'un fichier et met à jour les décomptes
+        """
+        self.files += 1
+        self.sections += len(flow_data['sections'])
+        self.inflight.discard(digest)
+        if reused:
+            self.reused += 1
+            return
+        if digest is None or digest not in self.digests:
+            for section_info in flow_data['sections'].values():
+                self.section_digests.add(hashlib.blake2b(section_info['content'].encode('utf-8', 'surrogatepass'),
+                                                         digest_size=16).digest())
+        if digest is None:
+            self.unhashed += 1
+            return
+        self.digests.add(digest)
+        if not output and digest not in self.results:
+            self.results[digest] = (os.path.dirname(os.path.abspath(config_file)), config_data, flow_data)
+            if len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+
+    def summary(self):
+        """
+        Résumé des variantes uniques de fichiers et de sections
+        """
+        unique_files = len(self.digests) + self.unhashed
+        return (f"Variantes uniques: {unique_files} fichier(s) distinct(s) sur {self.files} "
+                f"({self.reused} repris sans nouvelle analyse), "
+                f"{len(self.section_digests)} section(s) distincte(s) sur {self.sections}")
+
+def iter_config_files(path_or_dir):
+    """
+    Retourne les fichiers .conf d'un répertoire (parcours récursif), ou le fichier lui-même
+    """
+    if not os.path.isdir(path_or_dir):
+        yield path_or_dir
+        return
+    for root, dirs, files in os.walk(path_or_dir):
+        for file in files:
+            if file.endswith('.conf'):
+                yield os.path.join(root, file)
+
+def config_files_root(config_files):
+    """
+    Retourne le répertoire commun à des fichiers de configuration
+    """
+    directories = [os.path.dirname(os.path.abspath(path)) for path in config_files]
+    return os.path.commonpath(directories) if directories else ''
+
+def config_file_key(config_file, base_dir):
+    """
+    Identifiant d'un fichier dans les sorties: chemin relatif à base_dir, sans .conf
+
+    Unique dans un parc organisé en un répertoire par hôte (h1/nxlog.conf, h2/nxlog.conf);
+    réduit au nom du fichier pour un répertoire sans sous-répertoires.
+    """
+    key = os.path.relpath(os.path.abspath(config_file), os.path.abspath(base_dir))
+    return key[:-len('.conf')] if key.endswith('.conf') else key
+
+def iter_config_items(config_file, rows=True, flows=True):
+    """
+    Analyse un fichier au fil de la lecture et produit ('row', ligne) et ('flow', flux)
+
+    Les lignes [type, nom, paramètre, valeur, description] sont produites dès que leur
+    section est reconnue et les flux dès que leur route l'est, si toutes les sections
+    qu'elle relie ont déjà été lues. Les références %NOM% sont remplacées avec les
+    constantes déjà définies (NXLog impose define avant usage); seul un élément qui
+    dépend d'une constante encore inconnue ou d'une section pas encore lue est retenu
+    jusqu'à la fin du fichier, puis produit après les autres. Seul l'index des
+    sections (type et module) est conservé pendant la lecture.
+    """
+    defines = {}
+    sections = {}
+    unresolved = {}
+    pending_rows = []
+    pending_routes = []
+    expander = None
+    
+    def expand(value):
+        # Retourne la valeur développée, ou None si elle référence une constante inconnue
+        nonlocal expander
+        if '%' not in value:
+            return value
+        if expander is None:
+            expander = MacroExpander(defines)
+        value = expander.expand(value)
+        return None if VARIABLE_RE.search(value) else value
+    
+    try:
+        stack = (os.path.realpath(config_file),)
+        for kind, block_type, block_name, block_content in INCLUDE_GRAPH.iter_events(
+                config_file, stack, [], defines):
+            if kind == 'directive':
+                # define/envvar: les valeurs déjà résolues peuvent changer
+                expander = None
+            elif kind == 'section':
+                content = expand(block_content)
+                if content is None:
+                    unresolved[block_name] = (block_type, block_content)
+                    sections.pop(block_name, None)
+                else:
+                    unresolved.pop(block_name, None)
+                    sections[block_name] = {'type': block_type,
+                                            'module': extract_module_from_content(content)}
+                if not rows:
+                    continue
+                for param_name, param_value in iter_section_params(block_content):
+                    value = expand(param_value)
+                    row = [block_type, block_name, param_name, param_value if value is None else value,
+                           PARAMETER_DESCRIPTIONS.get(param_name, 'Paramètre non documenté')]
+                    if value is None:
+                        pending_rows.append(row)
+                    else:
+                        yield 'row', row
+            elif kind == 'route' and flows:
+                content = expand(block_content)
+                for path in PATH_RE.findall(content if content is not None else block_content):
+                    route = {'name': block_name, 'path': path.strip().strip('"\''),
+                             'content': content if content is not None else block_content}
+                    names = [name.strip() for step in route['path'].split('=>') for name in step.split(',')]
+                    if content is None or not all(name in sections for name in names):
+                        pending_routes.append(route)
+                    else:
+                        for flow in iter_route_flows(route, sections):
+                            yield 'flow', flow
+    except Exception as e:
+        print(f"Erreur lors de la lecture du fichier {config_file}: {e}")
+        return
+    
+    # Fin du fichier: toutes les constantes et sections sont connues
+    expand = MacroExpander(defines).expand if defines else str
+    for name, (section_type, content) in unresolved.items():
+        sections[name] = {'type': section_type, 'module': extract_module_from_content(expand(content))}
+    for row in pending_rows:
+        row[3] = expand(row[3])
+        yield 'row', row
+    for route in pending_routes:
+        route['path'] = expand(route['path'])
+        route['content'] = expand(route['content'])
+        for flow in iter_route_flows(route, sections):
+            yield 'flow', flow
+
+def iter_config_rows(path_or_dir):
+    """
+    Produit (fichier, ligne) pour un fichier ou tous les .conf d'un répertoire, au fil de la lecture
+
+    Chaque ligne a la forme [type, nom, paramètre, valeur, description] de config_data.
+    """
+    for config_file in iter_config_files(path_or_dir):
+        for _, row in iter_config_items(config_file, rows=True, flows=False):
+            yield config_file, row
+
+def iter_flows(path_or_dir):
+    """
+    Produit (fichier, flux) pour un fichier ou tous les .conf d'un répertoire, au fil de la lecture
+
+    Chaque flux a la forme des entrées de flow_data['flows'].
+    """
+    for config_file in iter_config_files(path_or_dir):
+        for _, flow in iter_config_items(config_file, rows=False, flows=True):
+            yield config_file, flow
+
+def _parse_config_job(config_file, collect_timings=False, use_mmap=False):
+    """
+    Parse un fichier en capturant sa sortie console (exécutée aussi dans les processus du pool)
+
+    Avec collect_timings, les mesures du parsing sont retournées pour être fusionnées
+    dans le processus principal (None sinon).
+    """
+    if collect_timings:
+        TIMINGS.enabled = True
+        TIMINGS.reset()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        config_data, flow_data = parse_nxlog_config(config_file, use_mmap)
+    return config_data, flow_data, output.getvalue(), TIMINGS.snapshot() if collect_timings else None
+
+def iter_parsed_configs(config_files, jobs=1, cache=None, use_mmap=False, variants=None):
+    """
+    Parse les fichiers et retourne (fichier, config_data, flow_data, sortie) dans l'ordre d'entrée
+
+    Avec jobs > 1, les fichiers sont répartis sur un pool de processus avec un nombre
+    borné de tâches en cours; les messages émis pendant le parsing sont capturés
+    puis restitués avec le résultat du fichier correspondant. Les fichiers présents
+    dans le cache ne sont pas réanalysés. Les résultats du mode mmap, qui font
+    référence aux fichiers analysés, ne sont pas ajoutés au cache. Avec variants
+    (ContentVariants), un fichier de même contenu qu'un fichier déjà analysé reprend
+    son résultat au lieu d'être analysé à nouveau.
+    """
+    cache_store = None if use_mmap else cache
+    
+    if jobs <= 1:
+        for config_file in config_files:
+            cached, key = cache.lookup(config_file) if cache else (None, None)
+            digest = variants.digest(config_file, key) if variants else None
+            if cached is not None:
+                if variants:
+                    variants.add(config_file, digest, *cached, '')
+                yield (config_file,) + cached + ('',)
+                continue
+            reused = variants.lookup(config_file, digest) if variants else None
+            if reused is not None:
+                variants.add(config_file, digest, *reused, '', reused=True)
+                yield (config_file,) + reused + ('',)
+                continue
+            config_data, flow_data, output, _ = _parse_config_job(config_file, False, use_mmap)
+            if cache_store and not output:
+                cache.store(key, config_data, flow_data)
+            if variants:
+                variants.add(config_file, digest, config_data, flow_data, output)
+            yield config_file, config_data, flow_data, output
+        return
+    
+    max_pending = jobs * 4
+    pending = deque()
+    files = iter(config_files)
+    
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        def submit(config_file):
+            cached, key = cache.lookup(config_file) if cache else (None, None)
+            digest = variants.digest(config_file, key) if variants else None
+            if cached is not None or (variants and variants.known(digest)):
+                # Résultat en cache, ou attendu d'un fichier de même contenu déjà soumis
+                pending.append((config_file, None, key, digest, cached))
+            else:
+                if variants:
+                    variants.claim(digest)
+                pending.append((config_file, executor.submit(_parse_config_job, config_file, TIMINGS.enabled, use_mmap),
+                                key, digest, None))
+        
+        for config_file in files:
+            submit(config_file)
+            if len(pending) >= max_pending:
+                break
+        
+        while pending:
+            config_file, future, key, digest, cached = pending.popleft()
+            reused = None
+            if future is None and cached is None:
+                reused = variants.lookup(config_file, digest)
+                if reused is None:
+                    # Le résultat du fichier identique n'est pas réutilisable ici
+                    future = executor.submit(_parse_config_job, config_file, TIMINGS.enabled, use_mmap)
+            
+            if reused is not None:
+                config_data, flow_data = reused
+                output = ''
+            elif future is None:
+                config_data, flow_data = cached
+                output = ''
+            else:
+                config_data, flow_data, output, timings = future.result()
+                if timings:
+                    TIMINGS.merge(timings)
+                if cache_store and not output:
+                    cache.store(key, config_data, flow_data)
+            if variants:
+                variants.add(config_file, digest, config_data, flow_data, output, reused=reused is not None)
+            
+            # Remplacer la tâche terminée pour garder le pool occupé
+            next_file = next(files, None)
+            if next_file is not None:
+                submit(next_file)
+            
+            yield config_file, config_data, flow_data, output
+
+def process_directory(directory_path, stats=False, flows=False, format_type='table', jobs=1, cache=None,
+                      collect=True, on_config=None, use_mmap=False):
     """
     Traite tous les fichiers .conf dans un répertoire
+
+    En format jsonl, seuls les enregistrements JSON sont écrits sur la sortie standard
+    (les messages passent sur la sortie d'erreur). Avec collect=False, les résultats
+    ne sont pas conservés et la mémoire reste constante quel que soit le nombre de fichiers;
+    on_config(fichier, config_data, flow_data) permet alors de les exporter au fil de l'eau.
     """
     if not os.path.isdir(directory_path):
         print(f"Erreur: {directory_path} n'est pas un répertoire valide.")
         return {}
     
-    config_files = []
-    for root, dirs, files in os.walk(directory_path):
-        for file in files:
-            if file.endswith('.conf'):
-                config_files.append(os.path.join(root, file))
+    with TIMINGS.stage('directory_walk'):
+        config_files = list(iter_config_files(directory_path))
+    TIMINGS.count('config_files', len(config_files))
     
     if not config_files:
         print(f"Aucun fichier .conf trouvé dans {directory_path}")
         return {}
     
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    
     all_configs = {}
+    variants = ContentVariants()
     
-    for config_file in config_files:
+    for config_file, config_data, flow_data, output in iter_parsed_configs(config_files, jobs, cache, use_mmap,
+                                                                           variants):
+        if collect:
+            all_configs[config_file] = (config_data, flow_data)
+        if on_config:
+            on_config(config_file, config_data, flow_data)
+        
+        if format_type == 'jsonl':
+            if output:
+                sys.stderr.write(output)
+            with TIMINGS.stage('write_jsonl_records'):
+                write_jsonl_records(config_file, config_data, flow_data, stats, flows)
+            continue
+        
         print(f"\n{'='*60}")
         print(f"ANALYSE DE: {config_file}")
         print(f"{'='*60}")
-        
-        config_data, flow_data = parse_nxlog_config(config_file)
-        all_configs[config_file] = (config_data, flow_data)
+        if output:
+            print(output, end='')
         
         if config_data:
-            display_config_table(config_data, format_type)
+            with TIMINGS.stage('display_config_table'):
+                display_config_table(config_data, format_type)
             
             if stats:
                 print()
-                display_statistics(config_data)
+                with TIMINGS.stage('display_statistics'):
+                    display_statistics(config_data)
             
             if flows:
                 print()
                 config_name = os.path.basename(config_file).replace('.conf', '')
-                display_flow_mapping(flow_data, config_name)
+                with TIMINGS.stage('display_flow_mapping'):
+                    display_flow_mapping(flow_data, config_name)
         else:
             print("Aucune configuration trouvée dans ce fichier.")
     
+    print(f"\n{variants.summary()}", file=sys.stderr if format_type == 'jsonl' else sys.stdout)
     return all_configs
 
-def save_to_excel(all_configs, excel_file):
+EXCEL_SHEET_NAME_MAX = 31
+EXCEL_SHEET_INVALID_RE = re.compile(r'[\[\]:*?/\\]')
+
+def unique_sheet_name(base, used_names, suffix=''):
     """
-    Sauvegarde toutes les configurations dans un fichier Excel
+    Retourne un nom de feuille Excel valide et unique (31 caractères maximum, sans casse)
+
+    Le suffixe est toujours conservé; en cas de collision un compteur ~2, ~3...
+    est inséré avant lui en raccourcissant le nom de base.
+    """
+    base = EXCEL_SHEET_INVALID_RE.sub('_', base).strip("'") or 'Feuille'
+    counter = 1
+    while True:
+        marker = f"~{counter}" if counter > 1 else ''
+        name = base[:EXCEL_SHEET_NAME_MAX - len(suffix) - len(marker)] + marker + suffix
+        if name.lower() not in used_names:
+            used_names.add(name.lower())
+            return name
+        counter += 1
+
+def excel_column_widths(header, rows, max_width):
+    """
+    Calcule la largeur des colonnes en un seul passage sur les lignes (en-tête compris)
+    """
+    lengths = [len(str(value)) for value in header]
+    for row in rows:
+        for index, value in enumerate(row):
+            length = len(str(value))
+            if length > lengths[index]:
+                lengths[index] = length
+    return [min(length + 2, max_width) for length in lengths]
+
+class ExcelReportWriter:
+    """
+    Rapport Excel écrit en flux avec le mode write-only d'openpyxl
+
+    Chaque feuille est écrite sur disque au fur et à mesure: la mémoire utilisée ne
+    dépend pas du nombre de lignes. En mode write-only les largeurs de colonnes doivent
+    être connues avant la première ligne; elles sont donc calculées sur les lignes du
+    fichier avant l'ouverture de sa feuille. Les lignes de statistiques (une par fichier)
+    sont conservées jusqu'à la fermeture.
     """
-    if not OPENPYXL_AVAILABLE:
-        print("Erreur: openpyxl n'est pas disponible. Installez-le avec: pip install openpyxl")
-        return
     
-    wb = openpyxl.Workbook()
-    wb.remove(wb.active)  # Supprimer la feuille par défaut
+    CONFIG_HEADERS = ['Section', 'Nom Section', 'Paramètre', 'Valeur', 'Description']
+    FLOW_HEADERS = ['Route', 'Source', 'Type Source', 'Module Source',
+                    'Destination', 'Type Dest', 'Module Dest', 'Priorité', 'Condition']
+    STATS_HEADERS = ["Fichier", "Nombre de paramètres", "Nombre de sections", "Types de sections"]
     
-    # Styles
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    def __init__(self, excel_file):
+        self.excel_file = excel_file
+        self.wb = openpyxl.Workbook(write_only=True)
+        self.header_font = Font(bold=True, color="FFFFFF")
+        self.header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        self.used_names = set()
+        self.stats_rows = []
+        self.stats_lengths = [len(header) for header in self.STATS_HEADERS]
+        
+        # La feuille de statistiques reste la première du classeur
+        self.stats_ws = self._create_sheet("Statistiques")
     
-    # Statistiques globales
-    stats_ws = wb.create_sheet("Statistiques")
-    stats_ws.append(["Fichier", "Nombre de paramètres", "Nombre de sections", "Types de sections"])
+    def _create_sheet(self, base, suffix=''):
+        return self.wb.create_sheet(unique_sheet_name(base, self.used_names, suffix))
     
-    for config_file, (config_data, flow_data) in all_configs.items():
-        filename = os.path.basename(config_file)
-        
-        # Feuille de configuration
-        config_ws = wb.create_sheet(filename.replace('.conf', ''))
-        headers = ['Section', 'Nom Section', 'Paramètre', 'Valeur', 'Description']
-        config_ws.append(headers)
+    def _write_sheet(self, ws, headers, rows, widths):
+        for index, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(index)].width = width
         
-        # Appliquer le style d'en-tête
-        for cell in config_ws[1]:
-            cell.font = header_font
-            cell.fill = header_fill
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = self.header_font
+            cell.fill = self.header_fill
+            header_cells.append(cell)
+        ws.append(header_cells)
         
-        # Ajouter les données
-        for row in config_data:
-            config_ws.append(row)
+        for row in rows:
+            ws.append(row)
+    
+    def add(self, config_file, config_data, flow_data):
+        """
+        Ajoute la feuille de configuration (et de flux) d'un fichier analysé
+        """
+        with TIMINGS.stage('save_to_excel'):
+            self._add(config_file, config_data, flow_data)
+    
+    def _add(self, config_file, config_data, flow_data):
+        filename = os.path.basename(config_file)
+        base = filename.replace('.conf', '')
         
-        # Ajuster la largeur des colonnes
-        for column in config_ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            config_ws.column_dimensions[column_letter].width = adjusted_width
+        config_ws = self._create_sheet(base)
+        self._write_sheet(config_ws, self.CONFIG_HEADERS, config_data,
+                          excel_column_widths(self.CONFIG_HEADERS, config_data, 50))
         
-        # Feuille des flux si disponible
         if flow_data['flows']:
-            flow_ws = wb.create_sheet(f"{filename.replace('.conf', '')}_Flux")
-            flow_headers = ['Route', 'Source', 'Type Source', 'Module Source', 
-                           'Destination', 'Type Dest', 'Module Dest', 'Priorité', 'Condition']
-            flow_ws.append(flow_headers)
-            
-            # Appliquer le style d'en-tête
-            for cell in flow_ws[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-            
-            # Ajouter les données de flux
-            for flow in flow_data['flows']:
-                flow_ws.append([
-                    flow['route'], flow['source'], flow['source_type'], flow['source_module'],
-                    flow['destination'], flow['destination_type'], flow['destination_module'],
-                    flow['priority'], flow['condition']
-                ])
-            
-            # Ajuster la largeur des colonnes
-            for column in flow_ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 30)
-                flow_ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Ajouter aux statistiques
+            flow_rows = [[
+                flow['route'], flow['source'], flow['source_type'], flow['source_module'],
+                flow['destination'], flow['destination_type'], flow['destination_module'],
+                flow['priority'], flow['condition']
+            ] for flow in flow_data['flows']]
+            flow_ws = self._create_sheet(config_ws.title, '_Flux')
+            self._write_sheet(flow_ws, self.FLOW_HEADERS, flow_rows,
+                              excel_column_widths(self.FLOW_HEADERS, flow_rows, 30))
+        
         sections = set()
         for row in config_data:
             sections.add(row[0])
         
-        stats_ws.append([
+        stats_row = [
             filename,
             len(config_data),
             len(set(row[1] for row in config_data)),
             ', '.join(sorted(sections))
-        ])
-    
-    # Ajuster les colonnes des statistiques
-    for column in stats_ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        stats_ws.column_dimensions[column_letter].width = adjusted_width
+        ]
+        self.stats_rows.append(stats_row)
+        for index, value in enumerate(stats_row):
+            self.stats_lengths[index] = max(self.stats_lengths[index], len(str(value)))
     
-    # Appliquer le style d'en-tête aux statistiques
-    for cell in stats_ws[1]:
-        cell.font = header_font
-        cell.fill = header_fill
+    def save(self):
+        """
+        Écrit la feuille de statistiques puis enregistre le classeur
+        """
+        widths = [min(length + 2, 50) for length in self.stats_lengths]
+        self._write_sheet(self.stats_ws, self.STATS_HEADERS, self.stats_rows, widths)
+        
+        try:
+            with TIMINGS.stage('save_to_excel'):
+                self.wb.save(self.excel_file)
+            print(f"\nFichier Excel sauvegardé: {self.excel_file}")
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde Excel: {e}")
+
+def save_to_excel(all_configs, excel_file):
+    """
+    Sauvegarde toutes les configurations dans un fichier Excel
+    """
+    if not OPENPYXL_AVAILABLE:
+        print("Erreur: openpyxl n'est pas disponible. Installez-le avec: pip install openpyxl")
+        return
     
-    try:
-        wb.save(excel_file)
-        print(f"\nFichier Excel sauvegardé: {excel_file}")
-    except Exception as e:
-        print(f"Erreur lors de la sauvegarde Excel: {e}")
+    writer = ExcelReportWriter(excel_file)
+    for config_file, (config_data, flow_data) in all_configs.items():
+        writer.add(config_file, config_data, flow_data)
+    writer.save()
 
-def save_multiple_csv(all_configs, flows_csv=False):
+def save_multiple_csv(all_configs, flows_csv=False, base_dir=None):
     """
     Sauvegarde chaque configuration dans un fichier CSV séparé
+
+    Les fichiers sont nommés d'après config_file_key relativement à base_dir (par défaut
+    le répertoire commun des configurations), les séparateurs devenant des _.
     """
+    if base_dir is None:
+        base_dir = config_files_root(all_configs)
     for config_file, (config_data, flow_data) in all_configs.items():
-        filename = os.path.basename(config_file).replace('.conf', '')
+        filename = config_file_key(config_file, base_dir).replace(os.sep, '_')
         
         # Fichier CSV de configuration
         csv_filename = f"{filename}_config.csv"
@@ -799,41 +2269,3085 @@ def save_multiple_csv(all_configs, flows_csv=False):
             except Exception as e:
                 print(f"Erreur lors de la création du CSV des flux {flow_csv_filename}: {e}")
 
-def generate_graphviz_files(all_configs, output_dir="output"):
+# Version du schéma SQLite (--sqlite); une base d'une autre version est reconstruite
+SQLITE_SCHEMA_VERSION = 2
+# Nombre de fichiers écrits par transaction
+SQLITE_BATCH_FILES = 500
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    content_hash TEXT NOT NULL,
+    dependencies_hash TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    sections INTEGER NOT NULL,
+    parameters INTEGER NOT NULL,
+    flows INTEGER NOT NULL,
+    analyzed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    module TEXT
+);
+CREATE TABLE IF NOT EXISTS parameters (
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    section_id INTEGER NOT NULL REFERENCES sections(id),
+    name TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS descriptions (
+    name TEXT PRIMARY KEY,
+    description TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS flows (
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    route TEXT NOT NULL,
+    source_id INTEGER NOT NULL REFERENCES sections(id),
+    destination_id INTEGER NOT NULL REFERENCES sections(id),
+    priority TEXT,
+    condition TEXT
+);
+"""
+
+# Index créés après le premier chargement d'une base vide (plus rapide qu'à chaque insertion)
+SQLITE_INDEXES = """
+CREATE INDEX IF NOT EXISTS files_content_hash ON files (content_hash);
+CREATE INDEX IF NOT EXISTS sections_file ON sections (file_id);
+CREATE INDEX IF NOT EXISTS sections_module ON sections (module, type);
+CREATE INDEX IF NOT EXISTS sections_name ON sections (name);
+CREATE INDEX IF NOT EXISTS parameters_file ON parameters (file_id);
+CREATE INDEX IF NOT EXISTS parameters_section ON parameters (section_id);
+CREATE INDEX IF NOT EXISTS parameters_name_value ON parameters (name, value);
+CREATE INDEX IF NOT EXISTS flows_file ON flows (file_id);
+CREATE INDEX IF NOT EXISTS flows_source ON flows (source_id);
+CREATE INDEX IF NOT EXISTS flows_destination ON flows (destination_id);
+"""
+
+SQLITE_VIEWS = """
+CREATE VIEW IF NOT EXISTS parameter_details AS
+    SELECT f.path, s.type AS section_type, s.name AS section, s.module, p.name AS parameter, p.value
+    FROM parameters p JOIN sections s ON s.id = p.section_id JOIN files f ON f.id = p.file_id;
+CREATE VIEW IF NOT EXISTS flow_details AS
+    SELECT f.path, fl.route, src.name AS source, src.type AS source_type, src.module AS source_module,
+           dst.name AS destination, dst.type AS destination_type, dst.module AS destination_module,
+           fl.priority, fl.condition
+    FROM flows fl JOIN files f ON f.id = fl.file_id
+    JOIN sections src ON src.id = fl.source_id JOIN sections dst ON dst.id = fl.destination_id;
+"""
+
+class SqliteExporter:
     """
-    Génère les fichiers Graphviz (.dot) pour la visualisation des flux
+    Export des configurations dans une base SQLite normalisée et indexée
+
+    Tables files, sections, parameters, descriptions et flows (vues parameter_details
+    et flow_details pour les requêtes). Les lignes sont accumulées puis écrites par
+    lots avec executemany, une transaction par lot. Un fichier déjà présent dont
+    l'empreinte du contenu et celle de ses dépendances (fichiers inclus, variables
+    envvar) n'ont pas changé n'est pas réécrit; les autres remplacent leurs lignes.
+    La signature enregistrée avec chaque fichier (voir QueryIndex.signature) permet à
+    update de ne relire que les fichiers modifiés.
     """
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    # Couleurs pour les différents types de sections
-    colors = {
-        'Input': '#90EE90',      # Vert clair
-        'Output': '#FFB6C1',     # Rose clair
-        'Processor': '#87CEEB',  # Bleu ciel
-        'Extension': '#F0E68C',  # Kaki
-        'Route': '#DDA0DD'       # Prune
-    }
-    
-    # Couleurs pour les routes
-    route_colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8']
-    
-    synthesis_flows = []  # Pour la cartographie de synthèse
-    synthesis_sections = {}
-    
-def sanitize_node_name(name):
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.connection = sqlite3.connect(db_file)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version != SQLITE_SCHEMA_VERSION:
+            # Base vide ou produite par une autre version du schéma
+            with self.connection:
+                for kind, name in self.connection.execute(
+                        "SELECT type, name FROM sqlite_master WHERE type IN ('table', 'view') "
+                        "AND name NOT LIKE 'sqlite_%'").fetchall():
+                    self.connection.execute(f'DROP {kind.upper()} IF EXISTS "{name}"')
+        self.connection.executescript(SQLITE_SCHEMA + SQLITE_VIEWS)
+        self.connection.execute(f'PRAGMA user_version = {SQLITE_SCHEMA_VERSION}')
+        self.indexed = self.connection.execute('SELECT COUNT(*) FROM files').fetchone()[0] > 0
+        if self.indexed:
+            self.connection.executescript(SQLITE_INDEXES)
+        
+        self.known = {path: (file_id, content_hash, dependencies_hash, signature)
+                      for file_id, path, content_hash, dependencies_hash, signature
+                      in self.connection.execute('SELECT id, path, content_hash, dependencies_hash, signature FROM files')}
+        self.next_file_id = (self.connection.execute('SELECT MAX(id) FROM files').fetchone()[0] or 0) + 1
+        self.next_section_id = (self.connection.execute('SELECT MAX(id) FROM sections').fetchone()[0] or 0) + 1
+        self.described = set(name for name, in self.connection.execute('SELECT name FROM descriptions'))
+        self.seen = set()
+        
+        self.replaced = []
+        self.removed_ids = []
+        self.touched = []
+        self.file_rows = []
+        self.section_rows = []
+        self.parameter_rows = []
+        self.flow_rows = []
+        self.description_rows = []
+        self.written = 0
+        self.unchanged = 0
+        self.removed = 0
+
+    @staticmethod
+    def dependencies_hash(flow_data):
+        """
+        Empreinte des fichiers inclus (date, taille), des motifs d'inclusion glob (fichiers
+        correspondants) et des variables envvar d'un résultat
+        """
+        globs = flow_data.get('include_globs', [])
+        if not flow_data['includes'] and not flow_data['environment'] and not globs:
+            return ''
+        digest = hashlib.sha256()
+        for path in flow_data['includes']:
+            digest.update(f"{path}\0{_file_signature(path)}\0".encode('utf-8', 'surrogatepass'))
+        for pattern in globs:
+            digest.update(f"{pattern}\0{_glob_signature(pattern)}\0".encode('utf-8', 'surrogatepass'))
+        for name, value in sorted(flow_data['environment'].items()):
+            digest.update(f"{name}\0{value}\0".encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def is_fresh(self, path):
+        """
+        Indique, sans relire le fichier, si sa signature enregistrée est toujours valide
+        """
+        known = self.known.get(path)
+        if not known or not known[3]:
+            return False
+        file_signature, dependencies, environment, globs = json.loads(known[3])
+        current = (_file_signature(path),
+                   [(dep, _file_signature(dep)) for dep, _ in dependencies],
+                   [(name, os.environ.get(name)) for name, _ in environment],
+                   [(pattern, _glob_signature(pattern)) for pattern, _ in globs])
+        return json.dumps(current) == known[3]
+
+    def add(self, config_file, config_data, flow_data):
+        """
+        Ajoute ou met à jour un fichier (ignoré si son contenu et ses dépendances n'ont pas changé)
+        """
+        path = os.path.abspath(config_file)
+        self.seen.add(path)
+        if self.is_fresh(path):
+            self.unchanged += 1
+            return
+        try:
+            content_hash = file_content_hash(path)
+        except OSError:
+            content_hash = ''
+        dependencies_hash = self.dependencies_hash(flow_data)
+        signature = json.dumps(QueryIndex.signature(path, flow_data))
+        
+        known = self.known.get(path)
+        if known and known[1] == content_hash and known[2] == dependencies_hash:
+            # Fichier touché sans changement de contenu: seule la signature est mise à jour
+            self.known[path] = known[:3] + (signature,)
+            self.touched.append((signature, known[0]))
+            self.unchanged += 1
+            return
+        if known:
+            file_id = known[0]
+            self.replaced.append((file_id,))
+        else:
+            file_id = self.next_file_id
+            self.next_file_id += 1
+        self.known[path] = (file_id, content_hash, dependencies_hash, signature)
+        
+        section_ids = {}
+        for section_name, section_info in flow_data['sections'].items():
+            section_ids[(section_info['type'], section_name)] = self.next_section_id
+            self.section_rows.append((self.next_section_id, file_id, section_info['type'], section_name,
+                                      section_info['module']))
+            self.next_section_id += 1
+        
+        parameters = 0
+        for section_type, section_name, param_name, value, description in config_data:
+            section_id = section_ids.get((section_type, section_name))
+            if section_id is None:
+                # Section redéfinie sous un autre type: seule la dernière figure dans flow_data
+                section_id = section_ids[(section_type, section_name)] = self.next_section_id
+                self.section_rows.append((section_id, file_id, section_type, section_name, None))
+                self.next_section_id += 1
+            self.parameter_rows.append((file_id, section_id, param_name, value))
+            if param_name not in self.described:
+                self.described.add(param_name)
+                self.description_rows.append((param_name, description))
+            parameters += 1
+        
+        for flow in flow_data['flows']:
+            self.flow_rows.append((file_id, flow['route'], section_ids[(flow['source_type'], flow['source'])],
+                                   section_ids[(flow['destination_type'], flow['destination'])],
+                                   flow['priority'], flow['condition']))
+        
+        self.file_rows.append((file_id, path, content_hash, dependencies_hash, signature, len(flow_data['sections']),
+                               parameters, len(flow_data['flows']), time.time()))
+        self.written += 1
+        if len(self.file_rows) >= SQLITE_BATCH_FILES:
+            self.flush()
+
+    def update(self, directory, jobs=1, cache=None, use_mmap=False):
+        """
+        Analyse et écrit seulement les fichiers du répertoire absents de la base ou modifiés
+
+        Retourne le nombre de fichiers analysés.
+        """
+        config_files = [os.path.abspath(path) for path in iter_config_files(directory)]
+        self.seen.update(config_files)
+        stale = [path for path in config_files if not self.is_fresh(path)]
+        self.unchanged += len(config_files) - len(stale)
+        variants = ContentVariants()
+        for config_file, config_data, flow_data, output in iter_parsed_configs(stale, jobs, cache, use_mmap, variants):
+            if output:
+                print(output, end='')
+            self.add(config_file, config_data, flow_data)
+        return len(stale)
+
+    def remove(self, config_file):
+        """
+        Supprime un fichier de la base
+        """
+        path = os.path.abspath(config_file)
+        known = self.known.pop(path, None)
+        if known:
+            self.removed_ids.append((known[0],))
+            self.removed += 1
+
+    def flush(self):
+        """
+        Écrit les lignes accumulées dans une transaction
+        """
+        with self.connection:
+            execute = self.connection.executemany
+            stale = self.replaced + self.removed_ids
+            if stale:
+                for table in ('parameters', 'flows', 'sections'):
+                    execute(f'DELETE FROM {table} WHERE file_id = ?', stale)
+                execute('DELETE FROM files WHERE id = ?', self.removed_ids)
+            execute('UPDATE files SET signature = ? WHERE id = ?', self.touched)
+            execute('INSERT INTO files (id, path, content_hash, dependencies_hash, signature, sections, parameters, '
+                    'flows, analyzed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET '
+                    'content_hash = excluded.content_hash, dependencies_hash = excluded.dependencies_hash, '
+                    'signature = excluded.signature, '
+                    'sections = excluded.sections, parameters = excluded.parameters, flows = excluded.flows, '
+                    'analyzed_at = excluded.analyzed_at', self.file_rows)
+            execute('INSERT INTO sections (id, file_id, type, name, module) VALUES (?, ?, ?, ?, ?)', self.section_rows)
+            execute('INSERT INTO parameters (file_id, section_id, name, value) VALUES (?, ?, ?, ?)', self.parameter_rows)
+            execute('INSERT INTO flows (file_id, route, source_id, destination_id, priority, condition) '
+                    'VALUES (?, ?, ?, ?, ?, ?)', self.flow_rows)
+            execute('INSERT OR IGNORE INTO descriptions (name, description) VALUES (?, ?)', self.description_rows)
+        for rows in (self.replaced, self.removed_ids, self.touched, self.file_rows, self.section_rows, self.parameter_rows,
+                     self.flow_rows, self.description_rows):
+            rows.clear()
+
+    def save(self, directory=None):
+        """
+        Écrit le dernier lot et ferme la base
+
+        Avec directory, les fichiers de ce répertoire présents dans la base mais
+        absents de l'analyse sont supprimés.
+        """
+        if directory:
+            prefix = os.path.join(os.path.abspath(directory), '')
+            for path in [path for path in self.known if path.startswith(prefix) and path not in self.seen]:
+                self.remove(path)
+        try:
+            self.flush()
+            if not self.indexed:
+                self.connection.executescript(SQLITE_INDEXES)
+                self.indexed = True
+            self.connection.execute('PRAGMA optimize')
+            print(f"Base SQLite mise à jour: {self.db_file} ({self.written} fichier(s) écrit(s), "
+                  f"{self.unchanged} inchangé(s), {self.removed} supprimé(s))")
+        except sqlite3.Error as e:
+            print(f"Erreur lors de l'écriture de la base SQLite {self.db_file}: {e}")
+        finally:
+            self.connection.close()
+
+# Version du format de l'index de requêtes (--index-file)
+QUERY_INDEX_VERSION = 3
+# Proportion de sections de fichiers retirés au-delà de laquelle l'index est reconstruit
+QUERY_INDEX_MAX_STALE = 0.25
+
+QUERY_TOKEN_RE = re.compile(r'\s*(?:(\(|\)|->|!=|=)|"([^"]*)"|\'([^\']*)\'|((?:[^\s()=!"\'-]|-(?!>)|!(?!=))+))')
+
+class QueryIndex:
     """
-    Nettoie un nom de nœud pour qu'il soit valide en Graphviz
+    Index inversé des sections et des flux pour le mode requête (--query)
+
+    Chaque clé (paramètre en minuscules, ou les pseudo-paramètres Section, Name et
+    Config pour le type, le nom de section et le nom de fichier) associe chaque valeur
+    en minuscules à la liste croissante des sections qui la portent. Les flux sont
+    indexés par couple (module source, module destination), de même que chaque couple
+    de sections reliées indirectement le long d'une route (entrée => processeur =>
+    sortie donne aussi entrée -> sortie). L'index est enregistré
+    avec la signature de chaque fichier: seuls les fichiers modifiés, ajoutés ou
+    supprimés sont réanalysés lors d'une mise à jour; les sections d'un fichier
+    retiré restent dans les listes mais sont ignorées jusqu'à la reconstruction.
     """
-    # Remplacer les caractères problématiques
-    sanitized = re.sub(r'[^a-zA-Z0-9_]', '_', str(name))
-    # S'assurer que le nom ne commence pas par un chiffre
-    if sanitized and sanitized[0].isdigit():
-        sanitized = 'node_' + sanitized
-    # S'assurer que le nom n'est pas vide
-    if not sanitized:
-        sanitized = 'unnamed_node'
-    return sanitized
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        self.files = {}
+        self.paths = []
+        self.sections = []
+        self.flows = []
+        self.terms = {}
+        self.flow_terms = {}
+        self.dead = set()
+
+    @staticmethod
+    def signature(config_file, flow_data):
+        """
+        Signature d'un fichier: date et taille, fichiers inclus, motifs d'inclusion glob
+        et variables envvar
+        """
+        return (_file_signature(config_file),
+                tuple((path, _file_signature(path)) for path in flow_data['includes']),
+                tuple(sorted(flow_data['environment'].items())),
+                tuple((pattern, _glob_signature(pattern)) for pattern in flow_data.get('include_globs', [])))
+
+    @staticmethod
+    def is_fresh(config_file, signature):
+        file_signature, dependencies, environment, globs = signature
+        return (_file_signature(config_file) == file_signature
+                and all(_file_signature(path) == value for path, value in dependencies)
+                and all(os.environ.get(name) == value for name, value in environment)
+                and all(_glob_signature(pattern) == value for pattern, value in globs))
+
+    def _post(self, key, value, section_id):
+        self.terms.setdefault(key, {}).setdefault(value.lower(), array('I')).append(section_id)
+
+    def add(self, config_file, config_data, flow_data):
+        """
+        Ajoute les sections, paramètres et flux d'un fichier (remplace une version précédente)
+        """
+        path = os.path.abspath(config_file)
+        self.remove(path)
+        file_id = len(self.paths)
+        self.paths.append(path)
+        first_section = len(self.sections)
+        
+        config_name = os.path.basename(path)
+        section_ids = {}
+        
+        def section_id_of(section_type, section_name, module):
+            key = (section_type, section_name)
+            section_id = section_ids.get(key)
+            if section_id is None:
+                section_id = section_ids[key] = len(self.sections)
+                self.sections.append((file_id, section_type, section_name, module))
+                self._post('section', section_type, section_id)
+                self._post('name', section_name, section_id)
+                self._post('config', config_name, section_id)
+            return section_id
+        
+        for section_name, section_info in flow_data['sections'].items():
+            section_id_of(section_info['type'], section_name, section_info['module'])
+        for section_type, section_name, param_name, value, _ in config_data:
+            section_id = section_id_of(section_type, section_name, None)
+            self._post(param_name.lower(), value, section_id)
+        
+        for flow in flow_data['flows']:
+            flow_id = len(self.flows)
+            self.flows.append((file_id, flow['route'], section_ids[(flow['source_type'], flow['source'])],
+                               section_ids[(flow['destination_type'], flow['destination'])]))
+            key = (flow['source_module'].lower(), flow['destination_module'].lower())
+            self.flow_terms.setdefault(key, array('I')).append(flow_id)
+        
+        # Couples atteignables au-delà d'une étape: une entrée par paire d'étapes non adjacentes
+        sections = flow_data['sections']
+        for route in flow_data['routes']:
+            steps = [[name for name in (part.strip() for part in step.split(',')) if name in sections]
+                     for step in route['path'].split('=>')]
+            pairs = set()
+            for position, step in enumerate(steps):
+                for later in steps[position + 2:]:
+                    pairs.update((source, destination) for source in step for destination in later)
+            for source, destination in sorted(pairs):
+                flow_id = len(self.flows)
+                self.flows.append((file_id, route['name'],
+                                   section_ids[(sections[source]['type'], source)],
+                                   section_ids[(sections[destination]['type'], destination)]))
+                key = (sections[source]['module'].lower(), sections[destination]['module'].lower())
+                self.flow_terms.setdefault(key, array('I')).append(flow_id)
+        
+        # Les sections d'un fichier occupent des identifiants consécutifs
+        self.files[path] = (file_id, self.signature(path, flow_data), first_section, len(self.sections))
+
+    def remove(self, path):
+        """
+        Retire un fichier (ses sections restent indexées mais ne sont plus retournées)
+        """
+        entry = self.files.pop(path, None)
+        if entry is not None:
+            file_id, _, first_section, end_section = entry
+            self.paths[file_id] = None
+            self.dead.update(range(first_section, end_section))
+
+    def update(self, jobs=1, cache=None, use_mmap=False):
+        """
+        Réanalyse les fichiers modifiés ou ajoutés et retire les fichiers supprimés
+
+        Retourne le nombre de fichiers réanalysés et retirés.
+        """
+        config_files = [os.path.abspath(path) for path in iter_config_files(self.directory)]
+        present = set(config_files)
+        removed = [path for path in self.files if path not in present]
+        for path in removed:
+            self.remove(path)
+        stale = [path for path in config_files
+                 if path not in self.files or not self.is_fresh(path, self.files[path][1])]
+        
+        if len(self.dead) > QUERY_INDEX_MAX_STALE * max(1, len(self.sections)):
+            # Trop de sections mortes: reconstruire l'index complet
+            self.__init__(self.directory)
+            stale = config_files
+        
+        variants = ContentVariants()
+        for config_file, config_data, flow_data, output in iter_parsed_configs(stale, jobs, cache, use_mmap, variants):
+            if output:
+                print(output, end='', file=sys.stderr)
+            self.add(config_file, config_data, flow_data)
+        return len(stale), len(removed)
+
+    def save(self, index_file):
+        """
+        Enregistre l'index (écriture atomique)
+        """
+        temp_file = index_file + '.tmp'
+        with open(temp_file, 'wb') as f:
+            pickle.dump((QUERY_INDEX_VERSION, self.__dict__), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, index_file)
+
+    @classmethod
+    def load(cls, index_file, directory=None):
+        """
+        Charge un index enregistré, ou None s'il est absent, illisible ou d'un autre répertoire
+        """
+        try:
+            with open(index_file, 'rb') as f:
+                version, state = pickle.load(f)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            return None
+        if version != QUERY_INDEX_VERSION:
+            return None
+        index = cls.__new__(cls)
+        index.__dict__.update(state)
+        if directory and os.path.abspath(directory) != index.directory:
+            return None
+        return index
+
+    def postings(self, key, value):
+        """
+        Sections dont le paramètre key vaut value (motifs * et ? acceptés), toutes si value est None
+        """
+        values = self.terms.get(key.lower(), {})
+        if value is None:
+            matched = values.values()
+        elif '*' in value or '?' in value:
+            pattern = value.lower()
+            matched = [ids for candidate, ids in values.items() if fnmatch.fnmatchcase(candidate, pattern)]
+        else:
+            ids = values.get(value.lower())
+            matched = [ids] if ids is not None else []
+        result = set()
+        for ids in matched:
+            result.update(ids)
+        return result
+
+    def flow_postings(self, source_module, destination_module):
+        """
+        Flux entre deux modules (motifs * et ? acceptés)
+        """
+        source_module = source_module.lower()
+        destination_module = destination_module.lower()
+        if not any(char in source_module + destination_module for char in '*?'):
+            return set(self.flow_terms.get((source_module, destination_module), ()))
+        result = set()
+        for (source, destination), ids in self.flow_terms.items():
+            if fnmatch.fnmatchcase(source, source_module) and fnmatch.fnmatchcase(destination, destination_module):
+                result.update(ids)
+        return result
+
+    def query(self, expression):
+        """
+        Évalue une requête et retourne (sections, flux) correspondants, triés
+
+        Grammaire: conditions Param=valeur, Param!=valeur ou Param (présence), et
+        flow module -> module, combinées par AND, OR, NOT et parenthèses. Une condition
+        flow retient les sections source et destination des flux correspondants.
+        """
+        tokens = []
+        position = 0
+        expression = expression.strip()
+        while position < len(expression):
+            match = QUERY_TOKEN_RE.match(expression, position)
+            if not match or match.end() == position:
+                raise ValueError(f"Requête invalide près de: {expression[position:]}")
+            position = match.end()
+            operator, double_quoted, single_quoted, word = match.groups()
+            if operator:
+                tokens.append(('op', operator))
+            elif word is not None:
+                tokens.append(('word', word))
+            else:
+                tokens.append(('value', double_quoted if double_quoted is not None else single_quoted))
+        
+        matched_flows = set()
+        index = 0
+        
+        def peek(offset=0):
+            return tokens[index + offset] if index + offset < len(tokens) else (None, None)
+        
+        def take(kind=None, value=None):
+            nonlocal index
+            token = peek()
+            if token[0] is None or (kind and token[0] != kind) or (value and token[1] != value):
+                before = ' '.join(str(t[1]) for t in tokens[:index])
+                if token[0] is None:
+                    raise ValueError(f"Requête incomplète après '{before}'")
+                raise ValueError(f"Requête invalide: '{token[1]}' inattendu après '{before}'")
+            index += 1
+            return token[1]
+        
+        def keyword(word):
+            token = peek()
+            return token[0] == 'word' and token[1].upper() == word
+        
+        def universe():
+            return set(range(len(self.sections))) - self.dead
+        
+        def parse_or():
+            result = parse_and()
+            while keyword('OR'):
+                take()
+                result = result | parse_and()
+            return result
+        
+        def parse_and():
+            result = parse_not()
+            while keyword('AND'):
+                take()
+                result = result & parse_not()
+            return result
+        
+        def parse_not():
+            if keyword('NOT'):
+                take()
+                return universe() - parse_not()
+            return parse_atom()
+        
+        def parse_atom():
+            if peek() == ('op', '('):
+                take()
+                result = parse_or()
+                take('op', ')')
+                return result
+            if keyword('FLOW') and peek(2) == ('op', '->'):
+                take()
+                source = take()
+                take('op', '->')
+                destination = take()
+                flow_ids = self.flow_postings(source, destination)
+                matched_flows.update(flow_ids)
+                result = set()
+                for flow_id in flow_ids:
+                    result.add(self.flows[flow_id][2])
+                    result.add(self.flows[flow_id][3])
+                return result
+            key = take('word')
+            if peek() in (('op', '='), ('op', '!=')):
+                operator = take()
+                value = take()
+                result = self.postings(key, value)
+                return universe() - result if operator == '!=' else result
+            return self.postings(key, None)
+        
+        result = parse_or()
+        if index < len(tokens):
+            raise ValueError(f"Requête invalide près de: {tokens[index][1]}")
+        result -= self.dead
+        flows = sorted(flow_id for flow_id in matched_flows
+                       if self.flows[flow_id][2] in result or self.flows[flow_id][3] in result)
+        return sorted(result), flows
+
+def display_query_results(index, section_ids, flow_ids, format_type='table'):
+    """
+    Affiche les sections et flux retournés par QueryIndex.query
+    """
+    headers = ['Fichier', 'Section', 'Nom Section', 'Module']
+    rows = []
+    for section_id in section_ids:
+        file_id, section_type, section_name, module = index.sections[section_id]
+        rows.append([index.paths[file_id], section_type, section_name, module or 'N/A'])
+    flow_headers = ['Fichier', 'Route', 'Source', 'Module Source', 'Destination', 'Module Dest']
+    flow_rows = []
+    for flow_id in flow_ids:
+        file_id, route, source_id, destination_id = index.flows[flow_id]
+        source, destination = index.sections[source_id], index.sections[destination_id]
+        flow_rows.append([index.paths[file_id], route, source[2], source[3], destination[2], destination[3]])
+    
+    if format_type in ('json', 'jsonl'):
+        records = [dict(zip(['file', 'section', 'section_name', 'module'], row)) for row in rows]
+        flow_records = [dict(zip(['file', 'route', 'source', 'source_module', 'destination', 'destination_module'],
+                                 row)) for row in flow_rows]
+        if format_type == 'json':
+            print(json.dumps({'sections': records, 'flows': flow_records}, indent=2, ensure_ascii=False))
+        else:
+            for record in records:
+                print(json.dumps(dict(record, record='section'), ensure_ascii=False))
+            for record in flow_records:
+                print(json.dumps(dict(record, record='flow'), ensure_ascii=False))
+        return
+    
+    for table_headers, table_rows in ((headers, rows), (flow_headers, flow_rows)):
+        if not table_rows:
+            continue
+        if format_type == 'csv':
+            print(','.join(table_headers))
+            for row in table_rows:
+                print(','.join('"' + str(cell).replace('"', '""') + '"' if ',' in str(cell) or '"' in str(cell)
+                               else str(cell) for cell in row))
+        elif TABULATE_AVAILABLE:
+            print(tabulate(table_rows, headers=table_headers, tablefmt='grid'))
+        else:
+            print(simple_table_format(table_rows, table_headers))
+        print()
+
+# Directives d'inclusion: un fichier identique n'est ignoré que si ses inclusions le sont aussi
+INCLUDE_LINE_RE = re.compile(rb'^[ \t]*(include(?:_dir)?)[ \t]+(.+?)[ \t]*\r?$', re.IGNORECASE | re.MULTILINE)
+
+DIFF_CHANGE_LABELS = {
+    'file_added': 'Fichier ajouté',
+    'file_removed': 'Fichier supprimé',
+    'section_added': 'Section ajoutée',
+    'section_removed': 'Section supprimée',
+    'parameter_added': 'Paramètre ajouté',
+    'parameter_removed': 'Paramètre supprimé',
+    'parameter_modified': 'Paramètre modifié',
+    'flow_added': 'Flux ajouté',
+    'flow_removed': 'Flux supprimé'
+}
+
+def include_dependencies_digest(file_path, root, memo, stack=()):
+    """
+    Empreinte des fichiers inclus (transitivement) par un fichier, sans l'analyser
+
+    Chaque fichier résolu contribue son chemin relatif à root (absolu s'il est hors de
+    l'arborescence) et l'empreinte SHA-256 de son contenu: deux fichiers identiques
+    dont les inclusions ont la même empreinte produisent le même résultat d'analyse.
+    Retourne '' sans inclusion, None si un chemin dépend d'une constante %NOM%
+    (l'analyse complète est alors nécessaire). memo évite de relire les fichiers
+    inclus partagés par plusieurs fichiers de l'arborescence.
+    """
+    real_path = os.path.realpath(file_path)
+    if real_path in memo:
+        return memo[real_path]
+    if real_path in stack:
+        return ''
+    with open(file_path, 'rb') as f:
+        directives = INCLUDE_LINE_RE.findall(f.read())
+    if not directives:
+        memo[real_path] = ''
+        return ''
+    
+    digest = hashlib.sha256()
+    for keyword, target in directives:
+        if b'%' in target:
+            memo[real_path] = None
+            return None
+        # Les avertissements (fichier introuvable) seront donnés par l'analyse complète
+        with contextlib.redirect_stdout(io.StringIO()):
+            included_paths = resolve_include_paths(keyword.decode(), target.decode('utf-8', 'surrogateescape'),
+                                                   os.path.dirname(file_path))
+        digest.update(b'\0' + keyword.lower() + b'\0' + str(len(included_paths)).encode())
+        for included in included_paths:
+            nested = include_dependencies_digest(included, root, memo, stack + (real_path,))
+            if nested is None:
+                memo[real_path] = None
+                return None
+            relative_path = os.path.relpath(os.path.abspath(included), root)
+            if relative_path.startswith(os.pardir):
+                relative_path = os.path.abspath(included)
+            digest.update(f"\0{relative_path}\0{file_content_hash(included)}\0{nested}".encode(
+                'utf-8', 'surrogatepass'))
+    memo[real_path] = digest.hexdigest()
+    return memo[real_path]
+
+def config_section_digests(config_data, flow_data):
+    """
+    Retourne {(type, nom): (empreinte, paramètres)} pour les sections d'une configuration
+
+    L'empreinte porte sur le contenu normalisé de la section: la suite de ses
+    paramètres (nom en minuscules, valeur) après substitution des constantes,
+    indépendamment des commentaires, espaces et retours à la ligne.
+    """
+    sections = {(section_info['type'], section_name): [] for section_name, section_info in flow_data['sections'].items()}
+    for section_type, section_name, param_name, value, _ in config_data:
+        sections.setdefault((section_type, section_name), []).append((param_name, value))
+    
+    digests = {}
+    for key, params in sections.items():
+        digest = hashlib.blake2b(digest_size=16)
+        for param_name, value in params:
+            digest.update(f"{param_name.lower()}\0{value}\0".encode('utf-8', 'surrogatepass'))
+        digests[key] = (digest.digest(), params)
+    return digests
+
+def diff_section_params(old_params, new_params):
+    """
+    Compare les paramètres d'une section: retourne [(changement, paramètre, ancienne, nouvelle)]
+
+    Un paramètre présent une seule fois de chaque côté avec une autre valeur est
+    modifié; les paramètres répétés (Exec...) sont comparés valeur par valeur.
+    """
+    old_values = defaultdict(list)
+    new_values = defaultdict(list)
+    for param_name, value in old_params:
+        old_values[param_name].append(value)
+    for param_name, value in new_params:
+        new_values[param_name].append(value)
+    
+    changes = []
+    for param_name in list(old_values) + [name for name in new_values if name not in old_values]:
+        before, after = old_values.get(param_name, []), new_values.get(param_name, [])
+        if before == after:
+            continue
+        if len(before) == 1 and len(after) == 1:
+            changes.append(('parameter_modified', param_name, before[0], after[0]))
+            continue
+        removed = Counter(before) - Counter(after)
+        added = Counter(after) - Counter(before)
+        changes.extend(('parameter_removed', param_name, value, None) for value in removed.elements())
+        changes.extend(('parameter_added', param_name, None, value) for value in added.elements())
+    return changes
+
+def diff_config_results(relative_path, old_result, new_result):
+    """
+    Liste les changements entre deux résultats de parse_nxlog_config (None si le fichier est absent)
+    """
+    changes = []
+    
+    def change(kind, section_type=None, section_name=None, parameter=None, old=None, new=None):
+        changes.append({'file': relative_path, 'change': kind, 'section_type': section_type,
+                        'section': section_name, 'parameter': parameter, 'old': old, 'new': new})
+    
+    if old_result is None:
+        change('file_added')
+    elif new_result is None:
+        change('file_removed')
+    
+    old_sections = config_section_digests(*old_result) if old_result else {}
+    new_sections = config_section_digests(*new_result) if new_result else {}
+    for key, (digest, params) in old_sections.items():
+        if key not in new_sections:
+            change('section_removed', *key)
+        elif new_sections[key][0] != digest:
+            # Seules les sections d'empreinte différente sont comparées ligne à ligne
+            for kind, param_name, old, new in diff_section_params(params, new_sections[key][1]):
+                change(kind, key[0], key[1], param_name, old, new)
+    for key in new_sections:
+        if key not in old_sections:
+            change('section_added', *key)
+    
+    old_flows = set((flow['route'], flow['source'], flow['destination']) for flow in old_result[1]['flows']) \
+        if old_result else set()
+    new_flows = set((flow['route'], flow['source'], flow['destination']) for flow in new_result[1]['flows']) \
+        if new_result else set()
+    for route, source, destination in sorted(old_flows - new_flows):
+        change('flow_removed', 'Route', route, None, f"{source} -> {destination}", None)
+    for route, source, destination in sorted(new_flows - old_flows):
+        change('flow_added', 'Route', route, None, None, f"{source} -> {destination}")
+    return changes
+
+def diff_trees(old_dir, new_dir, jobs=1, cache=None, use_mmap=False):
+    """
+    Compare deux arborescences de configurations
+
+    Les fichiers sont appariés par chemin relatif. Un fichier au contenu identique
+    (empreinte SHA-256) dont les fichiers inclus sont eux aussi identiques est ignoré
+    sans être analysé; seuls les fichiers modifiés, ajoutés ou supprimés, et ceux dont
+    une inclusion a changé, sont analysés, en parallèle avec jobs.
+    Retourne (changements, résumé).
+    """
+    old_files = {os.path.relpath(path, old_dir): path for path in iter_config_files(old_dir)}
+    new_files = {os.path.relpath(path, new_dir): path for path in iter_config_files(new_dir)}
+    
+    identical = 0
+    to_parse = []
+    pairs = []
+    old_memo, new_memo = {}, {}
+    for relative_path in sorted(set(old_files) | set(new_files)):
+        old_path, new_path = old_files.get(relative_path), new_files.get(relative_path)
+        if old_path and new_path:
+            try:
+                unchanged = (os.path.getsize(old_path) == os.path.getsize(new_path)
+                             and file_content_hash(old_path) == file_content_hash(new_path))
+                if unchanged:
+                    new_includes = include_dependencies_digest(new_path, new_dir, new_memo)
+                    unchanged = (new_includes is not None
+                                 and include_dependencies_digest(old_path, old_dir, old_memo) == new_includes)
+            except OSError:
+                unchanged = False
+            if unchanged:
+                identical += 1
+                continue
+        pairs.append((relative_path, old_path, new_path))
+        to_parse.extend(path for path in (old_path, new_path) if path)
+    
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    results = {}
+    for config_file, config_data, flow_data, output in iter_parsed_configs(to_parse, jobs, cache, use_mmap,
+                                                                           ContentVariants()):
+        if output:
+            print(output, end='')
+        results[config_file] = (config_data, flow_data)
+    
+    changes = []
+    for relative_path, old_path, new_path in pairs:
+        changes.extend(diff_config_results(relative_path, results.get(old_path), results.get(new_path)))
+    
+    summary = {
+        'old_dir': old_dir,
+        'new_dir': new_dir,
+        'files_compared': len(set(old_files) | set(new_files)),
+        'files_identical': identical,
+        'files_parsed': len(to_parse),
+        'changes': dict(Counter(change['change'] for change in changes))
+    }
+    return changes, summary
+
+def display_diff(changes, summary, format_type='table'):
+    """
+    Affiche les changements retournés par diff_trees
+    """
+    if format_type == 'json':
+        print(json.dumps({'summary': summary, 'changes': changes}, indent=2, ensure_ascii=False))
+        return
+    if format_type == 'jsonl':
+        for change in changes:
+            print(json.dumps(change, ensure_ascii=False))
+        print(json.dumps(dict(summary, record='summary'), ensure_ascii=False))
+        return
+    
+    headers = ['Fichier', 'Changement', 'Section', 'Nom Section', 'Paramètre', 'Ancienne valeur', 'Nouvelle valeur']
+    rows = [[change['file'], DIFF_CHANGE_LABELS[change['change']], change['section_type'] or '',
+             change['section'] or '', change['parameter'] or '', change['old'] or '', change['new'] or '']
+            for change in changes]
+    if format_type == 'csv':
+        print(','.join(headers))
+        for row in rows:
+            print(','.join('"' + cell.replace('"', '""') + '"' if ',' in cell or '"' in cell or '\n' in cell
+                           else cell for cell in row))
+    elif rows:
+        print(tabulate(rows, headers=headers, tablefmt='grid') if TABULATE_AVAILABLE
+              else simple_table_format(rows, headers))
+    
+    print(f"\nComparaison {summary['old_dir']} -> {summary['new_dir']}: {summary['files_compared']} fichier(s), "
+          f"{summary['files_identical']} identique(s), {summary['files_parsed']} analysé(s)",
+          file=sys.stderr if format_type == 'csv' else sys.stdout)
+    for kind, label in DIFF_CHANGE_LABELS.items():
+        if summary['changes'].get(kind):
+            print(f"  {label}: {summary['changes'][kind]}", file=sys.stderr if format_type == 'csv' else sys.stdout)
+    if not changes:
+        print("Aucune différence.", file=sys.stderr if format_type == 'csv' else sys.stdout)
+
+# Seuils des règles --lint-perf
+LINT_MIN_NETWORK_BUFFER = 16384
+LINT_FAST_POLL_GLOBS = 5
+LINT_MAX_INPUT_FANOUT = 4
+LINT_MAX_ROUTE_PROCESSORS = 3
+LINT_NETWORK_OUTPUTS = ('om_tcp', 'om_ssl', 'om_udp', 'om_udpspoof', 'om_http', 'om_batchcompress')
+LINT_SEVERITIES = ('info', 'warning', 'error')
+LINT_SIZE_SUFFIXES = {'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+LINT_TRUE_VALUES = ('true', 'yes', 'on', '1')
+
+# Règles enregistrées par lint_rule: {identifiant: règle}
+LINT_RULES = {}
+
+def lint_rule(rule_id, severity, description, scope='section', modules=None, section_types=None):
+    """
+    Enregistre une règle de --lint-perf (décorateur)
+
+    scope 'section': check(nom, params, contexte) pour chaque section dont le module
+    figure dans modules et le type dans section_types (toutes si None); scope 'route': check(nom, étapes, contexte)
+    pour chaque route; scope 'config': check(contexte) une fois par configuration.
+    Les paramètres sont indexés en minuscules. check retourne un message, ou une
+    liste de (section, message) pour une règle 'config', et None si rien n'est à signaler.
+    """
+    if severity not in LINT_SEVERITIES:
+        raise ValueError(f"Sévérité inconnue: {severity}")
+    
+    def register(check):
+        LINT_RULES[rule_id] = {
+            'id': rule_id,
+            'severity': severity,
+            'description': description,
+            'scope': scope,
+            'modules': tuple(module.lower() for module in modules) if modules else None,
+            'section_types': tuple(section_types) if section_types else None,
+            'check': check
+        }
+        return check
+    return register
+
+def lint_number(value):
+    """
+    Convertit une valeur numérique (suffixes K, M, G acceptés), None si elle n'est pas numérique
+    """
+    value = str(value).strip().strip('"\'')
+    multiplier = LINT_SIZE_SUFFIXES.get(value[-1:].lower(), 1)
+    if multiplier != 1:
+        value = value[:-1]
+    try:
+        return float(value) * multiplier
+    except ValueError:
+        return None
+
+def lint_bool(value):
+    """
+    Indique si une valeur de paramètre est vraie (TRUE, yes, on, 1)
+    """
+    return str(value).strip().strip('"\'').lower() in LINT_TRUE_VALUES
+
+@lint_rule('PERF001', 'warning', 'BufferSize trop petit sur une sortie réseau', modules=LINT_NETWORK_OUTPUTS)
+def lint_small_network_buffer(section_name, params, context):
+    size = lint_number(params.get('buffersize', ''))
+    if size is not None and size < LINT_MIN_NETWORK_BUFFER:
+        return (f"BufferSize {params['buffersize']} < {LINT_MIN_NETWORK_BUFFER} octets: "
+                f"écritures réseau fragmentées, débit limité")
+
+@lint_rule('PERF002', 'warning', 'PollInterval inférieur à 1 s sur de nombreux im_file avec motifs', scope='config')
+def lint_fast_polling_globs(context):
+    fast = []
+    for section_name, params in context['modules'].get('im_file', ()):
+        if not any(char in params.get('file', '') for char in '*?['):
+            continue
+        # PollInterval absent ou non numérique: valeur par défaut de 1 s
+        interval = lint_number(params.get('pollinterval', ''))
+        if (1 if interval is None else interval) < 1:
+            fast.append(section_name)
+    if len(fast) >= LINT_FAST_POLL_GLOBS:
+        names = ', '.join(fast[:5]) + (', ...' if len(fast) > 5 else '')
+        return [(None, f"{len(fast)} im_file avec motif scrutés plus d'une fois par seconde ({names}): "
+                       f"chaque cycle relit les répertoires, augmentez PollInterval")]
+
+@lint_rule('PERF003', 'warning', 'Sync activé sur une sortie om_file', modules=('om_file',))
+def lint_file_sync(section_name, params, context):
+    if lint_bool(params.get('sync', '')):
+        inputs = len(context['fanin'].get(section_name, ()))
+        return (f"Sync TRUE: fsync après chaque événement ({inputs} entrée(s) alimentent cette sortie), "
+                f"préférez FlushInterval/FlushLimit")
+
+@lint_rule('PERF004', 'warning', 'BatchSize ou Compression absent sur om_http', modules=('om_http',))
+def lint_http_batching(section_name, params, context):
+    missing = [message for key, message in (('batchsize', "BatchSize absent: une requête HTTP par événement"),
+                                            ('compression', "Compression absent: corps envoyés non compressés"))
+               if key not in params]
+    if missing:
+        return '; '.join(missing)
+
+@lint_rule('PERF005', 'warning', 'Entrée distribuée vers de nombreuses sorties', section_types=('Input',))
+def lint_input_fanout(section_name, params, context):
+    outputs = context['fanout'].get(section_name, ())
+    if len(outputs) >= LINT_MAX_INPUT_FANOUT:
+        return (f"{len(outputs)} sorties alimentées par cette entrée: chaque événement est copié "
+                f"et la sortie la plus lente freine les autres")
+
+@lint_rule('PERF006', 'info', 'Longue chaîne de processeurs dans une route', scope='route')
+def lint_route_processors(route_name, steps, context):
+    processors = sum(len(step) for step in steps[1:-1])
+    if processors >= LINT_MAX_ROUTE_PROCESSORS:
+        return f"{processors} processeurs en série: une file d'attente et une copie par étape"
+
+def lint_config(flow_data, rules=None):
+    """
+    Applique les règles de performance à une configuration analysée
+
+    Les routes sont parcourues une fois pour calculer les entrées et sorties reliées,
+    puis l'index des sections une seule fois: chaque section n'est soumise qu'aux
+    règles de son module. Retourne une liste de constats (dictionnaires).
+    """
+    rules = list(LINT_RULES.values()) if rules is None else rules
+    sections = flow_data['sections']
+    
+    # Entrées -> sorties de chaque route (première et dernière étape du chemin)
+    fanout = defaultdict(set)
+    fanin = defaultdict(set)
+    route_steps = []
+    for route in flow_data['routes']:
+        steps = [[name for name in (part.strip() for part in step.split(',')) if name in sections]
+                 for step in route['path'].split('=>')]
+        if len(steps) < 2:
+            continue
+        route_steps.append((route['name'], steps))
+        for source in steps[0]:
+            fanout[source].update(steps[-1])
+        for destination in steps[-1]:
+            fanin[destination].update(steps[0])
+    context = {'fanout': fanout, 'fanin': fanin, 'modules': defaultdict(list)}
+    
+    # Règles de section applicables à chaque module, résolues une fois par appel
+    generic = [rule for rule in rules if rule['scope'] == 'section' and rule['modules'] is None]
+    by_module = {}
+    for rule in rules:
+        if rule['scope'] == 'section' and rule['modules'] is not None:
+            for module in rule['modules']:
+                by_module.setdefault(module, list(generic)).append(rule)
+    
+    findings = []
+    
+    def report(rule, section_name, module, message):
+        findings.append({'rule': rule['id'], 'severity': rule['severity'], 'scope': rule['scope'],
+                         'section': section_name, 'module': module, 'message': message})
+    
+    for section_name, section_info in sections.items():
+        module = (section_info.get('module') or '').lower()
+        params = {name.lower(): value for name, value in section_info['params'].items()}
+        if module:
+            context['modules'][module].append((section_name, params))
+        for rule in by_module.get(module, generic):
+            if rule['section_types'] and section_info['type'] not in rule['section_types']:
+                continue
+            message = rule['check'](section_name, params, context)
+            if message:
+                report(rule, section_name, module or None, message)
+    
+    for rule in rules:
+        if rule['scope'] == 'route':
+            for route_name, steps in route_steps:
+                message = rule['check'](route_name, steps, context)
+                if message:
+                    report(rule, route_name, None, message)
+        elif rule['scope'] == 'config':
+            for section_name, message in rule['check'](context) or ():
+                report(rule, section_name, None, message)
+    return findings
+
+def lint_files(config_files, jobs=1, cache=None, use_mmap=False, rule_ids=None):
+    """
+    Analyse les fichiers et applique les règles de performance: retourne (constats, résumé)
+    """
+    if rule_ids:
+        unknown = [rule_id for rule_id in rule_ids if rule_id not in LINT_RULES]
+        if unknown:
+            raise ValueError(f"Règle(s) inconnue(s): {', '.join(unknown)} (disponibles: {', '.join(LINT_RULES)})")
+        rules = [LINT_RULES[rule_id] for rule_id in rule_ids]
+    else:
+        rules = list(LINT_RULES.values())
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    
+    findings = []
+    files = sections = 0
+    for config_file, config_data, flow_data, output in iter_parsed_configs(config_files, jobs, cache, use_mmap,
+                                                                           ContentVariants()):
+        if output:
+            print(output, end='')
+        files += 1
+        sections += len(flow_data['sections'])
+        with TIMINGS.stage('lint_config'):
+            for finding in lint_config(flow_data, rules):
+                findings.append(dict(finding, file=config_file))
+    
+    summary = {
+        'files': files,
+        'sections': sections,
+        'rules': [rule['id'] for rule in rules],
+        'findings': dict(Counter(finding['severity'] for finding in findings))
+    }
+    return findings, summary
+
+def display_lint(findings, summary, format_type='table'):
+    """
+    Affiche les constats retournés par lint_files
+    """
+    if format_type == 'json':
+        print(json.dumps({'summary': summary, 'findings': findings}, indent=2, ensure_ascii=False))
+        return
+    if format_type == 'jsonl':
+        for finding in findings:
+            print(json.dumps(finding, ensure_ascii=False))
+        print(json.dumps(dict(summary, record='summary'), ensure_ascii=False))
+        return
+    
+    headers = ['Fichier', 'Règle', 'Sévérité', 'Section', 'Module', 'Message']
+    rows = [[finding['file'], finding['rule'], finding['severity'], finding['section'] or '',
+             finding['module'] or '', finding['message']] for finding in findings]
+    info = sys.stderr if format_type == 'csv' else sys.stdout
+    if format_type == 'csv':
+        print(','.join(headers))
+        for row in rows:
+            print(','.join('"' + cell.replace('"', '""') + '"' if ',' in cell or '"' in cell else cell
+                           for cell in row))
+    elif rows:
+        print(tabulate(rows, headers=headers, tablefmt='grid') if TABULATE_AVAILABLE
+              else simple_table_format(rows, headers))
+    
+    counts = ', '.join(f"{summary['findings'][severity]} {severity}" for severity in reversed(LINT_SEVERITIES)
+                       if summary['findings'].get(severity))
+    print(f"\nLint performance: {summary['files']} fichier(s), {summary['sections']} section(s), "
+          f"{len(summary['rules'])} règle(s): {counts or 'aucun constat'}", file=info)
+
+# Analyse du coût des expressions régulières des blocs Exec (--regex-cost)
+EXEC_BLOCK_RE = re.compile(r'<Exec>(.*?)</Exec>', re.IGNORECASE | re.DOTALL)
+EXEC_LINE_RE = re.compile(r'^[ \t]*Exec[ \t]+((?:.*\\\n)*.*)$', re.IGNORECASE | re.MULTILINE)
+REGEX_OPERATOR_RE = re.compile(r'[=!]~\s*(s?)/')
+REGEX_FLAGS_RE = re.compile(r'[a-zA-Z]*')
+REGEX_NAMED_GROUP_RE = re.compile(r'\(\?<(?=[A-Za-z_])')
+PARSE_CALL_RE = re.compile(r'\b(parse_\w+)\s*\(')
+REGEX_FLAG_VALUES = {'i': re.IGNORECASE, 'm': re.MULTILINE, 's': re.DOTALL, 'x': re.VERBOSE}
+REGEX_REPEATS = ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+REGEX_UNBOUNDED_REPEAT = 32
+REGEX_ALPHABET = frozenset(chr(code) for code in range(128)) | frozenset('é ')
+REGEX_CATEGORIES = {
+    'CATEGORY_DIGIT': r'\d', 'CATEGORY_NOT_DIGIT': r'\D',
+    'CATEGORY_SPACE': r'\s', 'CATEGORY_NOT_SPACE': r'\S',
+    'CATEGORY_WORD': r'\w', 'CATEGORY_NOT_WORD': r'\W'
+}
+REGEX_CATEGORY_CHARS = {name: frozenset(char for char in REGEX_ALPHABET if re.match(pattern, char))
+                        for name, pattern in REGEX_CATEGORIES.items()}
+REGEX_PUMP_PREFERENCE = 'a0 -x'
+REGEX_FAIL_CHARS = '!\n\x00~Z'
+REGEX_EXPONENTIAL_LENGTHS = (8, 12, 16, 20, 24, 28, 32)
+REGEX_POLYNOMIAL_LENGTHS = (64, 256, 1024, 4096, 16384)
+REGEX_SAMPLE_MIN_TIME = 0.005
+REGEX_SAMPLE_MAX_LINES = 1000
+REGEX_TIMEOUT = 1.0
+REGEX_TIMEOUT_MARGIN = 0.5
+REGEX_TOP_SECTIONS = 20
+REGEX_RISK_ORDER = ('', 'polynomial', 'exponential', 'invalid', 'timeout')
+REGEX_RISK_LABELS = {'': '', 'polynomial': 'polynomial', 'exponential': 'exponentiel',
+                     'invalid': 'invalide', 'timeout': 'délai dépassé'}
+
+# Événements utilisés faute d'échantillon fourni avec --regex-sample
+REGEX_SAMPLE_EVENTS = (
+    '<13>Oct 17 10:32:01 web01 sshd[2231]: Accepted password for admin from 10.0.0.12 port 51122 ssh2',
+    '<11>Oct 17 10:32:02 db02 postgres[991]: ERROR:  duplicate key value violates unique constraint "users_pkey"',
+    '10.1.2.3 - - [17/Oct/2026:10:32:03 +0200] "GET /api/v1/items?id=42 HTTP/1.1" 200 5123 "-" "curl/8.4.0"',
+    '{"time":"2026-10-17T10:32:04Z","level":"warn","user":"jdoe","msg":"slow query","duration_ms":1834}',
+    'Oct 17 10:32:05 fw01 kernel: IN=eth0 OUT= SRC=192.0.2.7 DST=198.51.100.9 PROTO=TCP SPT=443 DPT=50122',
+)
+
+def iter_exec_code(content):
+    """
+    Produit le code des directives Exec et des blocs <Exec> d'une section
+    """
+    for match in EXEC_LINE_RE.finditer(content):
+        yield match.group(1).replace('\\\n', '\n')
+    for match in EXEC_BLOCK_RE.finditer(content):
+        yield match.group(1)
+
+def read_regex_literal(code, position):
+    """
+    Lit un littéral /.../ à partir de position: retourne (motif, position après le /) ou (None, position)
+    """
+    start = position
+    in_class = False
+    while position < len(code):
+        char = code[position]
+        if char == '\\':
+            position += 2
+            continue
+        if char == '\n':
+            break
+        if in_class:
+            # Un ] en tête de classe ([] ou [^]) est littéral
+            if char == ']' and code[position - 1] != '[' and code[position - 2:position] != '[^':
+                in_class = False
+        elif char == '[':
+            in_class = True
+        elif char == '/':
+            return code[start:position], position + 1
+        position += 1
+    return None, position
+
+def iter_exec_regexes(code):
+    """
+    Produit (motif, options, 'match' ou 'substitute') pour chaque =~ /.../ ou =~ s/.../.../ du code
+    """
+    for match in REGEX_OPERATOR_RE.finditer(code):
+        pattern, position = read_regex_literal(code, match.end())
+        if pattern is None:
+            continue
+        kind = 'match'
+        if match.group(1):
+            kind = 'substitute'
+            replacement, position = read_regex_literal(code, position)
+            if replacement is None:
+                continue
+        yield pattern, REGEX_FLAGS_RE.match(code, position).group(), kind
+
+def to_python_regex(pattern, options):
+    """
+    Traduit un motif PCRE de NXLog et ses options (i, m, s, x, g) pour le module re
+    """
+    flags = 0
+    for option in options.lower():
+        flags |= REGEX_FLAG_VALUES.get(option, 0)
+    pattern = REGEX_NAMED_GROUP_RE.sub('(?P<', pattern).replace('\\z', '\\Z')
+    return pattern, flags
+
+def regex_charset(name, av, ignorecase):
+    """
+    Ensemble des caractères (de REGEX_ALPHABET) acceptés par un élément simple d'expression
+    """
+    if name == 'ANY':
+        return REGEX_ALPHABET
+    if name in ('LITERAL', 'NOT_LITERAL'):
+        chars = {chr(av)}
+    else:
+        chars = set()
+        negate = False
+        for item_op, item_av in av:
+            item = item_op.name
+            if item == 'NEGATE':
+                negate = True
+            elif item == 'LITERAL':
+                chars.add(chr(item_av))
+            elif item == 'RANGE':
+                chars.update(char for char in REGEX_ALPHABET if item_av[0] <= ord(char) <= item_av[1])
+            elif item == 'CATEGORY':
+                chars |= REGEX_CATEGORY_CHARS.get(item_av.name, REGEX_ALPHABET)
+        if negate:
+            chars = REGEX_ALPHABET - chars
+    if ignorecase:
+        chars |= {char.swapcase() for char in chars}
+    return REGEX_ALPHABET - chars if name == 'NOT_LITERAL' else frozenset(chars) & REGEX_ALPHABET
+
+def regex_item_info(op, av, ignorecase):
+    """
+    Retourne (premiers caractères, caractères consommés, peut être vide) d'un élément d'expression
+    """
+    name = op.name
+    if name in ('LITERAL', 'NOT_LITERAL', 'ANY', 'IN'):
+        chars = regex_charset(name, av, ignorecase)
+        return chars, chars, False
+    if name == 'SUBPATTERN':
+        return regex_seq_info(av[-1], ignorecase)
+    if name == 'ATOMIC_GROUP':
+        return regex_seq_info(av, ignorecase)
+    if name in REGEX_REPEATS:
+        first, chars, nullable = regex_seq_info(av[2], ignorecase)
+        return first, chars, nullable or av[0] == 0
+    if name in ('BRANCH', 'GROUPREF_EXISTS'):
+        branches = av[1] if name == 'BRANCH' else [branch for branch in av[1:] if branch is not None]
+        infos = [regex_seq_info(branch, ignorecase) for branch in branches]
+        if name == 'GROUPREF_EXISTS' and len(infos) == 1:
+            infos.append((frozenset(), frozenset(), True))
+        return (frozenset().union(*(info[0] for info in infos)), frozenset().union(*(info[1] for info in infos)),
+                any(info[2] for info in infos))
+    if name.startswith('GROUPREF'):
+        return REGEX_ALPHABET, REGEX_ALPHABET, True
+    # Ancres et assertions: aucun caractère consommé
+    return frozenset(), frozenset(), True
+
+def regex_seq_info(seq, ignorecase):
+    """
+    Retourne (premiers caractères, caractères consommés, peut être vide) d'une suite d'éléments
+    """
+    first, chars, nullable = set(), set(), True
+    for op, av in seq:
+        item_first, item_chars, item_nullable = regex_item_info(op, av, ignorecase)
+        chars |= item_chars
+        if nullable:
+            first |= item_first
+        nullable = nullable and item_nullable
+    return frozenset(first), frozenset(chars), nullable
+
+def regex_flatten(seq):
+    """
+    Remplace les groupes par leur contenu (ils ne changent pas l'ordre de consommation)
+    """
+    items = []
+    for op, av in seq:
+        if op.name == 'SUBPATTERN':
+            items.extend(regex_flatten(av[-1]))
+        else:
+            items.append((op, av))
+    return items
+
+def regex_unbounded(op, av):
+    """
+    Indique si un élément est une répétition non bornée avec retour arrière (*, +, {n,})
+    """
+    return op.name in ('MAX_REPEAT', 'MIN_REPEAT') and (av[1] == sre_parse.MAXREPEAT
+                                                        or av[1] > REGEX_UNBOUNDED_REPEAT)
+
+def regex_ambiguous_branch(body, body_first, ignorecase):
+    """
+    Caractères qu'une alternative du corps d'une répétition peut découper de deux façons
+
+    sre_parse factorise le préfixe commun des alternatives (a|aa devient a(?:|a)): une
+    alternative vide est ambiguë si une autre alternative commence par un caractère qui
+    peut aussi suivre l'alternative (la suite du corps ou l'itération suivante). Deux
+    alternatives vides, ou qui commencent par les mêmes caractères, le sont aussi.
+    """
+    for index, (op, av) in enumerate(body):
+        if op.name != 'BRANCH':
+            continue
+        rest_first, _, rest_nullable = regex_seq_info(body[index + 1:], ignorecase)
+        follow = rest_first | body_first if rest_nullable else rest_first
+        infos = [regex_seq_info(branch, ignorecase) for branch in av[1]]
+        overlap = set()
+        for position, (first, _, nullable) in enumerate(infos):
+            for other_first, _, other_nullable in infos[position + 1:]:
+                overlap |= first & other_first
+                if nullable and other_nullable:
+                    overlap |= follow
+                if nullable:
+                    overlap |= other_first & follow
+                if other_nullable:
+                    overlap |= first & follow
+        if overlap:
+            return frozenset(overlap)
+    return frozenset()
+
+def collect_regex_hazards(seq, ignorecase, hazards, top=False, anchored=False):
+    """
+    Ajoute à hazards les constructions sujettes au retour arrière catastrophique
+
+    - exponentiel: répétition non bornée dont le corps contient une autre répétition
+      pouvant consommer le début de l'itération suivante ((a+)+, (\\w+\\s?)+), ou dont
+      les alternatives permettent deux découpages d'une même entrée ((a|a)*, (a|aa)*);
+    - polynomial: k répétitions successives capables de consommer les mêmes caractères
+      ((.*)(.*)x, \\s+$ sans ancre de début), en O(n^k) sur une entrée qui échoue.
+    La recherche sans ancre ^ compte comme une répétition implicite de tête. Une
+    répétition non bornée d'un groupe sans risque reconnu ajoute une sonde (kind
+    'probe'): le motif est tout de même chronométré sur une entrée adverse.
+    """
+    items = regex_flatten(seq)
+    
+    def close_chain(chain, unit, suffix):
+        if len(chain) >= 2 and suffix:
+            pump = chain[-1] & chain[-2]
+            hazards.append({'kind': 'polynomial', 'degree': len(chain), 'pump': pump, 'unit': unit,
+                            'detail': f"{len(chain)} répétitions successives qui se recouvrent: O(n^{len(chain)})"})
+    
+    # Chaîne de répétitions qui se recouvrent, séparées par des caractères consommables par la précédente;
+    # les littéraux qui les séparent forment le motif à répéter dans l'entrée adverse
+    chain, live, literals, unit, last_repeat = ([REGEX_ALPHABET], REGEX_ALPHABET, '', '', -1) \
+        if top and not anchored else ([], None, '', '', -1)
+    for index, (op, av) in enumerate(items):
+        chars = regex_item_info(op, av, ignorecase)[1]
+        if regex_unbounded(op, av):
+            if live is not None and chars & live:
+                chain.append(chars)
+                unit = literals
+            else:
+                close_chain(chain, unit, True)
+                chain, literals, unit = [chars], '', ''
+            live, last_repeat = chars, index
+        elif live is not None and chars <= live:
+            if op.name == 'LITERAL':
+                literals += chr(av)
+        else:
+            close_chain(chain, unit, True)
+            chain, live, literals, unit = [], None, '', ''
+    close_chain(chain, unit, not top or last_repeat < len(items) - 1)
+    
+    for op, av in items:
+        name = op.name
+        if name in REGEX_REPEATS:
+            body = regex_flatten(av[2])
+            if regex_unbounded(op, av):
+                body_first = regex_seq_info(body, ignorecase)[0]
+                for index, (body_op, body_av) in enumerate(body):
+                    if not regex_unbounded(body_op, body_av):
+                        continue
+                    overlap = regex_item_info(body_op, body_av, ignorecase)[1] & body_first
+                    if overlap and regex_seq_info(body[index + 1:], ignorecase)[2]:
+                        hazards.append({'kind': 'exponential', 'degree': None, 'pump': overlap, 'unit': '',
+                                        'detail': 'quantificateurs imbriqués'})
+                        break
+                overlap = regex_ambiguous_branch(body, body_first, ignorecase)
+                if overlap:
+                    hazards.append({'kind': 'exponential', 'degree': None, 'pump': overlap, 'unit': '',
+                                    'detail': 'alternatives qui se recouvrent sous un quantificateur'})
+                elif any(body_op.name in ('SUBPATTERN', 'BRANCH') for body_op, _ in av[2]) and body_first:
+                    hazards.append({'kind': 'probe', 'degree': None, 'pump': body_first, 'unit': '',
+                                    'detail': ''})
+            collect_regex_hazards(av[2], ignorecase, hazards)
+        elif name == 'BRANCH':
+            for branch in av[1]:
+                collect_regex_hazards(branch, ignorecase, hazards, top and len(items) == 1, anchored)
+        elif name == 'ATOMIC_GROUP':
+            collect_regex_hazards(av, ignorecase, hazards)
+        elif name in ('ASSERT', 'ASSERT_NOT'):
+            collect_regex_hazards(av[1], ignorecase, hazards)
+        elif name == 'GROUPREF_EXISTS':
+            for branch in av[1:]:
+                if branch is not None:
+                    collect_regex_hazards(branch, ignorecase, hazards)
+
+def find_regex_hazards(pattern, flags=0):
+    """
+    Analyse statique d'un motif (syntaxe re): retourne (risques, préfixe littéral), les plus graves en tête
+    """
+    parsed = sre_parse.parse(pattern, flags)
+    ignorecase = bool(parsed.state.flags & re.IGNORECASE)
+    items = regex_flatten(parsed)
+    anchored = bool(items) and items[0][0].name == 'AT' and items[0][1].name in ('AT_BEGINNING',
+                                                                                'AT_BEGINNING_STRING')
+    
+    # Préfixe littéral nécessaire pour atteindre la partie à risque d'un motif ancré
+    prefix = ''
+    for op, av in items[1 if anchored else 0:]:
+        if op.name != 'LITERAL':
+            break
+        prefix += chr(av)
+    
+    hazards = []
+    collect_regex_hazards(parsed, ignorecase, hazards, top=True, anchored=anchored)
+    hazards.sort(key=lambda hazard: (hazard['kind'] != 'probe', hazard['kind'] == 'exponential',
+                                     hazard['degree'] or 0), reverse=True)
+    return hazards, prefix
+
+def adversarial_input(hazard, prefix, length):
+    """
+    Construit une entrée qui fait échouer le motif après avoir répété length fois le motif de pompage
+    """
+    pump = hazard['pump']
+    pump_char = next((char for char in REGEX_PUMP_PREFERENCE if char in pump), None) \
+        or min((char for char in pump if char.isprintable()), default=None) or min(pump)
+    fail_char = next((char for char in REGEX_FAIL_CHARS if char not in pump), '')
+    return prefix + (hazard['unit'] + pump_char) * length + fail_char
+
+def measure_regex(pattern, flags, hazards, prefix, samples, timeout, report):
+    """
+    Mesure le coût d'un motif et transmet chaque mesure à report au fur et à mesure
+
+    report reçoit ('sample', µs par événement sur samples) puis ('point', longueur, secondes)
+    pour des entrées adverses de longueur croissante, tant que la mesure suivante
+    estimée tient dans timeout. Une sonde parcourt les longueurs courtes puis longues,
+    la croissance n'étant pas connue à l'avance.
+    """
+    regex = re.compile(pattern, flags)
+    start = time.perf_counter()
+    rounds = 0
+    while True:
+        for sample in samples:
+            regex.search(sample)
+        rounds += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= REGEX_SAMPLE_MIN_TIME or elapsed >= timeout:
+            break
+    report(('sample', elapsed / (rounds * max(len(samples), 1)) * 1e6))
+    if not hazards:
+        return
+    
+    hazard = hazards[0]
+    exponential = hazard['kind'] == 'exponential'
+    lengths = REGEX_EXPONENTIAL_LENGTHS if exponential else REGEX_POLYNOMIAL_LENGTHS
+    if hazard['kind'] == 'probe':
+        lengths = REGEX_EXPONENTIAL_LENGTHS + REGEX_POLYNOMIAL_LENGTHS
+    deadline = time.perf_counter() + timeout
+    previous = None
+    for index, length in enumerate(lengths):
+        begin = time.perf_counter()
+        regex.search(adversarial_input(hazard, prefix, length))
+        end = time.perf_counter()
+        report(('point', length, end - begin))
+        if index + 1 == len(lengths):
+            break
+        # Durée prévisible de la longueur suivante: arrêt si elle dépasse le délai restant
+        if exponential:
+            factor = max((end - begin) / previous, 1) if previous else 1
+        else:
+            # Exposant mesuré sur les deux dernières longueurs, à défaut le degré estimé
+            degree = hazard['degree'] or 1
+            if previous and previous > 1e-4:
+                degree = max(math.log((end - begin) / previous) / math.log(length / lengths[index - 1]), 1)
+            factor = (lengths[index + 1] / length) ** degree
+        if end + (end - begin) * factor > deadline:
+            break
+        previous = end - begin
+
+def _regex_cost_worker(connection):
+    """
+    Processus de mesure: reçoit des tâches measure_regex jusqu'à None
+    """
+    while True:
+        job = connection.recv()
+        if job is None:
+            break
+        try:
+            measure_regex(*job, connection.send)
+        except Exception as e:
+            connection.send(('error', str(e)))
+        connection.send(('done',))
+
+class RegexTimer:
+    """
+    Exécute measure_regex dans un processus séparé, arrêté si un motif dépasse son délai
+
+    Le module re ne peut pas interrompre une recherche en cours: le processus est
+    tué puis relancé pour le motif suivant.
+    """
+
+    def __init__(self):
+        self.process = None
+        self.connection = None
+
+    def start(self):
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_regex_cost_worker, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def measure(self, pattern, flags, hazards, prefix, samples, timeout):
+        """
+        Retourne (messages reçus de measure_regex, délai dépassé)
+        """
+        if self.process is None:
+            self.start()
+        self.connection.send((pattern, flags, hazards, prefix, samples, timeout))
+        # Le délai s'applique aux échantillons puis, séparément, aux entrées adverses
+        deadline = time.perf_counter() + 2 * timeout + REGEX_TIMEOUT_MARGIN
+        messages = []
+        while self.connection.poll(max(deadline - time.perf_counter(), 0)):
+            message = self.connection.recv()
+            if message[0] == 'done':
+                return messages, False
+            messages.append(message)
+        self.process.kill()
+        self.process.join()
+        self.process = None
+        return messages, True
+
+    def close(self):
+        if self.process is not None:
+            self.connection.send(None)
+            self.process.join()
+            self.process = None
+
+def regex_growth(points, kind):
+    """
+    Estime la croissance mesurée: exposant k de n^k, ou facteur par répétition pour l'exponentiel
+    """
+    points = [(length, seconds) for length, seconds in points if seconds > 1e-4]
+    if len(points) < 2:
+        return None
+    (length1, time1), (length2, time2) = points[-2:]
+    if kind == 'exponential':
+        return (time2 / time1) ** (1 / (length2 - length1))
+    return math.log(time2 / time1) / math.log(length2 / length1)
+
+def analyze_regex_costs(config_files, jobs=1, cache=None, use_mmap=False, samples=None, timeout=REGEX_TIMEOUT):
+    """
+    Extrait les expressions régulières et appels parse_* des Exec et classe les sections par coût
+
+    Chaque motif distinct n'est analysé et mesuré qu'une fois, quel que soit le nombre
+    de sections qui l'utilisent. Retourne (sections, motifs, résumé): sections triées
+    par coût par événement décroissant (les délais dépassés en tête).
+    """
+    samples = list(samples or REGEX_SAMPLE_EVENTS)
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    
+    sections = []
+    patterns = {}
+    for config_file, config_data, flow_data, output in iter_parsed_configs(config_files, jobs, cache, use_mmap,
+                                                                           ContentVariants()):
+        if output:
+            print(output, end='')
+        for section_name, section_info in flow_data['sections'].items():
+            regexes, calls = [], []
+            for code in iter_exec_code(section_info['content']):
+                regexes.extend(iter_exec_regexes(code))
+                calls.extend(PARSE_CALL_RE.findall(code))
+            if regexes or calls:
+                sections.append({'file': config_file, 'section': section_name, 'type': section_info['type'],
+                                 'module': section_info.get('module'), 'regexes': regexes, 'parse_calls': calls})
+                for pattern, options, _ in regexes:
+                    patterns.setdefault((pattern, options.replace('g', '')), None)
+    
+    timer = RegexTimer()
+    try:
+        with TIMINGS.stage('regex_measure'):
+            for key in patterns:
+                pattern, options = key
+                python_pattern, flags = to_python_regex(pattern, options)
+                info = {'pattern': pattern, 'options': options, 'risk': '', 'detail': '', 'sample_us': None,
+                        'worst_ms': None, 'growth': None, 'adversarial': []}
+                try:
+                    hazards, prefix = find_regex_hazards(python_pattern, flags)
+                except re.error as e:
+                    info.update(risk='invalid', detail=f"motif non reconnu: {e}")
+                    patterns[key] = info
+                    continue
+                if hazards and hazards[0]['kind'] != 'probe':
+                    info.update(risk=hazards[0]['kind'], detail=hazards[0]['detail'])
+                messages, timed_out = timer.measure(python_pattern, flags, hazards, prefix, samples, timeout)
+                for message in messages:
+                    if message[0] == 'sample':
+                        info['sample_us'] = message[1]
+                    elif message[0] == 'point':
+                        info['adversarial'].append(message[1:])
+                    elif message[0] == 'error':
+                        info.update(risk='invalid', detail=f"motif non reconnu: {message[1]}")
+                if info['adversarial']:
+                    info['worst_ms'] = max(seconds for _, seconds in info['adversarial']) * 1000
+                    info['growth'] = regex_growth(info['adversarial'], hazards[0]['kind'])
+                if timed_out:
+                    where = 'sur les échantillons' if info['sample_us'] is None else 'sur une entrée adverse'
+                    info.update(risk='timeout', detail=f"{info['detail'] or 'mesure'}: plus de {timeout:g} s {where}")
+                patterns[key] = info
+    finally:
+        timer.close()
+    
+    for section in sections:
+        infos = [patterns[(pattern, options.replace('g', ''))] for pattern, options, _ in section['regexes']]
+        costs = [info['sample_us'] for info in infos]
+        section['cost_us'] = None if None in costs else sum(costs)
+        section['worst_ms'] = max((info['worst_ms'] for info in infos if info['worst_ms'] is not None),
+                                  default=None)
+        section['risk'] = max((info['risk'] for info in infos), key=REGEX_RISK_ORDER.index, default='')
+        section['regexes'] = [{'pattern': pattern, 'options': options, 'kind': kind}
+                              for pattern, options, kind in section['regexes']]
+    sections.sort(key=lambda section: (section['cost_us'] is None and bool(section['regexes']),
+                                       section['cost_us'] or 0), reverse=True)
+    
+    summary = {
+        'sections': len(sections),
+        'patterns': len(patterns),
+        'samples': len(samples),
+        'timeout': timeout,
+        'risks': dict(Counter(info['risk'] for info in patterns.values() if info['risk']))
+    }
+    return sections, list(patterns.values()), summary
+
+def display_regex_costs(sections, patterns, summary, format_type='table'):
+    """
+    Affiche le classement des sections et les motifs à risque retournés par analyze_regex_costs
+    """
+    if format_type in ('json', 'jsonl'):
+        if format_type == 'json':
+            print(json.dumps({'summary': summary, 'sections': sections, 'patterns': patterns}, indent=2,
+                             ensure_ascii=False))
+        else:
+            for section in sections:
+                print(json.dumps(dict(section, record='section'), ensure_ascii=False))
+            for pattern in patterns:
+                print(json.dumps(dict(pattern, record='pattern'), ensure_ascii=False))
+            print(json.dumps(dict(summary, record='summary'), ensure_ascii=False))
+        return
+    
+    def fmt(value, digits=2):
+        return '' if value is None else f"{value:.{digits}f}"
+    
+    headers = ['Rang', 'Fichier', 'Section', 'Nom Section', 'Regex', 'Appels parse_*', 'Coût (µs/événement)',
+               'Pire cas (ms)', 'Risque']
+    rows = [[rank, section['file'], section['type'], section['section'], len(section['regexes']),
+             len(section['parse_calls']), 'délai dépassé' if section['cost_us'] is None and section['regexes']
+             else fmt(section['cost_us']), fmt(section['worst_ms'], 1), REGEX_RISK_LABELS[section['risk']]]
+            for rank, section in enumerate(sections, 1)]
+    risky = sorted((info for info in patterns if info['risk']), key=lambda info: REGEX_RISK_ORDER.index(info['risk']),
+                   reverse=True)
+    risk_headers = ['Motif', 'Options', 'Risque', 'Détail', 'Pire cas (ms)', 'Croissance mesurée']
+    risk_rows = []
+    for info in risky:
+        growth = info['growth']
+        if growth is not None:
+            growth = f"x{growth:.2f} par caractère" if info['risk'] == 'exponential' else f"~n^{growth:.1f}"
+        risk_rows.append([info['pattern'], info['options'], REGEX_RISK_LABELS[info['risk']], info['detail'],
+                          fmt(info['worst_ms'], 1), growth or ''])
+    
+    info_stream = sys.stderr if format_type == 'csv' else sys.stdout
+    for table_headers, table_rows in ((headers, rows[:REGEX_TOP_SECTIONS] if format_type == 'table' else rows),
+                                      (risk_headers, risk_rows)):
+        if not table_rows:
+            continue
+        if format_type == 'csv':
+            print(','.join(table_headers))
+            for row in table_rows:
+                print(','.join('"' + str(cell).replace('"', '""') + '"' if ',' in str(cell) or '"' in str(cell)
+                               else str(cell) for cell in row))
+        elif TABULATE_AVAILABLE:
+            print(tabulate(table_rows, headers=table_headers, tablefmt='grid'))
+        else:
+            print(simple_table_format(table_rows, table_headers))
+        print()
+    
+    risks = ', '.join(f"{count} {REGEX_RISK_LABELS[risk]}" for risk, count in summary['risks'].items())
+    shown = f" ({REGEX_TOP_SECTIONS} premières affichées)" if format_type == 'table' and len(rows) > REGEX_TOP_SECTIONS \
+        else ''
+    print(f"Coût des regex: {summary['sections']} section(s){shown}, {summary['patterns']} motif(s) distinct(s) "
+          f"mesuré(s) sur {summary['samples']} événement(s), délai {summary['timeout']:g} s par motif"
+          f"{': ' + risks if risks else ''}", file=info_stream)
+
+# Simulation des files d'attente (--simulate): valeurs par défaut du profil
+SIM_DEFAULT_DURATION = 60.0
+SIM_DEFAULT_TICK = 0.01
+SIM_DEFAULT_EVENT_SIZE = 300
+SIM_DEFAULT_INPUT_RATE = 1000.0
+SIM_DEFAULT_OUTPUT_RATE = 10000.0
+SIM_DEFAULT_OUTPUT_LATENCY = 0.001
+SIM_DEFAULT_PROCESSOR_RATE = 100000.0
+SIM_DEFAULT_QUEUE_SIZE = 100
+SIM_DEFAULT_FLUSH_INTERVAL = 1.0
+# Entrées qui ne peuvent pas suspendre la lecture: les événements sont perdus quand une file est pleine
+SIM_UNBLOCKABLE_INPUTS = ('im_udp', 'im_uds', 'im_kernel', 'im_mark', 'im_internal')
+SIM_PERCENTILES = (50, 95, 99)
+SIM_MAX_PASSES = 64
+
+def load_simulation_profile(profile_file=None, inputs=(), outputs=(), duration=None):
+    """
+    Charge un profil de simulation JSON et y applique les valeurs de la ligne de commande
+
+    Profil: {"duration": s, "tick": s, "event_size": octets,
+             "inputs": {nom: eps ou {"rate": eps, "bursts": [{"start": s, "duration": s, "rate": eps}]}},
+             "outputs": {nom: eps ou {"rate": eps, "latency": s}}, "processors": {nom: eps ou {"rate": eps}}}
+    Les clés désignent un nom de section, un module ou un motif (* et ?).
+    inputs et outputs sont des listes de chaînes NOM=EPS et NOM=EPS[:LATENCE].
+    """
+    profile = {}
+    if profile_file:
+        with open(profile_file, encoding='utf-8') as f:
+            profile = json.load(f)
+        if not isinstance(profile, dict):
+            raise ValueError(f"Profil de simulation invalide: {profile_file}")
+    for key in ('inputs', 'outputs', 'processors'):
+        profile[key] = dict(profile.get(key) or {})
+    
+    for option, key in ((inputs, 'inputs'), (outputs, 'outputs')):
+        for value in option:
+            name, separator, setting = value.partition('=')
+            if not separator:
+                raise ValueError(f"Valeur attendue sous la forme NOM=EPS: {value}")
+            rate, _, latency = setting.partition(':')
+            try:
+                profile[key][name.strip()] = {'rate': float(rate), 'latency': float(latency)} if latency \
+                    else float(rate)
+            except ValueError:
+                raise ValueError(f"Débit ou latence invalide: {value}")
+    if duration is not None:
+        profile['duration'] = duration
+    return profile
+
+def simulation_setting(table, section_name, module, default):
+    """
+    Retourne le réglage du profil pour une section: nom exact, puis module, puis premier motif correspondant
+    """
+    for key in (section_name, module):
+        if key in table:
+            value = table[key]
+            break
+    else:
+        value = next((value for pattern, value in table.items()
+                      if fnmatch.fnmatchcase(section_name, pattern) or (module and fnmatch.fnmatchcase(module, pattern))),
+                     None)
+    if value is None:
+        return dict(default)
+    if not isinstance(value, dict):
+        value = {'rate': value}
+    return dict(default, **value)
+
+def weighted_percentiles(samples, percentiles=SIM_PERCENTILES):
+    """
+    Percentiles d'une liste de (valeur, effectif): retourne {percentile: valeur}
+    """
+    samples = sorted(samples)
+    total = sum(count for _, count in samples)
+    result = {}
+    if not total:
+        return result
+    thresholds = sorted(percentiles)
+    cumulated = 0
+    index = 0
+    for value, count in samples:
+        cumulated += count
+        while index < len(thresholds) and cumulated >= total * thresholds[index] / 100:
+            result[thresholds[index]] = value
+            index += 1
+    return result
+
+class FlowSimulation:
+    """
+    Simulation à pas de temps fixe des files d'attente d'une configuration
+
+    Les événements circulent par lots (cohortes [instant d'émission, nombre, route]):
+    le coût dépend du nombre de pas et de sections, pas du nombre d'événements, ce
+    qui permet de simuler des millions d'événements en quelques secondes. À chaque
+    pas, chaque section reçoit son crédit de débit, puis sorties (BatchSize,
+    FlushInterval, latence), processeurs et entrées échangent leurs cohortes jusqu'à
+    stabilisation. Une entrée s'arrête de lire quand une file en aval est pleine
+    (contrôle de flux): les événements s'accumulent à la source et leur latence
+    augmente. Une entrée qui ne peut pas attendre (im_udp..., FlowControl FALSE) perd
+    ce qu'elle n'a pas pu transmettre à la fin du pas.
+    La capacité d'une file est QueueSize (LogQueueSize), augmentée de BufferSize
+    converti en événements pour les sorties.
+    """
+
+    def __init__(self, flow_data, profile):
+        self.duration = float(profile.get('duration', SIM_DEFAULT_DURATION))
+        self.tick = float(profile.get('tick', SIM_DEFAULT_TICK))
+        if self.duration <= 0 or self.tick <= 0:
+            raise ValueError("duration et tick doivent être positifs")
+        event_size = float(profile.get('event_size', SIM_DEFAULT_EVENT_SIZE))
+        sections = flow_data['sections']
+        
+        # Destinations de chaque section, par route
+        self.edges = defaultdict(list)
+        self.routes = {}
+        successors = defaultdict(set)
+        nodes = {}
+        for flow in flow_data['flows']:
+            self.edges[(flow['source'], flow['route'])].append(flow['destination'])
+            successors[flow['source']].add(flow['destination'])
+            self.routes.setdefault(flow['route'], {'emitted': 0, 'dropped': 0, 'outputs': {}})
+            nodes.setdefault(flow['source'], flow['source_type'])
+            nodes.setdefault(flow['destination'], flow['destination_type'])
+        
+        self.nodes = {}
+        for name, section_type in nodes.items():
+            section_info = sections[name]
+            module = section_info.get('module') or ''
+            params = {key.lower(): value for key, value in section_info['params'].items()}
+            node = {'name': name, 'type': section_type, 'module': module, 'queue': deque(), 'fill': 0,
+                    'processed': 0, 'dropped': 0, 'max_fill': 0, 'fill_time': 0.0, 'full_time': 0.0,
+                    'blocked_time': 0.0, 'credit': 0.0}
+            if section_type == 'Input':
+                setting = simulation_setting(profile['inputs'], name, module, {'rate': SIM_DEFAULT_INPUT_RATE})
+                node['rate'] = float(setting['rate'])
+                node['bursts'] = [(float(burst['start']), float(burst['start']) + float(burst['duration']),
+                                   float(burst['rate'])) for burst in setting.get('bursts', ())]
+                node['blocking'] = module.lower() not in SIM_UNBLOCKABLE_INPUTS and \
+                    not (params.get('flowcontrol', '').lower() in ('false', 'no', 'off', '0'))
+                node['routes'] = sorted(route for source, route in self.edges if source == name)
+            else:
+                defaults = {'rate': SIM_DEFAULT_OUTPUT_RATE, 'latency': SIM_DEFAULT_OUTPUT_LATENCY} \
+                    if section_type == 'Output' else {'rate': SIM_DEFAULT_PROCESSOR_RATE}
+                setting = simulation_setting(profile['outputs'] if section_type == 'Output' else profile['processors'],
+                                             name, module, defaults)
+                node['rate'] = float(setting['rate'])
+                node['latency'] = float(setting.get('latency', 0))
+                capacity = lint_number(params.get('logqueuesize', params.get('queuesize', '')))
+                node['capacity'] = int(capacity) if capacity else SIM_DEFAULT_QUEUE_SIZE
+                if section_type == 'Output':
+                    buffer_size = lint_number(params.get('buffersize', ''))
+                    if buffer_size:
+                        node['capacity'] += int(buffer_size // event_size)
+                    batch_size = lint_number(params.get('batchsize', ''))
+                    node['batch'] = max(int(batch_size), 1) if batch_size else 1
+                    flush_interval = lint_number(params.get('flushinterval', ''))
+                    node['flush'] = flush_interval if flush_interval is not None else \
+                        (SIM_DEFAULT_FLUSH_INTERVAL if node['batch'] > 1 else 0.0)
+            self.nodes[name] = node
+        
+        # Ordre de traitement: sorties, processeurs (les plus proches des sorties d'abord), entrées
+        depth = {}
+        
+        def distance(name, seen=()):
+            if name not in depth:
+                followers = [follower for follower in successors[name] if follower not in seen]
+                depth[name] = 1 + max((distance(follower, seen + (name,)) for follower in followers), default=-1)
+            return depth[name]
+        
+        self.order = sorted((node for node in self.nodes.values() if node['type'] != 'Input'),
+                            key=lambda node: distance(node['name']))
+        self.inputs = [node for node in self.nodes.values() if node['type'] == 'Input']
+
+    def push(self, node, origin, count, route):
+        """
+        Ajoute une cohorte à la file d'une section, fusionnée avec la dernière si possible
+        """
+        queue = node['queue']
+        if queue and queue[-1][0] == origin and queue[-1][2] == route:
+            queue[-1][1] += count
+        else:
+            queue.append([origin, count, route])
+        node['fill'] += count
+
+    def free(self, name):
+        node = self.nodes[name]
+        return node['capacity'] - node['fill']
+
+    def emit(self, node, now):
+        """
+        Une sortie émet des lots complets de BatchSize, ou un lot partiel après FlushInterval
+        """
+        if not node['fill']:
+            return 0
+        queue = node['queue']
+        available = min(node['fill'], int(node['credit']))
+        count = available // node['batch'] * node['batch']
+        if not count and available and now - queue[0][0] >= node['flush']:
+            count = available
+        if not count:
+            return 0
+        node['credit'] -= count
+        node['fill'] -= count
+        node['processed'] += count
+        sent = count
+        delivered_at = now + node['latency']
+        while count:
+            cohort = queue[0]
+            taken = min(cohort[1], count)
+            self.deliver(cohort[2], node['name'], delivered_at - cohort[0], taken)
+            count -= taken
+            cohort[1] -= taken
+            if not cohort[1]:
+                queue.popleft()
+        return sent
+
+    def deliver(self, route, name, latency, count):
+        """
+        Enregistre count événements de route arrivés au bout du chemin (name) avec la latence donnée
+        """
+        outputs = self.routes[route]['outputs']
+        if name not in outputs:
+            outputs[name] = []
+        outputs[name].append((latency, count))
+
+    def forward(self, node, now):
+        """
+        Un processeur transmet ses cohortes dans l'ordre, arrêté par la première destination pleine
+        """
+        queue = node['queue']
+        moved = 0
+        while queue and node['credit'] >= 1:
+            origin, count, route = queue[0]
+            destinations = self.edges.get((node['name'], route), ())
+            taken = min(count, int(node['credit']), min((self.free(name) for name in destinations),
+                                                        default=count))
+            if taken <= 0:
+                break
+            for name in destinations:
+                self.push(self.nodes[name], origin, taken, route)
+            if not destinations:
+                # Fin de route sur un processeur: événements consommés
+                self.deliver(route, node['name'], now - origin, taken)
+            node['credit'] -= taken
+            node['fill'] -= taken
+            node['processed'] += taken
+            moved += taken
+            if taken == count:
+                queue.popleft()
+            else:
+                queue[0][1] -= taken
+        return moved
+
+    def arrive(self, node, start):
+        """
+        Ajoute à la source d'une entrée les événements produits pendant le pas
+        """
+        rate = next((burst_rate for begin, end, burst_rate in node['bursts'] if begin <= start < end), node['rate'])
+        node['credit'] += rate * self.tick
+        arrivals = int(node['credit'])
+        node['credit'] -= arrivals
+        if arrivals:
+            self.push(node, start, arrivals, None)
+
+    def read(self, node):
+        """
+        Une entrée transmet les événements en attente à ses routes tant que toutes leurs files ont de la place
+        """
+        queue = node['queue']
+        moved = 0
+        while queue:
+            origin, count, _ = queue[0]
+            taken = min([count] + [self.free(name) for _, destinations in node['targets'] for name in destinations])
+            if taken <= 0:
+                break
+            for route, destinations in node['targets']:
+                self.routes[route]['emitted'] += taken
+                for name in destinations:
+                    self.push(self.nodes[name], origin, taken, route)
+            node['fill'] -= taken
+            node['processed'] += taken
+            moved += taken
+            if taken == count:
+                queue.popleft()
+            else:
+                queue[0][1] -= taken
+                break
+        return moved
+
+    def run(self):
+        """
+        Exécute la simulation et retourne le rapport par section et par route
+        """
+        ticks = int(round(self.duration / self.tick))
+        nodes = list(self.nodes.values())
+        for node in self.inputs:
+            node['targets'] = [(route, self.edges[(node['name'], route)]) for route in node['routes']]
+        
+        for index in range(ticks):
+            start = index * self.tick
+            now = start + self.tick
+            for node in self.order:
+                # Crédit de débit du pas; une sortie peut accumuler de quoi former un lot
+                budget = node['rate'] * self.tick
+                node['credit'] = min(node['credit'] + budget, max(budget, node.get('batch', 1)))
+            for node in self.inputs:
+                self.arrive(node, start)
+            
+            # Passes successives jusqu'à stabilisation: une file plus petite que le débit d'un pas
+            # ne limite pas le débit, seulement l'accumulation
+            for _ in range(SIM_MAX_PASSES):
+                moved = 0
+                for node in self.order:
+                    moved += self.emit(node, now) if node['type'] == 'Output' else self.forward(node, now)
+                for node in self.inputs:
+                    moved += self.read(node)
+                if not moved:
+                    break
+            
+            for node in self.inputs:
+                if not node['queue']:
+                    continue
+                if node['blocking']:
+                    node['blocked_time'] += self.tick
+                else:
+                    # Sans contrôle de flux, ce qui n'a pas pu être transmis est perdu
+                    node['dropped'] += node['fill']
+                    for route in node['routes']:
+                        self.routes[route]['dropped'] += node['fill']
+                    node['queue'].clear()
+                    node['fill'] = 0
+            for node in nodes:
+                fill = node['fill']
+                node['fill_time'] += fill
+                if fill > node['max_fill']:
+                    node['max_fill'] = fill
+                if node['type'] == 'Input':
+                    continue
+                if fill >= node['capacity']:
+                    node['full_time'] += self.tick
+                if node['type'] == 'Processor' and node['queue'] and node['credit'] >= 1:
+                    node['blocked_time'] += self.tick
+        
+        sections = []
+        for node in nodes:
+            sections.append({
+                'section': node['name'],
+                'type': node['type'],
+                'module': node['module'] or None,
+                'capacity': node.get('capacity'),
+                'processed': node['processed'],
+                'max_fill': node['max_fill'],
+                'mean_fill': node['fill_time'] / ticks if ticks else 0,
+                'pending': node['fill'],
+                'full_percent': node['full_time'] / self.duration * 100,
+                'blocked_percent': node['blocked_time'] / self.duration * 100,
+                'dropped': node['dropped']
+            })
+        routes = []
+        for route_name, route in sorted(self.routes.items()):
+            outputs = []
+            for output_name, latencies in sorted(route['outputs'].items()):
+                delivered = sum(count for _, count in latencies)
+                percentiles = weighted_percentiles(latencies)
+                outputs.append({
+                    'output': output_name,
+                    'delivered': delivered,
+                    'latency_mean': sum(value * count for value, count in latencies) / delivered,
+                    **{f'latency_p{percentile}': percentiles.get(percentile) for percentile in SIM_PERCENTILES},
+                    'latency_max': max(value for value, _ in latencies)
+                })
+            routes.append({'route': route_name, 'emitted': route['emitted'], 'dropped': route['dropped'],
+                           'outputs': outputs})
+        return {'duration': self.duration, 'tick': self.tick, 'events': sum(node['processed'] for node in self.inputs),
+                'sections': sections, 'routes': routes}
+
+def simulate_files(config_files, profile, jobs=1, cache=None, use_mmap=False):
+    """
+    Simule chaque configuration avec le profil donné: retourne la liste des rapports
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    reports = []
+    for config_file, config_data, flow_data, output in iter_parsed_configs(config_files, jobs, cache, use_mmap,
+                                                                           ContentVariants()):
+        if output:
+            print(output, end='')
+        if not flow_data['flows']:
+            continue
+        start = time.perf_counter()
+        with TIMINGS.stage('simulate'):
+            report = FlowSimulation(flow_data, profile).run()
+        report['file'] = config_file
+        report['elapsed'] = time.perf_counter() - start
+        reports.append(report)
+    return reports
+
+def display_simulation(reports, format_type='table'):
+    """
+    Affiche les rapports retournés par simulate_files
+    """
+    if format_type == 'json':
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return
+    if format_type == 'jsonl':
+        for report in reports:
+            print(json.dumps(report, ensure_ascii=False))
+        return
+    
+    def ms(value):
+        return '' if value is None else f"{value * 1000:.1f}"
+    
+    for report in reports:
+        headers = ['Section', 'Type', 'Module', 'Capacité', 'Traités', 'File max', 'File moyenne', 'Pleine (%)',
+                   'Bloquée (%)', 'Perdus', 'En attente']
+        rows = [[section['section'], section['type'], section['module'] or 'N/A',
+                 section['capacity'] if section['capacity'] is not None else 'source', section['processed'],
+                 section['max_fill'], f"{section['mean_fill']:.1f}", f"{section['full_percent']:.1f}",
+                 f"{section['blocked_percent']:.1f}", section['dropped'], section['pending']]
+                for section in report['sections']]
+        route_headers = ['Route', 'Émis', 'Perdus', 'Sortie', 'Livrés', 'Latence moy. (ms)'] + \
+            [f'p{percentile} (ms)' for percentile in SIM_PERCENTILES] + ['Max (ms)']
+        route_rows = []
+        for route in report['routes']:
+            for output in route['outputs'] or [{'output': '', 'delivered': 0, 'latency_mean': None, 'latency_max': None}]:
+                route_rows.append([route['route'], route['emitted'], route['dropped'], output['output'],
+                                   output['delivered'], ms(output['latency_mean'])]
+                                  + [ms(output.get(f'latency_p{percentile}')) for percentile in SIM_PERCENTILES]
+                                  + [ms(output['latency_max'])])
+        
+        if format_type == 'table':
+            print(f"\nSimulation: {report['file']} ({report['duration']:g} s par pas de {report['tick'] * 1000:g} ms, "
+                  f"{report['events']} événement(s) lus en {report['elapsed']:.2f} s)")
+        for table_headers, table_rows in ((headers, rows), (route_headers, route_rows)):
+            if format_type == 'csv':
+                print(','.join(['Fichier'] + table_headers))
+                for row in table_rows:
+                    print(','.join(str(cell) for cell in [report['file']] + row))
+            elif TABULATE_AVAILABLE:
+                print(tabulate(table_rows, headers=table_headers, tablefmt='grid'))
+            else:
+                print(simple_table_format(table_rows, table_headers))
+
+# Rejeu d'un échantillon de journaux dans le code Exec des routes (--replay)
+REPLAY_TOKEN_RE = re.compile(r'''
+    (?P<space>\s+|\#[^\n]*)
+    |(?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+    |(?P<number>\d+)
+    |(?P<field>\$(?:\w+|\([^)]*\)))
+    |(?P<name>[A-Za-z_]\w*)
+    |(?P<op>==|!=|<=|>=|=~|!~|->|[-+*/%=<>(){};,])
+''', re.VERBOSE)
+REPLAY_STRING_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+REPLAY_ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+REPLAY_SYSLOG_RE = re.compile(r'(?:<(\d{1,3})>)?(?:\d\s+)?'
+                              r'(\w{3} [ \d]\d \d\d:\d\d:\d\d|\d{4}-\d\d-\d\dT\S+)\s+(\S+)\s+'
+                              r'([^:\[\s]+)(?:\[(\d+)\])?:?\s?(.*)', re.DOTALL)
+REPLAY_COMPARISONS = {
+    '==': lambda a, b: a == b, '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b, '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b, '>=': lambda a, b: a >= b
+}
+REPLAY_MAX_LINES = 100000
+REPLAY_MIN_TIME = 0.1
+REPLAY_MAX_ROUNDS = 1000
+REPLAY_TOP_STATEMENTS = 10
+REPLAY_STATEMENT_WIDTH = 70
+
+class ReplayDrop(Exception):
+    """
+    Levée par drop(): l'événement n'est pas transmis plus loin
+    """
+
+class ExecParser:
+    """
+    Analyseur d'un sous-ensemble du langage Exec de NXLog
+
+    Instructions: blocs { }, if/else, $champ = expression, $champ =~ s/.../.../,
+    appels de procédures et expressions seules (correspondances qui fixent $1...).
+    Expressions: chaînes, entiers, TRUE/FALSE/undef, $champ, $1..$9, =~ et !~ /regex/,
+    comparaisons, + - * / %, and/or/not, parenthèses et appels de fonctions.
+    Produit un arbre de tuples; ValueError sur une construction non reconnue.
+    """
+
+    def __init__(self, code):
+        self.code = code
+        self.tokens = self.tokenize(code)
+        self.index = 0
+
+    @staticmethod
+    def tokenize(code):
+        tokens = []
+        position = 0
+        while position < len(code):
+            match = REPLAY_TOKEN_RE.match(code, position)
+            if not match:
+                raise ValueError(f"caractère inattendu: {code[position]!r}")
+            kind = match.lastgroup
+            if kind != 'space':
+                tokens.append((kind, match.group(), match.start(), match.end()))
+            position = match.end()
+            if kind == 'op' and match.group() in ('=~', '!~'):
+                # Littéral /regex/ ou s/regex/remplacement/ après l'opérateur de correspondance
+                literal = re.compile(r'\s*(s?)/').match(code, position)
+                if not literal:
+                    continue
+                pattern, end = read_regex_literal(code, literal.end())
+                replacement = None
+                if pattern is not None and literal.group(1):
+                    replacement, end = read_regex_literal(code, end)
+                    if replacement is None:
+                        pattern = None
+                if pattern is None:
+                    raise ValueError("expression régulière non terminée")
+                options = REGEX_FLAGS_RE.match(code, end).group()
+                end += len(options)
+                tokens.append(('regex', (pattern, replacement, options), literal.start(), end))
+                position = end
+        return tokens
+
+    def peek(self, offset=0):
+        index = self.index + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None, len(self.code), len(self.code))
+
+    def take(self, value=None):
+        token = self.peek()
+        if token[0] is None or (value is not None and token[1] != value):
+            found = token[1] if token[0] else 'fin du code'
+            raise ValueError(f"'{value}' attendu au lieu de '{found}'" if value else "code incomplet")
+        self.index += 1
+        return token
+
+    def accept(self, value):
+        if self.peek()[1] == value and self.peek()[0] in ('op', 'name'):
+            self.index += 1
+            return True
+        return False
+
+    def parse(self):
+        statements = []
+        while self.peek()[0] is not None:
+            statements.append(self.statement())
+        return statements
+
+    def statement(self):
+        start = self.peek()[2]
+        if self.accept('{'):
+            body = []
+            while not self.accept('}'):
+                body.append(self.statement())
+            return ('block', body)
+        if self.accept(';'):
+            return ('block', [])
+        if self.peek()[0] == 'name' and self.peek()[1].lower() == 'if':
+            self.index += 1
+            condition_start = self.peek()[2]
+            condition = self.expression()
+            condition_text = self.code[condition_start:self.tokens[self.index - 1][3]]
+            then = self.statement()
+            otherwise = None
+            if self.peek()[0] == 'name' and self.peek()[1].lower() == 'else':
+                self.index += 1
+                otherwise = self.statement()
+            return ('if', condition, then, otherwise, 'if ' + condition_text)
+        if self.peek()[0] == 'field' and self.peek(1)[1] == '=':
+            field = self.take()[1]
+            self.take('=')
+            node = ('assign', field, self.expression())
+        else:
+            node = ('expr', self.expression())
+        end = self.tokens[self.index - 1][3]
+        if self.peek()[0] is not None and self.peek()[1] != '}':
+            self.take(';')
+        return node + (self.code[start:end],)
+
+    def expression(self):
+        node = self.conjunction()
+        while self.peek()[0] == 'name' and self.peek()[1].lower() == 'or':
+            self.index += 1
+            node = ('or', node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        node = self.negation()
+        while self.peek()[0] == 'name' and self.peek()[1].lower() == 'and':
+            self.index += 1
+            node = ('and', node, self.negation())
+        return node
+
+    def negation(self):
+        if self.peek()[0] == 'name' and self.peek()[1].lower() == 'not':
+            self.index += 1
+            return ('not', self.negation())
+        return self.comparison()
+
+    def comparison(self):
+        node = self.additive()
+        operator = self.peek()[1]
+        if self.peek()[0] == 'op' and operator in ('=~', '!~'):
+            self.index += 1
+            kind, value, _, _ = self.take()
+            if kind != 'regex':
+                raise ValueError(f"expression régulière attendue après {operator}")
+            return ('match', node, value, operator == '!~')
+        if self.peek()[0] == 'op' and operator in REPLAY_COMPARISONS:
+            self.index += 1
+            return ('compare', operator, node, self.additive())
+        return node
+
+    def additive(self):
+        node = self.multiplicative()
+        while self.peek()[0] == 'op' and self.peek()[1] in ('+', '-'):
+            operator = self.take()[1]
+            node = ('arith', operator, node, self.multiplicative())
+        return node
+
+    def multiplicative(self):
+        node = self.unary()
+        while self.peek()[0] == 'op' and self.peek()[1] in ('*', '/', '%'):
+            operator = self.take()[1]
+            node = ('arith', operator, node, self.unary())
+        return node
+
+    def unary(self):
+        if self.accept('-'):
+            return ('arith', '-', ('literal', 0), self.unary())
+        return self.primary()
+
+    def primary(self):
+        kind, value, _, _ = self.take()
+        if kind == 'string':
+            return ('literal', REPLAY_ESCAPE_RE.sub(lambda m: REPLAY_STRING_ESCAPES.get(m.group(1), m.group(1)),
+                                                    value[1:-1]))
+        if kind == 'number':
+            return ('literal', int(value))
+        if kind == 'field':
+            name = value[2:-1] if value.startswith('$(') else value[1:]
+            return ('capture', int(name)) if name.isdigit() else ('field', name)
+        if kind == 'op' and value == '(':
+            node = self.expression()
+            self.take(')')
+            return node
+        if kind == 'name':
+            if value.upper() in ('TRUE', 'FALSE'):
+                return ('literal', value.upper() == 'TRUE')
+            if value.lower() == 'undef':
+                return ('literal', None)
+            # Appel préfixé par une instance d'extension: xm_json->parse_json()
+            if self.accept('->'):
+                value = self.take()[1]
+            self.take('(')
+            args = []
+            if not self.accept(')'):
+                args.append(self.expression())
+                while self.accept(','):
+                    args.append(self.expression())
+                self.take(')')
+            return ('call', value.lower(), args)
+        raise ValueError(f"'{value}' inattendu")
+
+def _replay_parse_syslog(event):
+    match = REPLAY_SYSLOG_RE.match(event.get('raw_event') or '')
+    if not match:
+        return
+    priority, event_time, hostname, source, pid, message = match.groups()
+    if priority is not None:
+        event['SyslogFacilityValue'], event['SyslogSeverityValue'] = divmod(int(priority), 8)
+    event['EventTime'] = event_time
+    event['Hostname'] = hostname
+    event['SourceName'] = source
+    if pid is not None:
+        event['ProcessID'] = int(pid)
+    event['Message'] = message
+
+def _replay_parse_json(event):
+    try:
+        fields = json.loads(event.get('raw_event') or '')
+    except ValueError:
+        return
+    if isinstance(fields, dict):
+        event.update(fields)
+
+def _replay_to_json(event):
+    return json.dumps({name: value for name, value in event.items() if name != 'raw_event'}, default=str)
+
+def _replay_to_syslog_bsd(event):
+    priority = event.get('SyslogFacilityValue', 1) * 8 + event.get('SyslogSeverityValue', 5)
+    return (f"<{priority}>{event.get('EventTime') or time.strftime('%b %d %H:%M:%S')} "
+            f"{event.get('Hostname') or platform.node()} {event.get('SourceName') or 'nxlog'}: "
+            f"{event.get('Message') if event.get('Message') is not None else event.get('raw_event', '')}")
+
+def _replay_integer(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _replay_substr(value, start, end=None):
+    return None if value is None else str(value)[start:end]
+
+def _replay_delete(event, *names):
+    for name in names:
+        event.pop(name, None)
+
+# Fonctions utilisables dans les expressions (équivalents simplifiés)
+REPLAY_FUNCTIONS = {
+    'lc': lambda value: None if value is None else str(value).lower(),
+    'uc': lambda value: None if value is None else str(value).upper(),
+    'size': lambda value: None if value is None else len(str(value)),
+    'strlen': lambda value: None if value is None else len(str(value)),
+    'substr': _replay_substr,
+    'replace': lambda value, old, new, count=-1: None if value is None else str(value).replace(old, new, count),
+    'defined': lambda value: value is not None,
+    'string': lambda value: None if value is None else str(value),
+    'integer': _replay_integer,
+    'hostname': platform.node,
+    'now': lambda: time.strftime('%Y-%m-%d %H:%M:%S')
+}
+
+# Procédures: reçoivent l'événement puis les arguments évalués (le nom des champs pour
+# celles de REPLAY_FIELD_PROCEDURES)
+REPLAY_FIELD_PROCEDURES = ('delete', 'rename_field')
+REPLAY_PROCEDURES = {
+    'parse_syslog': _replay_parse_syslog,
+    'parse_syslog_bsd': _replay_parse_syslog,
+    'parse_syslog_ietf': _replay_parse_syslog,
+    'parse_json': _replay_parse_json,
+    'to_json': lambda event: event.__setitem__('raw_event', _replay_to_json(event)),
+    'to_syslog_bsd': lambda event: event.__setitem__('raw_event', _replay_to_syslog_bsd(event)),
+    'delete': _replay_delete,
+    'rename_field': lambda event, old, new: event.__setitem__(new, event.pop(old)) if old in event else None,
+    'log_debug': lambda event, *args: None,
+    'log_info': lambda event, *args: None,
+    'log_warning': lambda event, *args: None,
+    'log_error': lambda event, *args: None
+}
+
+# Expressions régulières compilées, partagées par toutes les sections et routes
+REPLAY_REGEX_CACHE = {}
+
+def replay_regex(pattern, options):
+    """
+    Retourne l'expression régulière compilée d'un littéral NXLog (cache partagé)
+    """
+    key = (pattern, options)
+    regex = REPLAY_REGEX_CACHE.get(key)
+    if regex is None:
+        regex = REPLAY_REGEX_CACHE[key] = re.compile(*to_python_regex(pattern, options))
+    return regex
+
+class ExecCompiler:
+    """
+    Compile l'arbre produit par ExecParser en fonctions Python f(événement, contexte)
+
+    Le contexte est une liste [dernière correspondance]. Avec timers, chaque
+    instruction simple (et chaque condition de if) est chronométrée dans
+    timers[(section, texte)] = [exécutions, secondes]. Les fonctions et procédures
+    inconnues sont sans effet et relevées dans unsupported.
+    """
+
+    def __init__(self, section_name, timers=None, unsupported=None):
+        self.section_name = section_name
+        self.timers = timers
+        self.unsupported = unsupported if unsupported is not None else set()
+
+    def timed(self, function, text):
+        if self.timers is None:
+            return function
+        stats = self.timers.setdefault((self.section_name, ' '.join(text.split())), [0, 0.0])
+        clock = time.perf_counter
+        
+        def run(event, context):
+            start = clock()
+            try:
+                return function(event, context)
+            finally:
+                stats[0] += 1
+                stats[1] += clock() - start
+        return run
+
+    def statements(self, nodes):
+        functions = [self.statement(node) for node in nodes]
+        
+        def run(event, context):
+            for function in functions:
+                function(event, context)
+        return functions[0] if len(functions) == 1 else run
+
+    def statement(self, node):
+        kind = node[0]
+        if kind == 'block':
+            return self.statements(node[1]) if node[1] else (lambda event, context: None)
+        if kind == 'if':
+            _, condition, then, otherwise, text = node
+            test = self.timed(self.expression(condition), text)
+            then = self.statement(then)
+            otherwise = self.statement(otherwise) if otherwise else None
+            
+            def run(event, context):
+                if test(event, context):
+                    then(event, context)
+                elif otherwise is not None:
+                    otherwise(event, context)
+            return run
+        if kind == 'assign':
+            _, field, expression, text = node
+            name = field[2:-1] if field.startswith('$(') else field[1:]
+            value = self.expression(expression)
+            
+            def run(event, context):
+                event[name] = value(event, context)
+            return self.timed(run, text)
+        
+        _, expression, text = node
+        if expression[0] == 'call' and expression[1] in ('drop', 'discard'):
+            def run(event, context):
+                raise ReplayDrop()
+            return self.timed(run, text)
+        if expression[0] == 'call' and expression[1] in REPLAY_PROCEDURES:
+            procedure = REPLAY_PROCEDURES[expression[1]]
+            if expression[1] in REPLAY_FIELD_PROCEDURES:
+                # delete($champ) reçoit le nom du champ, pas sa valeur
+                expression = expression[:2] + ([('literal', arg[1]) if arg[0] == 'field' else arg
+                                                for arg in expression[2]],)
+            args = [self.expression(arg) for arg in expression[2]]
+            
+            def run(event, context):
+                procedure(event, *[arg(event, context) for arg in args])
+            return self.timed(run, text)
+        return self.timed(self.expression(expression), text)
+
+    def expression(self, node):
+        kind = node[0]
+        if kind == 'literal':
+            value = node[1]
+            return lambda event, context: value
+        if kind == 'field':
+            name = node[1]
+            return lambda event, context: event.get(name)
+        if kind == 'capture':
+            group = node[1]
+            
+            def capture(event, context):
+                match = context[0]
+                if match is None or group > (match.re.groups or 0):
+                    return None
+                return match.group(group)
+            return capture
+        if kind == 'match':
+            return self.match(node)
+        if kind == 'compare':
+            compare = REPLAY_COMPARISONS[node[1]]
+            left, right = self.expression(node[2]), self.expression(node[3])
+            
+            def run(event, context):
+                a, b = left(event, context), right(event, context)
+                if a is None or b is None:
+                    return None
+                try:
+                    return compare(a, b)
+                except TypeError:
+                    return compare(str(a), str(b))
+            return run
+        if kind == 'arith':
+            operator = node[1]
+            left, right = self.expression(node[2]), self.expression(node[3])
+            
+            def run(event, context):
+                a, b = left(event, context), right(event, context)
+                if a is None or b is None:
+                    return None
+                if operator == '+':
+                    return a + b if isinstance(a, int) and isinstance(b, int) else f"{a}{b}"
+                try:
+                    if operator == '-':
+                        return a - b
+                    if operator == '*':
+                        return a * b
+                    return a // b if operator == '/' else a % b
+                except (TypeError, ZeroDivisionError):
+                    return None
+            return run
+        if kind in ('and', 'or'):
+            left, right = self.expression(node[1]), self.expression(node[2])
+            if kind == 'and':
+                return lambda event, context: bool(left(event, context)) and bool(right(event, context))
+            return lambda event, context: bool(left(event, context)) or bool(right(event, context))
+        if kind == 'not':
+            operand = self.expression(node[1])
+            return lambda event, context: not operand(event, context)
+        if kind == 'call':
+            _, name, args = node
+            args = [self.expression(arg) for arg in args]
+            if name == 'to_json':
+                return lambda event, context: _replay_to_json(event)
+            function = REPLAY_FUNCTIONS.get(name)
+            if function is None:
+                self.unsupported.add(name)
+                return lambda event, context: None
+            
+            def run(event, context):
+                try:
+                    return function(*[arg(event, context) for arg in args])
+                except (TypeError, ValueError):
+                    return None
+            return run
+        raise ValueError(f"expression non reconnue: {kind}")
+
+    def match(self, node):
+        _, target, (pattern, replacement, options), negate = node
+        regex = replay_regex(pattern, options.replace('g', ''))
+        value = self.expression(target)
+        
+        if replacement is not None:
+            # Substitution: le remplacement utilise $1 comme \1
+            if target[0] != 'field':
+                raise ValueError("substitution sur autre chose qu'un champ")
+            name = target[1]
+            template = re.sub(r'\$(\d)', r'\\\1', replacement.replace('\\', '\\\\'))
+            count = 0 if 'g' in options else 1
+            
+            def substitute(event, context):
+                current = event.get(name)
+                if current is None:
+                    return False
+                result, replaced = regex.subn(template, str(current), count)
+                event[name] = result
+                return bool(replaced) != negate
+            return substitute
+        
+        named = list(regex.groupindex)
+        
+        def run(event, context):
+            current = value(event, context)
+            match = regex.search(current if isinstance(current, str) else str(current)) \
+                if current is not None else None
+            if match is not None:
+                context[0] = match
+                for name in named:
+                    event[name] = match.group(name)
+            return (match is not None) != negate
+        return run
+
+def compile_exec_program(section_name, content, timers=None, unsupported=None):
+    """
+    Compile le code Exec d'une section: retourne une fonction f(événement), ou None sans Exec
+
+    Lève ValueError si le code sort du sous-ensemble pris en charge.
+    """
+    nodes = []
+    for code in iter_exec_code(content):
+        nodes.extend(ExecParser(code).parse())
+    if not nodes:
+        return None
+    body = ExecCompiler(section_name, timers, unsupported).statements(nodes)
+    
+    def program(event):
+        body(event, [None])
+    return program
+
+def run_replay_pipeline(inputs, processors, outputs, lines):
+    """
+    Fait passer chaque ligne par chaque entrée, les processeurs puis une copie par sortie
+
+    Retourne (événements abandonnés par drop(), événements livrés aux sorties).
+    """
+    dropped = delivered = 0
+    processors = [program for program in processors if program]
+    copy = len(outputs) > 1
+    for line in lines:
+        for input_program in inputs:
+            event = {'raw_event': line}
+            try:
+                if input_program:
+                    input_program(event)
+                for program in processors:
+                    program(event)
+            except ReplayDrop:
+                dropped += 1
+                continue
+            for program in outputs:
+                if program:
+                    try:
+                        program(dict(event) if copy else event)
+                    except ReplayDrop:
+                        dropped += 1
+                        continue
+                delivered += 1
+    return dropped, delivered
+
+def replay_files(config_files, lines, jobs=1, cache=None, use_mmap=False):
+    """
+    Rejoue les lignes d'échantillon dans le code Exec de chaque route des configurations
+
+    Une première mesure sans instrumentation donne le débit (répétée jusqu'à
+    REPLAY_MIN_TIME), une seconde chronomètre chaque instruction pour les points chauds.
+    Les routes dont les sections portent le même code Exec (configurations générées
+    depuis un même modèle) réutilisent la mesure déjà faite.
+    Retourne la liste des rapports par route.
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    reports = []
+    measured = {}
+    for config_file, config_data, flow_data, output in iter_parsed_configs(config_files, jobs, cache, use_mmap,
+                                                                           ContentVariants()):
+        if output:
+            print(output, end='')
+        sections = flow_data['sections']
+        for route in flow_data['routes']:
+            steps = [[name for name in (part.strip() for part in step.split(',')) if name in sections]
+                     for step in route['path'].split('=>')]
+            if len(steps) < 2 or not steps[0] or not steps[-1]:
+                continue
+            names = steps[0] + [name for step in steps[1:-1] for name in step] + steps[-1]
+            key = tuple(tuple(tuple(iter_exec_code(sections[name]['content'])) for name in step) for step in steps)
+            if key not in measured:
+                measured[key] = replay_route(sections, steps, names, lines)
+            measure = measured[key]
+            reports.append({
+                'file': config_file,
+                'route': route['name'],
+                'path': ' => '.join(', '.join(step) for step in steps),
+                'lines': len(lines),
+                **measure,
+                'hot_spots': [dict(spot, section=names[spot['section']]) for spot in measure['hot_spots']],
+                'errors': {names[index]: error for index, error in measure['errors'].items()}
+            })
+    return reports
+
+def replay_route(sections, steps, names, lines):
+    """
+    Mesure le débit et les points chauds d'une route déjà découpée en étapes
+
+    Les sections sont désignées par leur position dans names dans les points chauds
+    et les erreurs, pour que la mesure reste valable pour une route au code identique.
+    """
+    programs = {}
+    errors = {}
+    unsupported = set()
+    for index, name in enumerate(names):
+        if name not in programs:
+            try:
+                programs[name] = compile_exec_program(name, sections[name]['content'], unsupported=unsupported)
+            except (ValueError, re.error) as e:
+                errors[index] = str(e)
+                programs[name] = None
+    
+    def pipeline(table):
+        return ([table.get(name) for name in steps[0]],
+                [table.get(name) for step in steps[1:-1] for name in step],
+                [table.get(name) for name in steps[-1]])
+    
+    with TIMINGS.stage('replay'):
+        rounds = dropped = delivered = 0
+        elapsed = 0.0
+        start = time.perf_counter()
+        while elapsed < REPLAY_MIN_TIME and rounds < REPLAY_MAX_ROUNDS:
+            round_dropped, round_delivered = run_replay_pipeline(*pipeline(programs), lines)
+            dropped += round_dropped
+            delivered += round_delivered
+            rounds += 1
+            elapsed = time.perf_counter() - start
+        
+        # Seconde passe instrumentée pour les points chauds
+        timers = {}
+        instrumented = {name: compile_exec_program(name, sections[name]['content'], timers)
+                        for name in names if programs.get(name)}
+        start = time.perf_counter()
+        run_replay_pipeline(*pipeline(instrumented), lines)
+        instrumented_time = time.perf_counter() - start
+    
+    events = rounds * len(lines) * len(steps[0])
+    hot_spots = sorted(({'section': names.index(section_name), 'statement': text, 'executions': executions,
+                         'total_ms': seconds * 1000,
+                         'us_per_execution': seconds / executions * 1e6 if executions else 0.0,
+                         'percent': seconds / instrumented_time * 100 if instrumented_time else 0.0}
+                        for (section_name, text), (executions, seconds) in timers.items()),
+                       key=lambda spot: spot['total_ms'], reverse=True)
+    return {
+        'events': events,
+        'elapsed': elapsed,
+        'events_per_second': events / elapsed if elapsed else None,
+        'us_per_event': elapsed / events * 1e6 if events else None,
+        'dropped': dropped,
+        'delivered': delivered,
+        'hot_spots': hot_spots,
+        'errors': errors,
+        'unsupported': sorted(unsupported)
+    }
+
+def display_replay(reports, format_type='table'):
+    """
+    Affiche les débits et points chauds retournés par replay_files
+    """
+    if format_type == 'json':
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return
+    if format_type == 'jsonl':
+        for report in reports:
+            print(json.dumps(report, ensure_ascii=False))
+        return
+    
+    headers = ['Fichier', 'Route', 'Chemin', 'Événements/s', 'µs/événement', 'Abandonnés', 'Livrés', 'Non pris en charge']
+    rows = []
+    for report in reports:
+        problems = [f"{name}: {error}" for name, error in report['errors'].items()] + \
+            [f"{name}()" for name in report['unsupported']]
+        rows.append([report['file'], report['route'], report['path'],
+                     f"{report['events_per_second']:.0f}" if report['events_per_second'] else '',
+                     f"{report['us_per_event']:.2f}" if report['us_per_event'] is not None else '',
+                     report['dropped'], report['delivered'], '; '.join(problems)])
+    spot_headers = ['Fichier', 'Route', 'Section', 'Instruction', 'Exécutions', 'µs/exécution', 'Temps (%)']
+    spot_rows = [[report['file'], report['route'], spot['section'],
+                  spot['statement'] if len(spot['statement']) <= REPLAY_STATEMENT_WIDTH
+                  else spot['statement'][:REPLAY_STATEMENT_WIDTH - 3] + '...',
+                  spot['executions'], f"{spot['us_per_execution']:.2f}", f"{spot['percent']:.1f}"]
+                 for report in reports for spot in report['hot_spots'][:REPLAY_TOP_STATEMENTS]]
+    
+    for table_headers, table_rows in ((headers, rows), (spot_headers, spot_rows)):
+        if not table_rows:
+            continue
+        if format_type == 'csv':
+            print(','.join(table_headers))
+            for row in table_rows:
+                print(','.join('"' + str(cell).replace('"', '""') + '"' if ',' in str(cell) or '"' in str(cell)
+                               else str(cell) for cell in row))
+        elif TABULATE_AVAILABLE:
+            print(tabulate(table_rows, headers=table_headers, tablefmt='grid'))
+        else:
+            print(simple_table_format(table_rows, table_headers))
+        print()
+
+# Jonction réseau entre fichiers (--network-links): sorties om_* -> écoutes im_* du parc
+NETWORK_OUTPUT_PROTOCOLS = {'om_tcp': 'tcp', 'om_ssl': 'ssl', 'om_udp': 'udp', 'om_udpspoof': 'udp'}
+NETWORK_LISTENER_PROTOCOLS = {'im_tcp': 'tcp', 'im_ssl': 'ssl', 'im_udp': 'udp'}
+NETWORK_DEFAULT_PORT = 514
+NETWORK_WILDCARD_HOSTS = frozenset(('', '*', '0.0.0.0', '::', '[::]'))
+NETWORK_LOCAL_HOSTS = frozenset(('localhost', '127.0.0.1', '::1', '[::1]'))
+NETWORK_HOST_PARAMS = frozenset(('host', 'listenaddr', 'listen'))
+NETWORK_ENDPOINT_RE = re.compile(r'^\[?([^\[\]]*?)\]?(?::(\d+))?$')
+NETWORK_MATCH_LABELS = {
+    'address': 'adresse',
+    'file': 'nom du fichier',
+    'port': 'seule écoute du port (à confirmer)',
+    'local': 'même fichier'
+}
+
+def network_endpoint(value, port):
+    """
+    Découpe une valeur Host/ListenAddr ("hôte", "hôte:port", "[ipv6]:port") en (hôte normalisé, port)
+    """
+    value = value.strip().strip('"\'').lower()
+    if value.count(':') > 1 and not value.startswith('['):
+        # Adresse IPv6 sans crochets: pas de port possible
+        return value, port
+    match = NETWORK_ENDPOINT_RE.match(value)
+    if not match:
+        return value, port
+    host, explicit_port = match.groups()
+    return host.rstrip('.'), int(explicit_port) if explicit_port else port
+
+def network_host_names(host):
+    """
+    Noms sous lesquels un hôte est recherché: le nom complet puis son premier label
+    """
+    if not host or host[0].isdigit() or ':' in host:
+        return (host,)
+    short = host.split('.', 1)[0]
+    return (host,) if short == host else (host, short)
+
+def collect_network_endpoints(config_file, config_data, flow_data):
+    """
+    Relève les destinations des sorties réseau et les écoutes des entrées réseau d'un fichier
+
+    Toutes les valeurs Host sont conservées (plusieurs Host = bascule); Port s'applique
+    aux hôtes qui n'ont pas de port explicite. Retourne (sorties, écoutes).
+    """
+    sections = flow_data['sections']
+    network = {name: info for name, info in sections.items()
+               if info['module'].lower() in NETWORK_OUTPUT_PROTOCOLS
+               or info['module'].lower() in NETWORK_LISTENER_PROTOCOLS}
+    if not network:
+        return [], []
+    hosts = defaultdict(list)
+    ports = {}
+    for _, section_name, param_name, value, _ in config_data:
+        if section_name not in network:
+            continue
+        param_name = param_name.lower()
+        if param_name in NETWORK_HOST_PARAMS:
+            hosts[section_name].append(value)
+        elif param_name == 'port':
+            ports[section_name] = value
+    
+    outputs = []
+    listeners = []
+    for section_name, section_info in network.items():
+        module = section_info['module'].lower()
+        try:
+            port = int(str(ports.get(section_name, NETWORK_DEFAULT_PORT)).strip().strip('"\''))
+        except ValueError:
+            port = None
+        record = {'file': config_file, 'section': section_name, 'module': section_info['module']}
+        if module in NETWORK_OUTPUT_PROTOCOLS:
+            for value in hosts[section_name]:
+                host, host_port = network_endpoint(value, port)
+                outputs.append(dict(record, protocol=NETWORK_OUTPUT_PROTOCOLS[module], host=host, port=host_port))
+        else:
+            for value in hosts[section_name] or ['']:
+                host, host_port = network_endpoint(value, port)
+                listeners.append(dict(record, protocol=NETWORK_LISTENER_PROTOCOLS[module], host=host,
+                                      port=host_port))
+    return outputs, listeners
+
+def join_network_endpoints(outputs, listeners):
+    """
+    Relie chaque sortie réseau aux écoutes correspondantes du parc par jointure de hachage
+
+    Les écoutes sont indexées une fois par (protocole, nom, port): leur adresse si elle
+    est explicite, sinon le nom de leur fichier (collecteur1.conf écoute pour
+    "collecteur1" ou "collecteur1.exemple.fr"). Une destination sans correspondance se
+    rabat sur l'écoute du même fichier pour localhost. À défaut, elle est reliée à la
+    seule écoute du parc pour ce protocole et ce port, mais la liaison est marquée
+    tentative: l'hôte peut aussi bien être extérieur au parc (SIEM, relais), et ces
+    liaisons sont exclues du fan-in et de la cartographie. Le coût est linéaire en
+    nombre de sections réseau. Retourne (liaisons, sorties sans écoute).
+    """
+    by_name = defaultdict(list)
+    by_port = defaultdict(list)
+    for listener in listeners:
+        if listener['host'] in NETWORK_WILDCARD_HOSTS:
+            stem = os.path.splitext(os.path.basename(listener['file']))[0].lower()
+            names, match = network_host_names(stem), 'file'
+        else:
+            names, match = network_host_names(listener['host']), 'address'
+        for name in names:
+            by_name[(listener['protocol'], name, listener['port'])].append((listener, match))
+        by_port[(listener['protocol'], listener['port'])].append(listener)
+    
+    links = []
+    unmatched = []
+    for output in outputs:
+        matches = []
+        if output['host'] in NETWORK_LOCAL_HOSTS:
+            matches = [(listener, 'local') for listener in by_port.get((output['protocol'], output['port']), ())
+                       if listener['file'] == output['file']]
+        if not matches:
+            for name in network_host_names(output['host']):
+                matches = by_name.get((output['protocol'], name, output['port']))
+                if matches:
+                    break
+        if not matches and output['host'] not in NETWORK_LOCAL_HOSTS:
+            candidates = by_port.get((output['protocol'], output['port']), ())
+            if len(candidates) == 1:
+                matches = [(candidates[0], 'port')]
+        if not matches:
+            unmatched.append(output)
+            continue
+        for listener, match in matches:
+            links.append({
+                'source_file': output['file'], 'source_section': output['section'],
+                'source_module': output['module'], 'protocol': output['protocol'],
+                'host': output['host'], 'port': output['port'],
+                'destination_file': listener['file'], 'destination_section': listener['section'],
+                'destination_module': listener['module'], 'match': match, 'tentative': match == 'port'
+            })
+    return links, unmatched
+
+def network_fan_in(links):
+    """
+    Fan-in par port de collecteur: fichiers émetteurs distincts et sorties reliées, décroissant
+
+    Les liaisons tentatives (appariées sur le seul port) ne sont pas comptées.
+    """
+    senders = defaultdict(set)
+    outputs = defaultdict(set)
+    for link in links:
+        if link['tentative']:
+            continue
+        key = (link['destination_file'], link['destination_section'], link['protocol'], link['port'])
+        senders[key].add(link['source_file'])
+        outputs[key].add((link['source_file'], link['source_section']))
+    fan_in = [{'file': file_name, 'section': section_name, 'protocol': protocol, 'port': port,
+               'senders': len(file_senders), 'outputs': len(outputs[key])}
+              for key, file_senders in senders.items() for file_name, section_name, protocol, port in [key]]
+    fan_in.sort(key=lambda entry: (-entry['senders'], -entry['outputs'], entry['file'], entry['port'] or 0))
+    return fan_in
+
+def link_network_files(config_files, jobs=1, cache=None, use_mmap=False):
+    """
+    Relève les extrémités réseau de chaque configuration puis les relie à l'échelle du parc
+
+    Seules les extrémités sont conservées pendant le parcours des fichiers.
+    Retourne (liaisons, fan-in, sorties sans écoute).
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    outputs = []
+    listeners = []
+    for config_file, config_data, flow_data, output in iter_parsed_configs(config_files, jobs, cache, use_mmap,
+                                                                           ContentVariants()):
+        if output:
+            print(output, end='')
+        file_outputs, file_listeners = collect_network_endpoints(config_file, config_data, flow_data)
+        outputs.extend(file_outputs)
+        listeners.extend(file_listeners)
+    outputs.sort(key=lambda record: (record['file'], record['section']))
+    with TIMINGS.stage('network_join'):
+        links, unmatched = join_network_endpoints(outputs, listeners)
+        fan_in = network_fan_in(links)
+    return links, fan_in, unmatched
+
+def display_network_links(links, fan_in, unmatched, format_type='table'):
+    """
+    Affiche les liaisons réseau entre fichiers, le fan-in des collecteurs et les sorties sans écoute
+    """
+    if format_type == 'json':
+        print(json.dumps({'links': links, 'fan_in': fan_in, 'unmatched': unmatched}, indent=2, ensure_ascii=False))
+        return
+    if format_type == 'jsonl':
+        for record_type, records in (('link', links), ('fan_in', fan_in), ('unmatched', unmatched)):
+            for record in records:
+                print(json.dumps(dict(record, record=record_type), ensure_ascii=False))
+        return
+    
+    def endpoint(record):
+        return f"{record['protocol']}://{record['host'] or '*'}:{record['port']}"
+    
+    tables = [
+        (['Collecteur', 'Écoute', 'Protocole', 'Port', 'Fichiers émetteurs', 'Sorties'],
+         [[entry['file'], entry['section'], entry['protocol'], entry['port'], entry['senders'], entry['outputs']]
+          for entry in fan_in]),
+        (['Fichier', 'Sortie', 'Destination', 'Collecteur', 'Écoute', 'Correspondance'],
+         [[link['source_file'], link['source_section'], endpoint(link), link['destination_file'],
+           link['destination_section'], NETWORK_MATCH_LABELS[link['match']]] for link in links]),
+        (['Fichier', 'Sortie', 'Destination hors parc'],
+         [[output['file'], output['section'], endpoint(output)] for output in unmatched])
+    ]
+    for headers, rows in tables:
+        if not rows:
+            continue
+        if format_type == 'csv':
+            print(','.join(headers))
+            for row in rows:
+                print(','.join('"' + str(cell).replace('"', '""') + '"' if ',' in str(cell) or '"' in str(cell)
+                               else str(cell) for cell in row))
+        elif TABULATE_AVAILABLE:
+            print(tabulate(rows, headers=headers, tablefmt='grid'))
+        else:
+            print(simple_table_format(rows, headers))
+        print()
+    info = sys.stderr if format_type == 'csv' else sys.stdout
+    tentative = sum(1 for link in links if link['tentative'])
+    print(f"Liaisons réseau: {len(links) - tentative} liaison(s) vers {len(fan_in)} port(s) de collecteur, "
+          f"{tentative} liaison(s) à confirmer, {len(unmatched)} destination(s) hors parc", file=info)
+
+def sanitize_node_name(name):
+    """
+    Nettoie un nom de nœud pour qu'il soit valide en Graphviz
+    """
+    # Remplacer les caractères problématiques
+    sanitized = re.sub(r'[^a-zA-Z0-9_]', '_', str(name))
+    # S'assurer que le nom ne commence pas par un chiffre
+    if sanitized and sanitized[0].isdigit():
+        sanitized = 'node_' + sanitized
+    # S'assurer que le nom n'est pas vide
+    if not sanitized:
+        sanitized = 'unnamed_node'
+    return sanitized
 
 def escape_label(label):
     """
@@ -848,10 +5362,44 @@ def escape_label(label):
         escaped = escaped[:47] + "..."
     return escaped
 
+def generate_graphviz_files(all_configs, output_dir="output", changed=None, synthesis_mode='auto',
+                            synthesis_max_edges=None, base_dir=None):
+    """
+    Génère les fichiers Graphviz (.dot) pour la visualisation des flux
+
+    Si changed est fourni, seuls les fichiers .dot de ces configurations sont réécrits;
+    la cartographie de synthèse est toujours régénérée à partir de toutes les configurations.
+    synthesis_mode et synthesis_max_edges sont transmis à generate_synthesis_graphviz.
+    Les fichiers sont identifiés par config_file_key relativement à base_dir (par défaut
+    leur répertoire commun): nœuds, clusters et noms des fichiers .dot en dérivent.
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    if base_dir is None:
+        base_dir = config_files_root(all_configs)
+    
+    # Couleurs pour les différents types de sections
+    colors = {
+        'Input': '#90EE90',      # Vert clair
+        'Output': '#FFB6C1',     # Rose clair
+        'Processor': '#87CEEB',  # Bleu ciel
+        'Extension': '#F0E68C',  # Kaki
+        'Route': '#DDA0DD'       # Prune
+    }
+    
+    # Couleurs pour les routes
+    route_colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8']
+    
+    synthesis_flows = []  # Pour la cartographie de synthèse
+    synthesis_sections = {}
+    network_outputs = []  # Extrémités réseau, reliées entre fichiers après le parcours
+    network_listeners = []
+    file_keys = {}
+    
     for config_file, (config_data, flow_data) in all_configs.items():
-        filename = os.path.basename(config_file).replace('.conf', '')
+        file_key = config_file_key(config_file, base_dir)
         # Nettoyer le nom de fichier
-        filename = sanitize_node_name(filename)
+        filename = sanitize_node_name(file_key)
         dot_filename = os.path.join(output_dir, f"{filename}_flow.dot")
         
         if not flow_data['flows']:
@@ -862,8 +5410,8 @@ def escape_label(label):
             prefixed_name = f"{filename}_{sanitize_node_name(section_name)}"
             synthesis_sections[prefixed_name] = {
                 'type': section_info['type'],
-                'content': section_info['content'],
-                'file': filename
+                'module': section_info['module'],
+                'file': file_key
             }
         
         for flow in flow_data['flows']:
@@ -877,9 +5425,17 @@ def escape_label(label):
                 'destination_module': flow['destination_module'],
                 'priority': flow['priority'],
                 'condition': flow['condition'],
-                'file': filename
+                'file': file_key
             })
         
+        file_outputs, file_listeners = collect_network_endpoints(config_file, config_data, flow_data)
+        network_outputs.extend(file_outputs)
+        network_listeners.extend(file_listeners)
+        file_keys[config_file] = file_key
+        
+        if changed is not None and config_file not in changed:
+            continue
+        
         try:
             with open(dot_filename, 'w', encoding='utf-8') as f:
                 f.write('digraph nxlog_flow {\n')
@@ -889,13 +5445,13 @@ def escape_label(label):
                 
                 # Titre
                 f.write(f'    labelloc="t";\n')
-                f.write(f'    label="Cartographie des flux NXLog - {escape_label(filename)}";\n\n')
+                f.write(f'    label="Cartographie des flux NXLog - {escape_label(file_key)}";\n\n')
                 
                 # Définir les nœuds
                 for section_name, section_info in flow_data['sections'].items():
                     safe_section_name = sanitize_node_name(section_name)
                     color = colors.get(section_info['type'], '#FFFFFF')
-                    module = extract_module_from_content(section_info['content'])
+                    module = section_info['module']
                     label = f"{escape_label(section_name)}\\n({escape_label(section_info['type'])})\\n{escape_label(module)}"
                     f.write(f'    "{safe_section_name}" [fillcolor="{color}", label="{label}"];\n')
                 
@@ -934,7 +5490,7 @@ def escape_label(label):
                 
                 if unconnected_sections:
                     f.write('\n    // Sections non connectées\n')
-                    for section in unconnected_sections:
+                    for section in sorted(unconnected_sections):
                         f.write(f'    "{section}" [style="filled,dashed"];\n')
                 
                 # Légende
@@ -964,7 +5520,7 @@ def escape_label(label):
             script_filename = os.path.join(output_dir, f"{filename}_generate_images.sh")
             with open(script_filename, 'w') as f:
                 f.write('#!/bin/bash\n\n')
-                f.write(f'# Script de génération d\'images pour {filename}\n\n')
+                f.write(f'# Script de génération d\'images pour {file_key}\n\n')
                 f.write(f'DOT_FILE="{filename}_flow.dot"\n')
                 f.write(f'BASE_NAME="{filename}_flow"\n\n')
                 f.write('if ! command -v dot &> /dev/null; then\n')
@@ -995,11 +5551,176 @@ def escape_label(label):
     
     # Générer la cartographie de synthèse
     if synthesis_flows:
-        generate_synthesis_graphviz(synthesis_flows, synthesis_sections, output_dir)
+        network_links, _ = join_network_endpoints(network_outputs, network_listeners)
+        generate_synthesis_graphviz(synthesis_flows, synthesis_sections, output_dir, synthesis_mode,
+                                    synthesis_max_edges, network_links, file_keys)
+
+# Modes de la cartographie de synthèse (--synthesis-mode)
+SYNTHESIS_MODES = ('auto', 'full', 'module', 'topology')
+SYNTHESIS_TITLES = {
+    'full': 'Vue d ensemble',
+    'module': 'Vue par type de module',
+    'topology': 'Topologies identiques regroupees'
+}
+
+# Mode auto: au-delà de ce nombre de sections, regrouper les topologies identiques...
+SYNTHESIS_AUTO_MAX_SECTIONS = 300
+# ... puis, au-delà de ce nombre de topologies distinctes, regrouper par type de module
+SYNTHESIS_AUTO_MAX_GROUPS = 40
+# Liaisons affichées par cluster lorsque le mode auto agrège la synthèse
+SYNTHESIS_AUTO_MAX_EDGES = 50
+
+def synthesis_topologies(synthesis_flows, synthesis_sections):
+    """
+    Regroupe les fichiers dont la topologie est identique
+
+    La topologie d'un fichier est le nombre de sections et de flux par type et module,
+    indépendamment des noms des sections et des routes. Retourne une liste de tuples
+    (fichiers, nœuds, liaisons) dans l'ordre de première apparition des fichiers.
+    """
+    file_nodes = defaultdict(Counter)
+    for section_info in synthesis_sections.values():
+        file_nodes[section_info['file']][(section_info['type'], section_info['module'])] += 1
+    
+    file_edges = defaultdict(Counter)
+    for flow in synthesis_flows:
+        file_edges[flow['file']][(flow['source_type'], flow['source_module'],
+                                  flow['destination_type'], flow['destination_module'])] += 1
+    
+    topologies = {}
+    for file_name, nodes in file_nodes.items():
+        edges = file_edges[file_name]
+        signature = (tuple(sorted(nodes.items())), tuple(sorted(edges.items())))
+        topologies.setdefault(signature, ([], nodes, edges))[0].append(file_name)
+    return list(topologies.values())
+
+def build_synthesis_view(synthesis_flows, synthesis_sections, mode):
+    """
+    Construit les groupes de nœuds et de liaisons de la cartographie de synthèse
+
+    Chaque groupe est un dictionnaire name/label/nodes/edges; un groupe sans label est
+    écrit hors cluster. Les nœuds sont des tuples (identifiant, label, type) et les liaisons
+    des tuples (source, destination, label, clé de couleur, nombre de flux).
+    """
+    if mode == 'module':
+        # Une seule vue sans clusters: un nœud par type de section et module
+        nodes = Counter((section_info['type'], section_info['module']) for section_info in synthesis_sections.values())
+        edges = Counter((flow['source_type'], flow['source_module'], flow['destination_type'], flow['destination_module'])
+                        for flow in synthesis_flows)
+        group = {'name': 'modules', 'label': None, 'nodes': [], 'edges': []}
+        for (section_type, module), count in nodes.items():
+            label = f"{escape_label(module)}\\n({escape_label(section_type)})\\n{count} section(s)"
+            group['nodes'].append((sanitize_node_name(f"{section_type}_{module}"), label, section_type))
+        for (source_type, source_module, destination_type, destination_module), count in edges.items():
+            source = sanitize_node_name(f"{source_type}_{source_module}")
+            destination = sanitize_node_name(f"{destination_type}_{destination_module}")
+            group['edges'].append((source, destination, f"{count} flux", source, count))
+        return [group]
+    
+    if mode == 'topology':
+        # Un cluster par topologie, annoté du nombre de fichiers qui la partagent
+        groups = []
+        for index, (files, nodes, edges) in enumerate(synthesis_topologies(synthesis_flows, synthesis_sections)):
+            prefix = f"topology_{index}"
+            if len(files) == 1:
+                label = f"{escape_label(files[0])}.conf"
+            else:
+                label = f"{len(files)} fichiers identiques\\n{escape_label(files[0])}.conf, ..."
+            group = {'name': prefix, 'label': label, 'nodes': [], 'edges': []}
+            for (section_type, module), count in nodes.items():
+                label = f"{escape_label(module)}\\n({escape_label(section_type)})"
+                if count > 1:
+                    label += f"\\nx{count}"
+                group['nodes'].append((sanitize_node_name(f"{prefix}_{section_type}_{module}"), label, section_type))
+            for (source_type, source_module, destination_type, destination_module), count in edges.items():
+                source = sanitize_node_name(f"{prefix}_{source_type}_{source_module}")
+                destination = sanitize_node_name(f"{prefix}_{destination_type}_{destination_module}")
+                group['edges'].append((source, destination, f"x{count}" if count > 1 else "", source_module, count))
+            groups.append(group)
+        return groups
+    
+    # Vue complète: un cluster par fichier avec toutes ses sections
+    groups = {}
+    for section_name, section_info in synthesis_sections.items():
+        file_name = section_info['file']
+        group = groups.get(file_name)
+        if group is None:
+            group = groups[file_name] = {'name': sanitize_node_name(file_name),
+                                         'label': f"{escape_label(file_name)}.conf", 'nodes': [], 'edges': []}
+        # Extraire le nom propre de la section (sans le préfixe du fichier)
+        prefix = f"{sanitize_node_name(file_name)}_"
+        clean_name = section_name[len(prefix):] if section_name.startswith(prefix) else section_name
+        
+        label = f"{escape_label(clean_name)}\\n({escape_label(section_info['type'])})\\n{escape_label(section_info['module'])}"
+        group['nodes'].append((sanitize_node_name(section_name), label, section_info['type']))
+    
+    for flow in synthesis_flows:
+        # Extraire le nom propre de la route (sans le préfixe du fichier)
+        prefix = f"{sanitize_node_name(flow['file'])}_"
+        clean_route = flow['route'][len(prefix):] if flow['route'].startswith(prefix) else flow['route']
+        
+        label = f"{escape_label(clean_route)}\\nP:{escape_label(flow['priority'])}"
+        groups[flow['file']]['edges'].append((sanitize_node_name(flow['source']),
+                                              sanitize_node_name(flow['destination']), label, flow['route'], 1))
+    return list(groups.values())
+
+def synthesis_network_group(network_links, synthesis_flows, synthesis_sections, mode, file_keys):
+    """
+    Groupe hors cluster des liaisons réseau entre fichiers de la cartographie de synthèse
+
+    Les liaisons sont rattachées aux nœuds de la vue choisie (section, topologie ou
+    module) par l'identifiant de leurs fichiers dans file_keys (fichier: config_file_key)
+    et agrégées par couple de nœuds. Retourne None sans liaison affichable.
+    """
+    if mode == 'topology':
+        prefixes = {file_name: f"topology_{index}"
+                    for index, (files, _, _) in enumerate(synthesis_topologies(synthesis_flows, synthesis_sections))
+                    for file_name in files}
+    
+    def node(file_path, section_name):
+        file_name = file_keys.get(file_path)
+        if file_name is None:
+            return None
+        prefixed_name = f"{sanitize_node_name(file_name)}_{sanitize_node_name(section_name)}"
+        section_info = synthesis_sections.get(prefixed_name)
+        if section_info is None:
+            return None
+        if mode == 'module':
+            return sanitize_node_name(f"{section_info['type']}_{section_info['module']}")
+        if mode == 'topology':
+            return sanitize_node_name(f"{prefixes[file_name]}_{section_info['type']}_{section_info['module']}")
+        return sanitize_node_name(prefixed_name)
+    
+    edges = defaultdict(Counter)
+    for link in network_links:
+        if link['tentative']:
+            continue
+        source = node(link['source_file'], link['source_section'])
+        destination = node(link['destination_file'], link['destination_section'])
+        if source and destination:
+            edges[(source, destination)][f"{link['protocol']}:{link['port']}"] += 1
+    if not edges:
+        return None
+    group = {'name': 'network', 'label': None, 'nodes': [], 'edges': [], 'style': 'dashed'}
+    for (source, destination), ports in edges.items():
+        count = sum(ports.values())
+        label = escape_label(', '.join(sorted(ports)))
+        if count > 1:
+            label += f"\\nx{count}"
+        group['edges'].append((source, destination, label, 'network', count))
+    return group
 
-def generate_synthesis_graphviz(synthesis_flows, synthesis_sections, output_dir):
+def generate_synthesis_graphviz(synthesis_flows, synthesis_sections, output_dir, mode='auto', max_edges=None,
+                                network_links=None, file_keys=None):
     """
     Génère la cartographie de synthèse globale combinant tous les fichiers
+
+    Modes: full (toutes les sections, un cluster par fichier), module (un nœud par type
+    de module), topology (un cluster par topologie distincte avec le nombre de fichiers).
+    En mode auto, la vue complète est réservée aux petits parcs. max_edges limite le
+    nombre de liaisons affichées par cluster (les plus chargées sont conservées).
+    network_links (join_network_endpoints) ajoute en pointillés les liaisons réseau
+    entre fichiers, dont les nœuds sont retrouvés par file_keys.
     """
     dot_filename = os.path.join(output_dir, "nxlog_synthesis_flow.dot")
     
@@ -1015,6 +5736,25 @@ def generate_synthesis_graphviz(synthesis_flows, synthesis_sections, output_dir)
     # Couleurs de fond pour les clusters (fichiers)
     cluster_colors = ['#F0F8FF', '#F5F5DC', '#F0FFF0', '#FFF8DC', '#F8F8FF', '#F5FFFA']
     
+    groups = None
+    if mode == 'auto':
+        mode = 'full'
+        if len(synthesis_sections) > SYNTHESIS_AUTO_MAX_SECTIONS:
+            mode = 'topology'
+            groups = build_synthesis_view(synthesis_flows, synthesis_sections, mode)
+            if len(groups) > SYNTHESIS_AUTO_MAX_GROUPS:
+                mode = 'module'
+                groups = None
+            if max_edges is None:
+                max_edges = SYNTHESIS_AUTO_MAX_EDGES
+    if groups is None:
+        groups = build_synthesis_view(synthesis_flows, synthesis_sections, mode)
+    network_group = None
+    if network_links and file_keys:
+        network_group = synthesis_network_group(network_links, synthesis_flows, synthesis_sections, mode, file_keys)
+        if network_group:
+            groups.append(network_group)
+    
     try:
         with open(dot_filename, 'w', encoding='utf-8') as f:
             f.write('digraph nxlog_synthesis {\n')
@@ -1025,66 +5765,66 @@ def generate_synthesis_graphviz(synthesis_flows, synthesis_sections, output_dir)
             
             # Titre
             f.write('    labelloc="t";\n')
-            f.write('    label="Cartographie de Synthese NXLog - Vue d ensemble";\n\n')
-            
-            # Grouper les sections par fichier
-            files_sections = defaultdict(list)
-            for section_name, section_info in synthesis_sections.items():
-                files_sections[section_info['file']].append((section_name, section_info))
+            f.write(f'    label="Cartographie de Synthese NXLog - {SYNTHESIS_TITLES[mode]}";\n\n')
             
-            # Créer les clusters par fichier
+            # Créer les clusters (fichiers ou topologies) et limiter leurs liaisons
+            edges = []
             cluster_index = 0
-            for file_name, sections in files_sections.items():
-                safe_file_name = sanitize_node_name(file_name)
-                cluster_color = cluster_colors[cluster_index % len(cluster_colors)]
-                f.write(f'    subgraph cluster_{safe_file_name} {{\n')
-                f.write(f'        label="{escape_label(file_name)}.conf";\n')
-                f.write('        style=filled;\n')
-                f.write(f'        fillcolor="{cluster_color}";\n')
-                f.write('        fontsize=12;\n')
-                f.write('        fontweight=bold;\n\n')
+            for group in groups:
+                group_edges = group['edges']
+                hidden_edges = []
+                if max_edges and len(group_edges) > max_edges:
+                    group_edges = sorted(group_edges, key=lambda edge: -edge[4])
+                    hidden_edges = group_edges[max_edges:]
+                    group_edges = group_edges[:max_edges]
+                edges.extend((edge, group.get('style')) for edge in group_edges)
+                
+                indent = '    '
+                if group['label'] is not None:
+                    indent = '        '
+                    cluster_color = cluster_colors[cluster_index % len(cluster_colors)]
+                    f.write(f'    subgraph cluster_{group["name"]} {{\n')
+                    f.write(f'        label="{group["label"]}";\n')
+                    f.write('        style=filled;\n')
+                    f.write(f'        fillcolor="{cluster_color}";\n')
+                    f.write('        fontsize=12;\n')
+                    f.write('        fontweight=bold;\n\n')
+                    cluster_index += 1
                 
                 # Définir les nœuds de ce cluster
-                for section_name, section_info in sections:
-                    safe_section_name = sanitize_node_name(section_name)
-                    color = colors.get(section_info['type'], '#FFFFFF')
-                    module = extract_module_from_content(section_info['content'])
-                    # Extraire le nom propre de la section (sans le préfixe du fichier)
-                    clean_name = section_name
-                    if section_name.startswith(f"{file_name}_"):
-                        clean_name = section_name[len(f"{file_name}_"):]
-                    
-                    label = f"{escape_label(clean_name)}\\n({escape_label(section_info['type'])})\\n{escape_label(module)}"
-                    f.write(f'        "{safe_section_name}" [fillcolor="{color}", label="{label}"];\n')
+                for node_name, label, section_type in group['nodes']:
+                    color = colors.get(section_type, '#FFFFFF')
+                    f.write(f'{indent}"{node_name}" [fillcolor="{color}", label="{label}"];\n')
+                
+                if hidden_edges:
+                    hidden_flows = sum(edge[4] for edge in hidden_edges)
+                    label = f"+{len(hidden_edges)} liaison(s) masquee(s)\\n{hidden_flows} flux"
+                    f.write(f'{indent}"{group["name"]}_hidden" [shape=note, fillcolor="#FFFFFF", label="{label}"];\n')
                 
-                f.write('    }\n\n')
-                cluster_index += 1
+                f.write('    }\n\n' if group['label'] is not None else '\n')
             
             # Définir les connexions
             route_colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8']
             route_color_map = {}
             color_index = 0
             
-            for flow in synthesis_flows:
-                safe_source = sanitize_node_name(flow['source'])
-                safe_destination = sanitize_node_name(flow['destination'])
-                
-                if flow['route'] not in route_color_map:
-                    route_color_map[flow['route']] = route_colors[color_index % len(route_colors)]
+            for (source, destination, label, color_key, count), style in edges:
+                if color_key not in route_color_map:
+                    route_color_map[color_key] = route_colors[color_index % len(route_colors)]
                     color_index += 1
                 
-                edge_color = route_color_map[flow['route']]
-                # Extraire le nom propre de la route (sans le préfixe du fichier)
-                clean_route = flow['route']
-                if flow['route'].startswith(f"{flow['file']}_"):
-                    clean_route = flow['route'][len(f"{flow['file']}_"):]
-                
-                label = f"{escape_label(clean_route)}\\nP:{escape_label(flow['priority'])}"
+                edge_color = route_color_map[color_key]
+                attributes = f'color="{edge_color}", label="{label}"'
+                if count > 1:
+                    # Épaisseur croissante avec le nombre de flux agrégés
+                    attributes += f', penwidth={min(6.0, 1 + count.bit_length() / 2)}'
+                if style:
+                    attributes += f', style={style}'
                 
-                f.write(f'    "{safe_source}" -> "{safe_destination}" [color="{edge_color}", label="{label}"];\n')
+                f.write(f'    "{source}" -> "{destination}" [{attributes}];\n')
             
             # Statistiques de synthèse
-            total_files = len(files_sections)
+            total_files = len(set(section_info['file'] for section_info in synthesis_sections.values()))
             total_sections = len(synthesis_sections)
             total_flows = len(synthesis_flows)
             
@@ -1095,7 +5835,9 @@ def generate_synthesis_graphviz(synthesis_flows, synthesis_sections, output_dir)
             f.write('        fillcolor=lightyellow;\n')
             f.write('        fontsize=10;\n')
             stats_label = f"Fichiers: {total_files}\\nSections: {total_sections}\\nFlux: {total_flows}"
-            f.write(f'        stats [shape=note, label="{escape_label(stats_label)}"];\n')
+            if network_group:
+                stats_label += f"\\nLiaisons reseau: {sum(edge[4] for edge in network_group['edges'])}"
+            f.write(f'        stats [shape=note, label="{stats_label}"];\n')
             f.write('    }\n')
             
             # Légende
@@ -1120,7 +5862,10 @@ def generate_synthesis_graphviz(synthesis_flows, synthesis_sections, output_dir)
             
             f.write('}\n')
         
-        print(f"Cartographie de synthèse créée: {dot_filename}")
+        if mode == 'full':
+            print(f"Cartographie de synthèse créée: {dot_filename}")
+        else:
+            print(f"Cartographie de synthèse créée: {dot_filename} (vue {mode}, {len(groups)} groupe(s))")
         
         # Créer le script de génération d'images pour la synthèse
         script_filename = os.path.join(output_dir, "nxlog_synthesis_generate_images.sh")
@@ -1155,6 +5900,825 @@ def generate_synthesis_graphviz(synthesis_flows, synthesis_sections, output_dir)
     except Exception as e:
         print(f"Erreur lors de la création de la cartographie de synthèse: {e}")
 
+# Dimensions (en pixels) du rendu SVG intégré
+SVG_FONT_SIZE = 12
+SVG_CHAR_WIDTH = 7
+SVG_NODE_HEIGHT = 54
+SVG_NODE_GAP = 24
+SVG_LAYER_GAP = 110
+SVG_MARGIN = 30
+SVG_ORDER_PASSES = 8
+
+def count_layer_crossings(upper_positions, lower_positions, edges):
+    """
+    Compte les croisements des arcs entre deux couches adjacentes
+    """
+    crossings = 0
+    seen = []
+    for _, lower in sorted(edges, key=lambda edge: (upper_positions[edge[0]], lower_positions[edge[1]])):
+        position = lower_positions[lower]
+        index = bisect.bisect_right(seen, position)
+        crossings += len(seen) - index
+        seen.insert(index, position)
+    return crossings
+
+def layered_layout(nodes, edges, widths):
+    """
+    Calcule une disposition en couches (Sugiyama) de gauche à droite
+
+    nodes est la liste des nœuds, edges la liste des arcs (source, destination) sans
+    boucle et widths la largeur de chaque nœud. Les cycles sont rompus en inversant
+    les arcs retour d'un parcours en profondeur, les couches sont attribuées par plus
+    long chemin, les arcs longs passent par des nœuds factices, l'ordre dans chaque
+    couche est obtenu par balayages barycentriques et les ordonnées sont rapprochées
+    de celles des voisins.
+
+    Retourne (positions, tracés, largeur, hauteur): positions associe à chaque nœud le
+    centre (x, y) et tracés associe à chaque arc ses points intermédiaires.
+    """
+    successors = {node: [] for node in nodes}
+    for source, destination in edges:
+        successors[source].append(destination)
+    
+    # Rompre les cycles: inverser les arcs vers un nœud en cours de visite
+    state = {}
+    reversed_edges = set()
+    for root in nodes:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(successors[root]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                child_state = state.get(child)
+                if child_state is None:
+                    state[child] = 1
+                    stack.append((child, iter(successors[child])))
+                    break
+                if child_state == 1:
+                    reversed_edges.add((node, child))
+            else:
+                state[node] = 2
+                stack.pop()
+    
+    dag_edges = list(dict.fromkeys((destination, source) if (source, destination) in reversed_edges
+                                   else (source, destination) for source, destination in edges))
+    
+    # Couches par plus long chemin depuis les sources (ordre topologique de Kahn)
+    indegree = {node: 0 for node in nodes}
+    dag_successors = {node: [] for node in nodes}
+    for source, destination in dag_edges:
+        dag_successors[source].append(destination)
+        indegree[destination] += 1
+    layer = {node: 0 for node in nodes}
+    ready = deque(node for node in nodes if indegree[node] == 0)
+    while ready:
+        node = ready.popleft()
+        for child in dag_successors[node]:
+            layer[child] = max(layer[child], layer[node] + 1)
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+    
+    depth = max(layer.values()) + 1 if layer else 0
+    order = [[] for _ in range(depth)]
+    for node in nodes:
+        order[layer[node]].append(node)
+    
+    # Nœuds factices sur les arcs qui traversent plusieurs couches
+    chains = {}
+    above = defaultdict(list)
+    below = defaultdict(list)
+    layer_edges = defaultdict(list)
+    for source, destination in dag_edges:
+        chain = [source]
+        for dummy_layer in range(layer[source] + 1, layer[destination]):
+            dummy = (source, destination, dummy_layer)
+            layer[dummy] = dummy_layer
+            order[dummy_layer].append(dummy)
+            chain.append(dummy)
+        chain.append(destination)
+        chains[(source, destination)] = chain
+        for upper, lower in zip(chain, chain[1:]):
+            below[upper].append(lower)
+            above[lower].append(upper)
+            layer_edges[layer[upper]].append((upper, lower))
+    
+    # Réduction des croisements par balayages barycentriques, en gardant le meilleur ordre
+    def total_crossings(current):
+        positions = [{node: index for index, node in enumerate(layer_nodes)} for layer_nodes in current]
+        return sum(count_layer_crossings(positions[index], positions[index + 1], layer_edges[index])
+                   for index in range(depth - 1))
+    
+    best = [list(layer_nodes) for layer_nodes in order]
+    best_crossings = total_crossings(best)
+    for sweep in range(SVG_ORDER_PASSES):
+        if not best_crossings:
+            break
+        downward = sweep % 2 == 0
+        for index in (range(1, depth) if downward else range(depth - 2, -1, -1)):
+            reference = {node: position for position, node in
+                         enumerate(order[index - 1] if downward else order[index + 1])}
+            neighbours = above if downward else below
+            barycenters = {}
+            for position, node in enumerate(order[index]):
+                linked = [reference[other] for other in neighbours[node]]
+                barycenters[node] = sum(linked) / len(linked) if linked else position
+            order[index].sort(key=barycenters.__getitem__)
+        crossings = total_crossings(order)
+        if crossings < best_crossings:
+            best = [list(layer_nodes) for layer_nodes in order]
+            best_crossings = crossings
+    order = best
+    
+    # Abscisses par couche, ordonnées empilées puis rapprochées de celles des voisins
+    height = {node: SVG_NODE_HEIGHT if node in widths else 0 for layer_nodes in order for node in layer_nodes}
+    x = {}
+    y = {}
+    left = SVG_MARGIN
+    for layer_nodes in order:
+        layer_width = max(widths.get(node, 0) for node in layer_nodes)
+        top = 0
+        for node in layer_nodes:
+            x[node] = left + layer_width / 2
+            y[node] = top + height[node] / 2
+            top += height[node] + SVG_NODE_GAP
+        left += layer_width + SVG_LAYER_GAP
+    
+    for sweep in range(4):
+        downward = sweep % 2 == 0
+        for layer_nodes in (order if downward else reversed(order)):
+            bottom = None
+            for node in layer_nodes:
+                linked = [y[other] for other in (above[node] if downward else below[node])]
+                target = sum(linked) / len(linked) if linked else y[node]
+                if bottom is not None:
+                    target = max(target, bottom + SVG_NODE_GAP + height[node] / 2)
+                y[node] = target
+                bottom = target + height[node] / 2
+    
+    lowest = min(y[node] - height[node] / 2 for node in y) if y else 0
+    highest = max(y[node] + height[node] / 2 for node in y) if y else 0
+    shift = SVG_MARGIN - lowest
+    positions = {node: (x[node], y[node] + shift) for node in nodes}
+    routes = {}
+    for source, destination in edges:
+        if (source, destination) in reversed_edges:
+            chain = chains[(destination, source)][::-1]
+        else:
+            chain = chains[(source, destination)]
+        routes[(source, destination)] = [(x[node], y[node] + shift) for node in chain[1:-1]]
+    return positions, routes, left - SVG_LAYER_GAP + SVG_MARGIN, highest - lowest + 2 * SVG_MARGIN
+
+def svg_path(points):
+    """
+    Construit l'attribut d d'une courbe passant par les points (tangentes horizontales)
+    """
+    (x0, y0) = points[0]
+    commands = [f"M{x0:.1f},{y0:.1f}"]
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        middle = (x1 + x2) / 2
+        commands.append(f"C{middle:.1f},{y1:.1f} {middle:.1f},{y2:.1f} {x2:.1f},{y2:.1f}")
+    return ' '.join(commands)
+
+def render_flow_svg(title, sections, flows):
+    """
+    Produit le document SVG de la cartographie des flux d'une configuration
+
+    sections est une liste de tuples (nom, type, module) et flows une liste de tuples
+    (route, source, destination, priorité, condition). Les flux d'une même paire de
+    sections sont regroupés sur un seul arc; routes et conditions figurent en info-bulle.
+    """
+    # Couleurs pour les différents types de sections
+    colors = {
+        'Input': '#90EE90',      # Vert clair
+        'Output': '#FFB6C1',     # Rose clair
+        'Processor': '#87CEEB',  # Bleu ciel
+        'Extension': '#F0E68C',  # Kaki
+        'Route': '#DDA0DD'       # Prune
+    }
+    
+    # Couleurs pour les routes
+    route_colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8']
+    
+    labels = {}
+    widths = {}
+    for name, section_type, module in sections:
+        labels[name] = (name, f"({section_type})", module)
+        widths[name] = max(len(line) for line in labels[name]) * SVG_CHAR_WIDTH + 16
+    
+    # Regrouper les flux par paire de sections (les sections inconnues sont ajoutées)
+    edges = {}
+    route_color_map = {}
+    for route, source, destination, priority, condition in flows:
+        for name in (source, destination):
+            if name not in labels:
+                labels[name] = (name, '', '')
+                widths[name] = len(name) * SVG_CHAR_WIDTH + 16
+        if route not in route_color_map:
+            route_color_map[route] = len(route_color_map) % len(route_colors)
+        edges.setdefault((source, destination), []).append((route, priority, condition))
+    
+    nodes = list(labels)
+    connected = set()
+    for source, destination in edges:
+        connected.add(source)
+        connected.add(destination)
+    
+    layout_edges = [edge for edge in edges if edge[0] != edge[1]]
+    positions, routes, width, height = layered_layout(nodes, layout_edges, widths)
+    
+    title_height = 30
+    legend_items = ['Input', 'Output', 'Processor', 'Extension']
+    legend_height = 40
+    total_width = max(width, 4 * 110 + 2 * SVG_MARGIN)
+    total_height = title_height + height + legend_height
+    
+    out = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{total_width:.0f}" height="{total_height:.0f}" '
+        f'viewBox="0 0 {total_width:.0f} {total_height:.0f}" font-family="Helvetica, Arial, sans-serif" '
+        f'font-size="{SVG_FONT_SIZE}">',
+        '<defs>' + ''.join(f'<marker id="arrow{index}" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="7" '
+                           f'markerHeight="7" orient="auto"><path d="M0,0 L10,5 L0,10 z" fill="{color}"/></marker>'
+                           for index, color in enumerate(route_colors)) + '</defs>',
+        '<rect width="100%" height="100%" fill="#FFFFFF"/>',
+        f'<text x="{total_width / 2:.1f}" y="20" text-anchor="middle" font-size="14" font-weight="bold">'
+        f'Cartographie des flux NXLog - {xml_escape(title)}</text>',
+        f'<g transform="translate(0,{title_height})">'
+    ]
+    
+    # Arcs: du bord de la section source au bord de la section destination
+    for (source, destination), edge_routes in edges.items():
+        (sx, sy), (dx, dy) = positions[source], positions[destination]
+        color_index = route_color_map[edge_routes[0][0]]
+        color = route_colors[color_index]
+        tooltip = '\n'.join(f"Route: {route} - Priorité: {priority}" +
+                            (f" - Condition: {condition}" if condition != 'N/A' else '')
+                            for route, priority, condition in edge_routes)
+        if source == destination:
+            right = sx + widths[source] / 2
+            d = (f"M{right:.1f},{sy - 8:.1f} C{right + 40:.1f},{sy - 40:.1f} "
+                 f"{right + 40:.1f},{sy + 40:.1f} {right:.1f},{sy + 8:.1f}")
+        else:
+            points = [(sx, sy)] + routes[(source, destination)] + [(dx, dy)]
+            # Quitter et atteindre les sections par le côté tourné vers le point voisin
+            first, last = points[1], points[-2]
+            points[0] = (sx + widths[source] / 2 * (1 if first[0] >= sx else -1), sy)
+            points[-1] = (dx - widths[destination] / 2 * (1 if last[0] <= dx else -1), dy)
+            d = svg_path(points)
+        out.append(f'<path d="{d}" fill="none" stroke="{color}" stroke-width="1.5" marker-end="url(#arrow{color_index})">'
+                   f'<title>{xml_escape(tooltip)}</title></path>')
+    
+    # Sections: boîtes colorées par type, en pointillés si non connectées
+    section_types = {name: section_type for name, section_type, _ in sections}
+    for name in nodes:
+        cx, cy = positions[name]
+        box_width = widths[name]
+        fill = colors.get(section_types.get(name), '#FFFFFF')
+        dash = '' if name in connected else ' stroke-dasharray="5,3"'
+        out.append(f'<g><rect x="{cx - box_width / 2:.1f}" y="{cy - SVG_NODE_HEIGHT / 2:.1f}" '
+                   f'width="{box_width:.0f}" height="{SVG_NODE_HEIGHT}" rx="3" fill="{fill}" stroke="#333333"{dash}/>')
+        for index, line in enumerate(labels[name]):
+            weight = ' font-weight="bold"' if index == 0 else ''
+            out.append(f'<text x="{cx:.1f}" y="{cy - 11 + index * 15:.1f}" text-anchor="middle" '
+                       f'dominant-baseline="middle"{weight}>{xml_escape(line)}</text>')
+        out.append('</g>')
+    out.append('</g>')
+    
+    # Légende
+    legend_y = title_height + height + 8
+    for index, section_type in enumerate(legend_items):
+        legend_x = SVG_MARGIN + index * 110
+        out.append(f'<rect x="{legend_x}" y="{legend_y:.1f}" width="100" height="22" rx="3" '
+                   f'fill="{colors[section_type]}" stroke="#333333"/>')
+        out.append(f'<text x="{legend_x + 50}" y="{legend_y + 11:.1f}" text-anchor="middle" '
+                   f'dominant-baseline="middle">{section_type}</text>')
+    out.append('</svg>')
+    return '\n'.join(out) + '\n'
+
+def _render_svg_job(task):
+    """
+    Écrit un fichier SVG (exécutée aussi dans les processus du pool)
+
+    Retourne (fichier, message d'erreur ou None).
+    """
+    svg_filename, title, sections, flows = task
+    try:
+        with open(svg_filename, 'w', encoding='utf-8') as f:
+            f.write(render_flow_svg(title, sections, flows))
+    except Exception as e:
+        return svg_filename, str(e)
+    return svg_filename, None
+
+def render_svg_files(all_configs, output_dir="output", jobs=1, changed=None, base_dir=None):
+    """
+    Génère directement une image SVG par configuration, sans Graphviz
+
+    La disposition est calculée par layered_layout; avec jobs > 1, les fichiers sont
+    rendus sur un pool de processus. Comme pour generate_graphviz_files, seules les
+    configurations de changed sont réécrites si ce paramètre est fourni, et les
+    images sont nommées d'après config_file_key relativement à base_dir.
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    if base_dir is None:
+        base_dir = config_files_root(all_configs)
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    
+    # Ne transmettre aux processus que les noms, types et modules nécessaires au rendu
+    tasks = []
+    for config_file, (config_data, flow_data) in all_configs.items():
+        if not flow_data['flows'] or (changed is not None and config_file not in changed):
+            continue
+        file_key = config_file_key(config_file, base_dir)
+        sections = [(name, section_info['type'], section_info['module'])
+                    for name, section_info in flow_data['sections'].items()]
+        flows = [(flow['route'], flow['source'], flow['destination'], flow['priority'], flow['condition'])
+                 for flow in flow_data['flows']]
+        tasks.append((os.path.join(output_dir, f"{sanitize_node_name(file_key)}_flow.svg"), file_key, sections, flows))
+    
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 and len(tasks) > 1 else None
+    try:
+        if executor:
+            results = executor.map(_render_svg_job, tasks, chunksize=max(1, len(tasks) // (jobs * 8)))
+        else:
+            results = map(_render_svg_job, tasks)
+        for svg_filename, error in results:
+            if error:
+                print(f"Erreur lors de la création du fichier SVG {svg_filename}: {error}")
+            else:
+                print(f"Fichier SVG créé: {svg_filename}")
+    finally:
+        if executor:
+            executor.shutdown()
+
+def config_output_paths(config_file, base_dir, output_dir="output"):
+    """
+    Retourne les fichiers produits pour une configuration par --csv-multiple, --graphviz et --svg
+    """
+    file_key = config_file_key(config_file, base_dir)
+    filename = file_key.replace(os.sep, '_')
+    graph_name = sanitize_node_name(file_key)
+    return [
+        f"{filename}_config.csv",
+        f"{filename}_flows.csv",
+        os.path.join(output_dir, f"{graph_name}_flow.dot"),
+        os.path.join(output_dir, f"{graph_name}_generate_images.sh"),
+        os.path.join(output_dir, f"{graph_name}_flow.svg")
+    ]
+
+class ConfigWatcher:
+    """
+    Surveille un répertoire de configurations et les fichiers qu'elles incluent
+
+    Utilise inotify lorsque inotify_simple est installé, sinon compare périodiquement
+    les dates de modification et tailles. Les rafales de modifications sont regroupées:
+    un lot n'est rendu qu'après debounce secondes sans nouvel événement.
+    """
+
+    def __init__(self, directory_path, all_configs, interval=1.0, debounce=0.5):
+        self.directory_path = directory_path
+        self.all_configs = all_configs
+        self.interval = interval
+        self.debounce = debounce
+        self.inotify = INotify() if INOTIFY_AVAILABLE else None
+        self.watches = {}
+        self.refresh()
+
+    def refresh(self):
+        """
+        Reconstruit l'index inverse des inclusions après une mise à jour de all_configs
+        """
+        self.configs_by_path = {}
+        self.includers = defaultdict(set)
+        self.include_dirs = defaultdict(set)
+        for config_file, (config_data, flow_data) in self.all_configs.items():
+            self.configs_by_path[os.path.realpath(config_file)] = config_file
+            for path in flow_data.get('includes', []):
+                self.includers[path].add(config_file)
+                self.include_dirs[os.path.dirname(path)].add(config_file)
+            for pattern in flow_data.get('include_globs', []):
+                # Un motif sans correspondance n'apparaît pas dans includes: surveiller son
+                # répertoire (sans partie glob) pour un fichier ajouté plus tard
+                directory = os.path.dirname(pattern)
+                while any(char in directory for char in '*?['):
+                    directory = os.path.dirname(directory)
+                self.include_dirs[os.path.realpath(directory)].add(config_file)
+        
+        if self.inotify is not None:
+            mask = (inotify_flags.CLOSE_WRITE | inotify_flags.CREATE | inotify_flags.DELETE |
+                    inotify_flags.MOVED_FROM | inotify_flags.MOVED_TO | inotify_flags.MODIFY)
+            directories = [root for root, dirs, files in os.walk(self.directory_path)]
+            for directory in directories + list(self.include_dirs):
+                if directory not in self.watches.values() and os.path.isdir(directory):
+                    self.watches[self.inotify.add_watch(directory, mask)] = directory
+        else:
+            self.signatures = self._snapshot()
+
+    def _snapshot(self):
+        signatures = {}
+        for root, dirs, files in os.walk(self.directory_path):
+            for file in files:
+                if file.endswith('.conf'):
+                    path = os.path.join(root, file)
+                    signatures[path] = _file_signature(path)
+        # Les répertoires d'inclusion changent de date quand un fichier y est ajouté ou retiré
+        for path in list(self.includers) + list(self.include_dirs):
+            signatures[path] = _file_signature(path)
+        return signatures
+
+    def _poll(self):
+        changed = set()
+        while True:
+            signatures = self._snapshot()
+            batch = {path for path in set(signatures) | set(self.signatures)
+                     if signatures.get(path) != self.signatures.get(path)}
+            self.signatures = signatures
+            if not batch:
+                if changed:
+                    return changed
+                time.sleep(self.interval)
+                continue
+            changed |= batch
+            time.sleep(self.debounce)
+
+    def _read_inotify(self):
+        changed = set()
+        timeout = None
+        while True:
+            events = self.inotify.read(timeout=timeout)
+            if not events:
+                return changed
+            for event in events:
+                directory = self.watches.get(event.wd)
+                if directory is not None and event.name:
+                    changed.add(os.path.join(directory, event.name))
+            timeout = int(self.debounce * 1000)
+
+    def wait_for_changes(self):
+        """
+        Bloque jusqu'au prochain lot de modifications et retourne les configurations à réanalyser
+        """
+        while True:
+            changed = self._read_inotify() if self.inotify is not None else self._poll()
+            affected = self.affected_configs(changed)
+            if affected:
+                return affected
+
+    def affected_configs(self, changed):
+        """
+        Retourne les configurations modifiées, ajoutées ou supprimées et celles qui incluent un fichier modifié
+        """
+        affected = set()
+        directory = os.path.realpath(self.directory_path)
+        for path in changed:
+            real_path = os.path.realpath(path)
+            if real_path in self.configs_by_path:
+                affected.add(self.configs_by_path[real_path])
+            elif path.endswith('.conf') and real_path.startswith(directory + os.sep) and os.path.isfile(path):
+                affected.add(path)
+            if real_path in self.includers:
+                affected |= self.includers[real_path]
+            else:
+                # Fichier ajouté ou retiré dans un répertoire d'inclusion (include_dir, motifs)
+                affected |= self.include_dirs.get(real_path, set())
+                affected |= self.include_dirs.get(os.path.dirname(real_path), set())
+        return affected
+
+def watch_directory(directory_path, all_configs, jobs=1, cache=None, excel_file=None, csv_multiple=False,
+                    flows_csv=False, graphviz=False, interval=1.0, debounce=0.5, use_mmap=False,
+                    synthesis_mode='auto', synthesis_max_edges=None, svg=False, sqlite_file=None):
+    """
+    Réanalyse en continu les configurations modifiées et met à jour les exports concernés
+
+    Seuls les fichiers touchés et ceux qui les incluent sont réanalysés; les CSV et
+    fichiers .dot des autres configurations ne sont pas réécrits. Le rapport Excel et
+    la cartographie de synthèse, globaux, sont régénérés à partir de l'état en mémoire.
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    watcher = ConfigWatcher(directory_path, all_configs, interval, debounce)
+    mode = 'inotify' if watcher.inotify is not None else f'scrutation toutes les {interval}s'
+    print(f"\nSurveillance de {directory_path} ({mode}), Ctrl+C pour arrêter...")
+    
+    try:
+        while True:
+            affected = watcher.wait_for_changes()
+            print(f"\n[{time.strftime('%H:%M:%S')}] {len(affected)} configuration(s) à mettre à jour")
+            
+            removed = sorted(path for path in affected if not os.path.isfile(path))
+            existing = sorted(path for path in affected if os.path.isfile(path))
+            for config_file in removed + existing:
+                for path in config_output_paths(config_file, directory_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+            
+            for config_file in removed:
+                all_configs.pop(config_file, None)
+                print(f"  Supprimé: {config_file}")
+            
+            updated = {}
+            for config_file, config_data, flow_data, output in iter_parsed_configs(existing, jobs, cache, use_mmap):
+                if output:
+                    print(output, end='')
+                all_configs[config_file] = updated[config_file] = (config_data, flow_data)
+                print(f"  Réanalysé: {config_file} ({len(config_data)} paramètre(s), "
+                      f"{len(flow_data['flows'])} flux)")
+            
+            if cache:
+                cache.save()
+            
+            if excel_file and all_configs:
+                save_to_excel(all_configs, excel_file)
+            if sqlite_file:
+                exporter = SqliteExporter(sqlite_file)
+                for config_file in removed:
+                    exporter.remove(config_file)
+                for config_file, (config_data, flow_data) in updated.items():
+                    exporter.add(config_file, config_data, flow_data)
+                exporter.save()
+            if csv_multiple and updated:
+                save_multiple_csv(updated, flows_csv, base_dir=directory_path)
+            if graphviz and all_configs:
+                generate_graphviz_files(all_configs, changed=set(updated), synthesis_mode=synthesis_mode,
+                                        synthesis_max_edges=synthesis_max_edges, base_dir=directory_path)
+            if svg and updated:
+                render_svg_files(updated, jobs=jobs, base_dir=directory_path)
+            
+            watcher.refresh()
+    except KeyboardInterrupt:
+        print("\nSurveillance arrêtée.")
+
+# Paramètres utilisés par les sections des configurations synthétiques
+SYNTHETIC_PARAMS = {
+    'Input': [('File', '"%LOGDIR%/app{n}.log"'), ('SavePos', 'TRUE'), ('ReadFromLast', 'TRUE'),
+              ('PollInterval', '1'), ('Recursive', 'FALSE'), ('CloseWhenIdle', 'TRUE'),
+              ('Exec', 'if $raw_event =~ /error/ drop();')],
+    'Processor': [('PatternFile', '/etc/nxlog/patterns{n}.xml'), ('Exec', '$Hostname = hostname();'),
+                  ('BufferSize', '65000')],
+    'Output': [('Host', '10.0.{m}.{n}'), ('Port', '{port}'), ('BufferSize', '65000'),
+               ('FlushInterval', '1'), ('OutputType', 'Binary'), ('Reconnect', '10'),
+               ('Exec', 'to_json();')]
+}
+
+SYNTHETIC_MODULES = {
+    'Input': ['im_file', 'im_tcp', 'im_udp', 'im_msvistalog'],
+    'Processor': ['pm_pattern', 'pm_buffer'],
+    'Output': ['om_tcp', 'om_udp', 'om_file', 'om_http']
+}
+
+def generate_synthetic_config(sections=100, params_per_section=5, route_fanout=2, include_file=None,
+                              comment_ratio=0.2, rng=None):
+    """
+    Retourne le texte d'une configuration nxlog synthétique
+
+    Les sections sont réparties en Input, Processor et Output (40/20/40); chaque route
+    relie route_fanout entrées à route_fanout sorties via un processor. comment_ratio
+    est la probabilité d'insérer une ligne de commentaire avant chaque ligne.
+    """
+    rng = rng or random.Random(0)
+    lines = []
+    
+    def emit(line):
+        if comment_ratio and rng.random() < comment_ratio:
+            lines.append(f"# commentaire {rng.randrange(1 << 30):x} sur la ligne suivante")
+        lines.append(line)
+    
+    emit('User nxlog')
+    emit('LogLevel INFO')
+    emit('define LOGDIR /var/log/synthetic')
+    if include_file:
+        emit(f'include {include_file}')
+    emit('')
+    
+    inputs = max(1, sections * 2 // 5)
+    processors = max(1, sections // 5)
+    outputs = max(1, sections - inputs - processors)
+    names = {'Input': [], 'Processor': [], 'Output': []}
+    
+    for section_type, count, prefix in (('Input', inputs, 'in'), ('Processor', processors, 'proc'),
+                                         ('Output', outputs, 'out')):
+        choices = SYNTHETIC_PARAMS[section_type]
+        for n in range(count):
+            name = f"{prefix}{n}"
+            names[section_type].append(name)
+            emit(f'<{section_type} {name}>')
+            emit(f'    Module {rng.choice(SYNTHETIC_MODULES[section_type])}')
+            for p in range(params_per_section - 1):
+                param, value = choices[p % len(choices)]
+                emit(f'    {param} {value.format(n=n, m=n // 256 % 256, port=514 + n % 100)}')
+            emit(f'</{section_type}>')
+            emit('')
+    
+    fanout = max(1, route_fanout)
+    for r in range(max(1, outputs // fanout)):
+        sources = [names['Input'][(r * fanout + i) % inputs] for i in range(fanout)]
+        destinations = [names['Output'][(r * fanout + i) % outputs] for i in range(fanout)]
+        emit(f'<Route r{r}>')
+        emit(f"    Path {', '.join(sources)} => {names['Processor'][r % processors]} => {', '.join(destinations)}")
+        emit(f'    Priority {r % 10 + 1}')
+        emit('</Route>')
+        emit('')
+    
+    return '\n'.join(lines) + '\n'
+
+def generate_benchmark_tree(output_dir, files=20, sections=100, params_per_section=5, route_fanout=2,
+                            include_depth=1, comment_ratio=0.2, seed=0):
+    """
+    Génère un répertoire de configurations synthétiques et retourne (octets, sections)
+
+    Les fichiers partagent une chaîne d'inclusions common_1.inc -> ... -> common_N.inc
+    (N = include_depth) placée dans le sous-répertoire include/.
+    """
+    rng = random.Random(seed)
+    include_dir = os.path.join(output_dir, 'include')
+    os.makedirs(include_dir, exist_ok=True)
+    total_bytes = 0
+    total_sections = 0
+    
+    for depth in range(include_depth, 0, -1):
+        lines = [f'define LEVEL{depth} {depth}',
+                 f'<Extension ext_level{depth}>', '    Module xm_syslog', '</Extension>']
+        if depth < include_depth:
+            lines.insert(0, f'include common_{depth + 1}.inc')
+        content = '\n'.join(lines) + '\n'
+        with open(os.path.join(include_dir, f'common_{depth}.inc'), 'w', encoding='utf-8') as f:
+            f.write(content)
+        total_bytes += len(content.encode('utf-8'))
+    
+    include_file = 'include/common_1.inc' if include_depth > 0 else None
+    for index in range(files):
+        content = generate_synthetic_config(sections, params_per_section, route_fanout,
+                                            include_file, comment_ratio, rng)
+        with open(os.path.join(output_dir, f'synthetic_{index:05d}.conf'), 'w', encoding='utf-8') as f:
+            f.write(content)
+        total_bytes += len(content.encode('utf-8'))
+        total_sections += sections + include_depth
+    
+    return total_bytes, total_sections
+
+def peak_rss_mb():
+    """
+    Retourne la mémoire résidente maximale du processus en Mo (None si indisponible)
+    """
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS et en Ko ailleurs
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+def run_benchmark(files=20, sections=100, params_per_section=5, route_fanout=2, include_depth=1,
+                  comment_ratio=0.2, repeat=1, jobs=1, seed=0, bench_dir=None):
+    """
+    Mesure le parsing, l'analyse des flux, les exports et l'analyse de répertoire
+
+    Chaque étape est exécutée repeat fois sur le même jeu de fichiers synthétiques;
+    la meilleure durée est retenue. Retourne un rapport sérialisable en JSON avec le
+    débit (Mo/s, sections/s) et la mémoire maximale après chaque étape.
+    """
+    temp_dir = None
+    if bench_dir is None:
+        temp_dir = tempfile.TemporaryDirectory(prefix='nxlog_bench_')
+        bench_dir = temp_dir.name
+    
+    try:
+        start = time.perf_counter()
+        total_bytes, total_sections = generate_benchmark_tree(
+            bench_dir, files, sections, params_per_section, route_fanout, include_depth, comment_ratio, seed)
+        generation_time = time.perf_counter() - start
+        config_files = sorted(glob.glob(os.path.join(bench_dir, '*.conf')))
+        export_dir = os.path.join(bench_dir, 'export')
+        os.makedirs(export_dir, exist_ok=True)
+        
+        results = {}
+        parsed = {}
+        
+        def measure(stage, function):
+            best_wall = best_cpu = None
+            for _ in range(max(1, repeat)):
+                # Repartir d'un graphe d'inclusions vide pour ne pas mesurer la mémoïsation
+                INCLUDE_GRAPH.nodes.clear()
+                wall, cpu = time.perf_counter(), time.process_time()
+                with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+                    function()
+                wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+                if best_wall is None or wall < best_wall:
+                    best_wall, best_cpu = wall, cpu
+            results[stage] = {
+                'wall_s': round(best_wall, 4),
+                'cpu_s': round(best_cpu, 4),
+                'mb_per_s': round(total_bytes / (1024 * 1024) / best_wall, 2) if best_wall else None,
+                'sections_per_s': round(total_sections / best_wall, 1) if best_wall else None,
+                'peak_rss_mb': peak_rss_mb()
+            }
+        
+        def parse_all():
+            parsed.clear()
+            for config_file in config_files:
+                parsed[config_file] = parse_nxlog_config(config_file)
+        
+        def analyze_all():
+            for config_data, flow_data in parsed.values():
+                analyze_data_flows(flow_data)
+        
+        def export_tables(format_type):
+            def export():
+                for config_data, flow_data in parsed.values():
+                    display_config_table(config_data, format_type)
+            return export
+        
+        def export_jsonl():
+            with open(os.devnull, 'w', encoding='utf-8') as devnull:
+                for config_file, (config_data, flow_data) in parsed.items():
+                    write_jsonl_records(config_file, config_data, flow_data, True, True, devnull)
+        
+        def export_csv():
+            cwd = os.getcwd()
+            os.chdir(export_dir)
+            try:
+                save_multiple_csv(parsed, flows_csv=True)
+            finally:
+                os.chdir(cwd)
+        
+        stages = [
+            ('parse_nxlog_config', parse_all),
+            ('analyze_data_flows', analyze_all),
+            ('export_table', export_tables('table')),
+            ('export_csv', export_tables('csv')),
+            ('export_json', export_tables('json')),
+            ('export_jsonl', export_jsonl),
+            ('export_csv_multiple', export_csv),
+            ('export_graphviz', lambda: generate_graphviz_files(parsed, os.path.join(export_dir, 'graphviz')))
+        ]
+        if OPENPYXL_AVAILABLE:
+            stages.append(('export_excel', lambda: save_to_excel(parsed, os.path.join(export_dir, 'bench.xlsx'))))
+        stages.append(('process_directory', lambda: process_directory(bench_dir, jobs=jobs, collect=False)))
+        
+        for stage, function in stages:
+            measure(stage, function)
+        
+        return {
+            'version': PARSE_CACHE_VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'settings': {
+                'files': files,
+                'sections': sections,
+                'params_per_section': params_per_section,
+                'route_fanout': route_fanout,
+                'include_depth': include_depth,
+                'comment_ratio': comment_ratio,
+                'repeat': repeat,
+                'jobs': jobs,
+                'seed': seed
+            },
+            'input': {
+                'files': len(config_files),
+                'bytes': total_bytes,
+                'sections': total_sections,
+                'generation_s': round(generation_time, 4)
+            },
+            'stages': results,
+            'peak_rss_mb': peak_rss_mb()
+        }
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+def display_timings(timings):
+    """
+    Affiche le temps mural/CPU de chaque étape et les compteurs de l'exécution
+
+    Les étapes exécutées dans les processus du pool (--jobs) sont cumulées sur
+    l'ensemble des processus et peuvent dépasser le temps total.
+    """
+    snapshot = timings.snapshot()
+    total = snapshot['stages'].get('total', {}).get('wall_s') or None
+    
+    rows = []
+    for name, stage in snapshot['stages'].items():
+        share = f"{stage['wall_s'] * 100 / total:.1f}" if total else ''
+        rows.append([name, stage['calls'], f"{stage['wall_s']:.4f}", f"{stage['cpu_s']:.4f}", share])
+    headers = ['Étape', 'Appels', 'Mur (s)', 'CPU (s)', '% total']
+    
+    print("=" * 50)
+    print("MESURES PAR ÉTAPE")
+    print("=" * 50)
+    if TABULATE_AVAILABLE:
+        print(tabulate(rows, headers=headers, tablefmt='grid'))
+    else:
+        print(simple_table_format(rows, headers))
+    
+    if snapshot['counters']:
+        print()
+        for name, value in snapshot['counters'].items():
+            print(f"{name}: {value}")
+    print("=" * 50)
+
 def main():
     parser = argparse.ArgumentParser(
         description='Analyseur de configuration NXLog avec cartographie des flux',
@@ -1164,9 +6728,24 @@ Exemples d'utilisation:
   %(prog)s nxlog.conf                          # Analyse basique
   %(prog)s nxlog.conf --stats --flows          # Avec statistiques et flux
   %(prog)s --directory /etc/nxlog --flows      # Analyser un répertoire
+  %(prog)s --directory /etc/nxlog --jobs 8     # Analyse parallèle sur 8 processus
+  %(prog)s --directory /etc/nxlog --format jsonl --flows | jq .  # Flux NDJSON
   %(prog)s --create-sample                     # Créer un exemple
   %(prog)s --directory data --excel rapport.xlsx  # Rapport Excel
+  %(prog)s --directory data --sqlite nxlog.db  # Base SQLite pour requêtes sur le parc
+  %(prog)s --directory data --index-file data.idx --query "Module=om_tcp AND Port=514"  # Requête
+  %(prog)s --diff prod/ preprod/ --format json  # Différences entre deux arborescences
+  %(prog)s --directory data --lint-perf --format json  # Réglages pénalisant le débit (CI)
+  %(prog)s --directory data --regex-cost --regex-sample events.log  # Coût des regex Exec
+  %(prog)s nxlog.conf --simulate --sim-input '*=20000' --sim-output om_http=5000:0.05  # Saturation
+  %(prog)s nxlog.conf --replay /var/log/messages  # Débit du code Exec par route
+  %(prog)s --directory data --network-links    # Liaisons réseau et fan-in des collecteurs
   %(prog)s --directory data --graphviz         # Diagrammes Graphviz
+  %(prog)s --directory data --graphviz --synthesis-mode topology  # Synthèse agrégée
+  %(prog)s --directory data --svg --jobs 8     # Images SVG sans Graphviz
+  %(prog)s --directory data --graphviz --watch # Mise à jour à chaque modification
+  %(prog)s --benchmark --bench-files 50 --bench-sections 500  # Mesure des performances
+  %(prog)s --directory data --timings --profile run.pstats   # Temps par étape et profil
         """
     )
     
@@ -1174,34 +6753,391 @@ Exemples d'utilisation:
     parser.add_argument('--create-sample', action='store_true', help='Créer un fichier d\'exemple')
     parser.add_argument('--stats', action='store_true', help='Afficher les statistiques')
     parser.add_argument('--flows', action='store_true', help='Afficher la cartographie des flux')
-    parser.add_argument('--format', choices=['table', 'csv', 'json'], default='table', 
-                       help='Format de sortie (défaut: table)')
+    parser.add_argument('--format', choices=['table', 'csv', 'json', 'jsonl'], default='table', 
+                       help='Format de sortie (défaut: table, jsonl: un objet JSON par ligne)')
     parser.add_argument('--directory', help='Analyser tous les fichiers .conf dans un répertoire')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                       help='Nombre de processus pour l\'analyse d\'un répertoire (0 = nombre de CPU, défaut: 1)')
+    parser.add_argument('--mmap', action='store_true',
+                       help='Projeter les fichiers en mémoire et ne décoder les valeurs qu\'à l\'affichage ou à l\'export')
+    parser.add_argument('--cache-dir', metavar='DIR',
+                       help='Répertoire du cache de parsing réutilisé entre les exécutions (ex: ~/.cache/nxlog_analyzer)')
+    parser.add_argument('--cache-max-size', type=int, default=DEFAULT_CACHE_MAX_SIZE, metavar='MO',
+                       help=f'Taille maximale du cache de parsing en Mo (défaut: {DEFAULT_CACHE_MAX_SIZE})')
     parser.add_argument('--excel-file', help='Sauvegarder dans un fichier Excel')
+    parser.add_argument('--query', metavar='REQUÊTE',
+                       help='Rechercher les sections et flux (ex: "Module=om_tcp AND Port=514", '
+                            '"flow im_file -> om_http") avec --directory et/ou --index-file')
+    parser.add_argument('--index-file', metavar='FICHIER',
+                       help='Index de requêtes enregistré, mis à jour pour les seuls fichiers modifiés')
+    parser.add_argument('--diff', nargs=2, metavar=('ANCIEN', 'NOUVEAU'),
+                       help='Comparer deux répertoires de configurations: sections, paramètres et flux ajoutés, '
+                            'supprimés ou modifiés')
+    parser.add_argument('--lint-perf', action='store_true',
+                       help='Signaler les réglages pénalisant le débit ou la latence (fichier ou --directory)')
+    parser.add_argument('--lint-rules', metavar='ID,...',
+                       help=f'Règles à appliquer avec --lint-perf (défaut: toutes, {", ".join(LINT_RULES)})')
+    parser.add_argument('--lint-fail-on', choices=LINT_SEVERITIES + ('never',), default='warning',
+                       help='Code de sortie 1 si un constat atteint cette sévérité (défaut: warning)')
+    parser.add_argument('--regex-cost', action='store_true',
+                       help='Classer les sections par coût des expressions régulières de leurs Exec et signaler '
+                            'les motifs sujets au retour arrière catastrophique (fichier ou --directory)')
+    parser.add_argument('--regex-sample', metavar='FICHIER',
+                       help=f'Événements de test pour --regex-cost, un par ligne ({REGEX_SAMPLE_MAX_LINES} au plus)')
+    parser.add_argument('--regex-timeout', type=float, default=REGEX_TIMEOUT, metavar='S',
+                       help=f'Délai de mesure par motif en secondes (défaut: {REGEX_TIMEOUT:g})')
+    parser.add_argument('--simulate', nargs='?', const='', metavar='PROFIL.json',
+                       help='Simuler files d\'attente, pertes et latences par route selon un profil de débits '
+                            '(fichier ou --directory)')
+    parser.add_argument('--sim-input', action='append', default=[], metavar='NOM=EPS',
+                       help=f'Débit d\'une entrée (nom, module ou motif) en événements/s '
+                            f'(défaut: {SIM_DEFAULT_INPUT_RATE:g})')
+    parser.add_argument('--sim-output', action='append', default=[], metavar='NOM=EPS[:LATENCE]',
+                       help=f'Débit et latence d\'une sortie (défaut: {SIM_DEFAULT_OUTPUT_RATE:g} '
+                            f'événements/s, {SIM_DEFAULT_OUTPUT_LATENCY:g} s)')
+    parser.add_argument('--sim-duration', type=float, metavar='S',
+                       help=f'Durée simulée en secondes (défaut: {SIM_DEFAULT_DURATION:g})')
+    parser.add_argument('--replay', metavar='ÉCHANTILLON.log',
+                       help='Rejouer les lignes d\'un journal dans le code Exec de chaque route: événements/s '
+                            'et instructions les plus coûteuses (fichier ou --directory)')
+    parser.add_argument('--replay-limit', type=int, default=REPLAY_MAX_LINES, metavar='N',
+                       help=f'Nombre maximal de lignes rejouées (défaut: {REPLAY_MAX_LINES})')
+    parser.add_argument('--network-links', action='store_true',
+                       help='Relier les sorties om_tcp/om_ssl/om_udp aux écoutes im_tcp/im_ssl/im_udp des autres '
+                            'fichiers et afficher le fan-in par port de collecteur (avec --directory)')
+    parser.add_argument('--sqlite', metavar='FICHIER.db',
+                       help='Exporter fichiers, sections, paramètres et flux dans une base SQLite indexée '
+                            '(mise à jour incrémentale; seule, sans affichage ni relecture des fichiers inchangés)')
     parser.add_argument('--csv-multiple', action='store_true', 
                        help='Créer des fichiers CSV séparés pour chaque configuration')
     parser.add_argument('--flows-csv', action='store_true', 
                        help='Inclure les flux dans les fichiers CSV multiples')
     parser.add_argument('--graphviz', action='store_true', 
                        help='Générer les fichiers Graphviz (.dot) pour visualisation')
+    parser.add_argument('--svg', action='store_true',
+                       help='Générer directement une image SVG par configuration (sans Graphviz, parallélisé avec --jobs)')
+    parser.add_argument('--synthesis-mode', choices=SYNTHESIS_MODES, default='auto',
+                       help='Vue de la cartographie de synthèse: full (toutes les sections), module (par type de '
+                            'module), topology (topologies identiques regroupées), auto (selon la taille du parc)')
+    parser.add_argument('--synthesis-max-edges', type=int, metavar='N',
+                       help=f'Liaisons affichées par cluster de la synthèse, 0 = sans limite '
+                            f'(défaut: {SYNTHESIS_AUTO_MAX_EDGES} si le mode auto agrège, sinon sans limite)')
+    parser.add_argument('--watch', action='store_true',
+                       help='Avec --directory, surveiller les fichiers et mettre à jour les exports à chaque modification')
+    parser.add_argument('--watch-interval', type=float, default=1.0, metavar='S',
+                       help='Intervalle de scrutation sans inotify en secondes (défaut: 1.0)')
+    parser.add_argument('--debounce', type=float, default=0.5, metavar='S',
+                       help='Délai de regroupement des modifications en secondes (défaut: 0.5)')
+    
+    bench = parser.add_argument_group('benchmark (configurations synthétiques)')
+    bench.add_argument('--benchmark', action='store_true',
+                       help='Mesurer le parsing, l\'analyse et les exports sur des configurations générées (rapport JSON)')
+    bench.add_argument('--bench-files', type=int, default=20, metavar='N', help='Nombre de fichiers générés (défaut: 20)')
+    bench.add_argument('--bench-sections', type=int, default=100, metavar='N', help='Sections par fichier (défaut: 100)')
+    bench.add_argument('--bench-params', type=int, default=5, metavar='N', help='Paramètres par section (défaut: 5)')
+    bench.add_argument('--bench-fanout', type=int, default=2, metavar='N',
+                       help='Entrées et sorties par route (défaut: 2)')
+    bench.add_argument('--bench-include-depth', type=int, default=1, metavar='N',
+                       help='Profondeur de la chaîne d\'inclusions (défaut: 1)')
+    bench.add_argument('--bench-comment-ratio', type=float, default=0.2, metavar='R',
+                       help='Proportion de lignes précédées d\'un commentaire (défaut: 0.2)')
+    bench.add_argument('--bench-repeat', type=int, default=1, metavar='N',
+                       help='Répétitions par étape, la meilleure est retenue (défaut: 1)')
+    bench.add_argument('--bench-seed', type=int, default=0, metavar='N', help='Graine du générateur (défaut: 0)')
+    bench.add_argument('--bench-dir', metavar='DIR', help='Conserver les fichiers générés dans ce répertoire')
+    bench.add_argument('--benchmark-output', metavar='FICHIER', help='Écrire aussi le rapport JSON dans ce fichier')
+    
+    profile = parser.add_argument_group('mesures')
+    profile.add_argument('--timings', action='store_true',
+                         help='Afficher en fin d\'exécution le temps mural/CPU et les compteurs de chaque étape')
+    profile.add_argument('--timings-json', metavar='FICHIER', help='Écrire les mesures par étape dans un fichier JSON')
+    profile.add_argument('--profile', metavar='FICHIER.pstats',
+                         help='Profiler l\'exécution avec cProfile et écrire les statistiques (implique --timings)')
     
     args = parser.parse_args()
     
+    TIMINGS.enabled = bool(args.timings or args.timings_json or args.profile)
+    profiler = cProfile.Profile() if args.profile else None
+    
+    status = 0
+    try:
+        if profiler:
+            profiler.enable()
+        with TIMINGS.stage('total'):
+            status = run_analysis(args, parser)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        if TIMINGS.enabled:
+            # La sortie standard reste réservée aux enregistrements en format jsonl
+            stream = sys.stderr if args.format == 'jsonl' or args.benchmark else sys.stdout
+            with contextlib.redirect_stdout(stream):
+                print()
+                display_timings(TIMINGS)
+                if profiler:
+                    print(f"Profil cProfile sauvegardé: {args.profile} (python -m pstats {args.profile})")
+            if args.timings_json:
+                with open(args.timings_json, 'w', encoding='utf-8') as f:
+                    json.dump(TIMINGS.snapshot(), f, indent=2, ensure_ascii=False)
+    if status:
+        sys.exit(status)
+
+def run_analysis(args, parser):
+    """
+    Exécute l'action demandée sur la ligne de commande et retourne le code de sortie
+    """
+    if args.benchmark:
+        report = run_benchmark(args.bench_files, args.bench_sections, args.bench_params, args.bench_fanout,
+                               args.bench_include_depth, args.bench_comment_ratio, args.bench_repeat,
+                               args.jobs, args.bench_seed, args.bench_dir)
+        report_json = json.dumps(report, indent=2, ensure_ascii=False)
+        if args.benchmark_output:
+            with open(args.benchmark_output, 'w', encoding='utf-8') as f:
+                f.write(report_json + '\n')
+        print(report_json)
+        return
+    
     if args.create_sample:
         create_sample_config()
         return
     
+    if args.query is not None:
+        if not args.directory and not args.index_file:
+            print("Erreur: --query nécessite --directory ou --index-file")
+            return 2
+        # Les messages passent sur la sortie d'erreur avec les formats JSON
+        info = sys.stderr if args.format in ('json', 'jsonl') else sys.stdout
+        index = QueryIndex.load(args.index_file, args.directory) if args.index_file else None
+        if index is None:
+            if not args.directory:
+                print(f"Erreur: index {args.index_file} introuvable ou illisible, précisez --directory")
+                return 2
+            index = QueryIndex(args.directory)
+        
+        cache = ParseCache(args.cache_dir, args.cache_max_size * 1024 * 1024) if args.cache_dir else None
+        with TIMINGS.stage('query_index_update'), contextlib.redirect_stdout(info):
+            parsed, removed = index.update(args.jobs or os.cpu_count() or 1, cache, args.mmap)
+        if cache:
+            cache.save()
+        if args.index_file and (parsed or removed):
+            index.save(args.index_file)
+        
+        start = time.perf_counter()
+        try:
+            with TIMINGS.stage('query'):
+                section_ids, flow_ids = index.query(args.query)
+        except ValueError as e:
+            print(f"Erreur: {e}")
+            return 2
+        elapsed = time.perf_counter() - start
+        
+        display_query_results(index, section_ids, flow_ids, args.format)
+        files = len(set(index.sections[section_id][0] for section_id in section_ids))
+        print(f"{len(section_ids)} section(s) dans {files} fichier(s), {len(flow_ids)} flux "
+              f"en {elapsed * 1000:.1f} ms (index: {parsed} fichier(s) analysé(s), {removed} retiré(s))", file=info)
+        return
+    
+    if args.diff:
+        old_dir, new_dir = args.diff
+        for path in args.diff:
+            if not os.path.isdir(path):
+                print(f"Erreur: Le répertoire {path} n'existe pas.")
+                return 2
+        info = sys.stderr if args.format in ('json', 'jsonl') else sys.stdout
+        cache = ParseCache(args.cache_dir, args.cache_max_size * 1024 * 1024) if args.cache_dir else None
+        with TIMINGS.stage('diff_trees'), contextlib.redirect_stdout(info):
+            changes, summary = diff_trees(old_dir, new_dir, args.jobs, cache, args.mmap)
+        if cache:
+            cache.save()
+        display_diff(changes, summary, args.format)
+        return
+    
+    if args.lint_perf:
+        target = args.directory or args.config_file
+        if not target or not os.path.exists(target):
+            print("Erreur: --lint-perf nécessite un fichier ou --directory existant")
+            return 2
+        info = sys.stderr if args.format in ('json', 'jsonl') else sys.stdout
+        cache = ParseCache(args.cache_dir, args.cache_max_size * 1024 * 1024) if args.cache_dir else None
+        rule_ids = [rule_id.strip() for rule_id in args.lint_rules.split(',') if rule_id.strip()] \
+            if args.lint_rules else None
+        try:
+            with TIMINGS.stage('lint_perf'), contextlib.redirect_stdout(info):
+                findings, summary = lint_files(list(iter_config_files(target)), args.jobs, cache, args.mmap,
+                                               rule_ids)
+        except ValueError as e:
+            print(f"Erreur: {e}")
+            return 2
+        if cache:
+            cache.save()
+        display_lint(findings, summary, args.format)
+        if args.lint_fail_on != 'never':
+            threshold = LINT_SEVERITIES.index(args.lint_fail_on)
+            if any(LINT_SEVERITIES.index(finding['severity']) >= threshold for finding in findings):
+                return 1
+        return 0
+    
+    if args.regex_cost:
+        target = args.directory or args.config_file
+        if not target or not os.path.exists(target):
+            print("Erreur: --regex-cost nécessite un fichier ou --directory existant")
+            return 2
+        samples = None
+        if args.regex_sample:
+            try:
+                with open(args.regex_sample, encoding='utf-8', errors='replace') as f:
+                    samples = [line.rstrip('\r\n') for line, _ in zip(f, range(REGEX_SAMPLE_MAX_LINES))]
+            except OSError as e:
+                print(f"Erreur: {e}")
+                return 2
+        info = sys.stderr if args.format in ('json', 'jsonl') else sys.stdout
+        cache = ParseCache(args.cache_dir, args.cache_max_size * 1024 * 1024) if args.cache_dir else None
+        with TIMINGS.stage('regex_cost'), contextlib.redirect_stdout(info):
+            sections, patterns, summary = analyze_regex_costs(list(iter_config_files(target)), args.jobs, cache,
+                                                              args.mmap, samples, args.regex_timeout)
+        if cache:
+            cache.save()
+        display_regex_costs(sections, patterns, summary, args.format)
+        return 0
+    
+    if args.simulate is not None:
+        target = args.directory or args.config_file
+        if not target or not os.path.exists(target):
+            print("Erreur: --simulate nécessite un fichier ou --directory existant")
+            return 2
+        try:
+            profile = load_simulation_profile(args.simulate or None, args.sim_input, args.sim_output,
+                                              args.sim_duration)
+        except (OSError, ValueError) as e:
+            print(f"Erreur: {e}")
+            return 2
+        info = sys.stderr if args.format in ('json', 'jsonl') else sys.stdout
+        cache = ParseCache(args.cache_dir, args.cache_max_size * 1024 * 1024) if args.cache_dir else None
+        try:
+            with contextlib.redirect_stdout(info):
+                reports = simulate_files(list(iter_config_files(target)), profile, args.jobs, cache, args.mmap)
+        except KeyError as e:
+            print(f"Erreur dans le profil de simulation: clé {e} manquante")
+            return 2
+        except (TypeError, ValueError) as e:
+            print(f"Erreur dans le profil de simulation: {e}")
+            return 2
+        if cache:
+            cache.save()
+        display_simulation(reports, args.format)
+        return 0
+    
+    if args.replay:
+        target = args.directory or args.config_file
+        if not target or not os.path.exists(target):
+            print("Erreur: --replay nécessite un fichier ou --directory existant")
+            return 2
+        try:
+            with open(args.replay, encoding='utf-8', errors='replace') as f:
+                lines = [line.rstrip('\r\n') for line, _ in zip(f, range(args.replay_limit))]
+        except OSError as e:
+            print(f"Erreur: {e}")
+            return 2
+        if not lines:
+            print(f"Erreur: aucune ligne dans {args.replay}")
+            return 2
+        info = sys.stderr if args.format in ('json', 'jsonl') else sys.stdout
+        cache = ParseCache(args.cache_dir, args.cache_max_size * 1024 * 1024) if args.cache_dir else None
+        with contextlib.redirect_stdout(info):
+            reports = replay_files(list(iter_config_files(target)), lines, args.jobs, cache, args.mmap)
+        if cache:
+            cache.save()
+        display_replay(reports, args.format)
+        print(f"{len(reports)} route(s) rejouée(s) avec {len(lines)} ligne(s) de {args.replay}", file=info)
+        return 0
+    
+    if args.network_links:
+        target = args.directory or args.config_file
+        if not target or not os.path.exists(target):
+            print("Erreur: --network-links nécessite --directory ou un fichier existant")
+            return 2
+        info = sys.stderr if args.format in ('json', 'jsonl') else sys.stdout
+        if args.graphviz:
+            print("Avertissement: --graphviz est ignoré avec --network-links; les liaisons réseau sont "
+                  "tracées dans la cartographie de synthèse de --directory ... --graphviz", file=info)
+        cache = ParseCache(args.cache_dir, args.cache_max_size * 1024 * 1024) if args.cache_dir else None
+        with contextlib.redirect_stdout(info):
+            links, fan_in, unmatched = link_network_files(list(iter_config_files(target)), args.jobs, cache,
+                                                          args.mmap)
+        if cache:
+            cache.save()
+        display_network_links(links, fan_in, unmatched, args.format)
+        return 0
+    
     if args.directory:
-        all_configs = process_directory(args.directory, args.stats, args.flows, args.format)
+        cache = ParseCache(args.cache_dir, args.cache_max_size * 1024 * 1024) if args.cache_dir else None
+        # En jsonl, stdout ne reçoit que les enregistrements: messages d'état sur stderr
+        info = sys.stderr if args.format == 'jsonl' else sys.stdout
+        
+        if (args.sqlite and args.format == 'table' and os.path.isdir(args.directory)
+                and not (args.excel_file or args.csv_multiple or args.graphviz or args.svg or args.watch
+                         or args.stats or args.flows)):
+            # Base SQLite seule: pas d'affichage, les fichiers inchangés ne sont pas relus
+            sqlite_exporter = SqliteExporter(args.sqlite)
+            with TIMINGS.stage('export_sqlite'):
+                parsed = sqlite_exporter.update(args.directory, args.jobs or os.cpu_count() or 1, cache, args.mmap)
+                sqlite_exporter.save(args.directory)
+            if cache:
+                cache.save()
+                print(f"Cache de parsing: {cache.hits} fichier(s) réutilisé(s), {cache.misses} analysé(s)")
+            print(f"{parsed} fichier(s) analysé(s)")
+            return
+        
+        # Le rapport Excel est écrit au fil de l'analyse, sans conserver les résultats
+        excel_writer = None
+        if args.excel_file:
+            if OPENPYXL_AVAILABLE:
+                excel_writer = ExcelReportWriter(args.excel_file)
+            else:
+                print("Erreur: openpyxl n'est pas disponible. Installez-le avec: pip install openpyxl", file=info)
+        
+        sqlite_exporter = SqliteExporter(args.sqlite) if args.sqlite else None
+        exporters = [exporter.add for exporter in (excel_writer, sqlite_exporter) if exporter]
         
-        if args.excel_file and all_configs:
-            save_to_excel(all_configs, args.excel_file)
+        def export_config(config_file, config_data, flow_data):
+            for add in exporters:
+                add(config_file, config_data, flow_data)
         
-        if args.csv_multiple and all_configs:
-            save_multiple_csv(all_configs, args.flows_csv)
+        collect = bool(args.csv_multiple or args.graphviz or args.svg or args.watch)
+        all_configs = process_directory(args.directory, args.stats, args.flows, args.format, args.jobs, cache,
+                                        collect=collect, on_config=export_config if exporters else None,
+                                        use_mmap=args.mmap)
         
-        if args.graphviz and all_configs:
-            generate_graphviz_files(all_configs)
+        with contextlib.redirect_stdout(info):
+            if cache:
+                cache.save()
+                print(f"\nCache de parsing: {cache.hits} fichier(s) réutilisé(s), {cache.misses} analysé(s)")
+            
+            if excel_writer and excel_writer.stats_rows:
+                excel_writer.save()
+            
+            if sqlite_exporter:
+                with TIMINGS.stage('export_sqlite'):
+                    sqlite_exporter.save(args.directory)
+            
+            if args.csv_multiple and all_configs:
+                with TIMINGS.stage('save_multiple_csv'):
+                    save_multiple_csv(all_configs, args.flows_csv, base_dir=args.directory)
+            
+            if args.graphviz and all_configs:
+                with TIMINGS.stage('generate_graphviz_files'):
+                    generate_graphviz_files(all_configs, synthesis_mode=args.synthesis_mode,
+                                            synthesis_max_edges=args.synthesis_max_edges, base_dir=args.directory)
+            
+            if args.svg and all_configs:
+                with TIMINGS.stage('render_svg_files'):
+                    render_svg_files(all_configs, jobs=args.jobs, base_dir=args.directory)
+            
+            if args.watch:
+                watch_directory(args.directory, all_configs, args.jobs, cache, args.excel_file, args.csv_multiple,
+                                args.flows_csv, args.graphviz, args.watch_interval, args.debounce, args.mmap,
+                                args.synthesis_mode, args.synthesis_max_edges, args.svg, args.sqlite)
         
         return
     
@@ -1213,25 +7149,35 @@ Exemples d'utilisation:
         print(f"Erreur: Le fichier {args.config_file} n'existe pas.")
         return
     
+    if args.format == 'jsonl':
+        with contextlib.redirect_stdout(sys.stderr):
+            config_data, flow_data = parse_nxlog_config(args.config_file, args.mmap)
+        with TIMINGS.stage('write_jsonl_records'):
+            write_jsonl_records(args.config_file, config_data, flow_data, args.stats, args.flows)
+        return
+    
     print(f"Analyse du fichier: {args.config_file}")
     print("=" * 50)
     
-    config_data, flow_data = parse_nxlog_config(args.config_file)
+    config_data, flow_data = parse_nxlog_config(args.config_file, args.mmap)
     
     if not config_data:
         print("Aucune configuration trouvée dans le fichier.")
         return
     
-    display_config_table(config_data, args.format)
+    with TIMINGS.stage('display_config_table'):
+        display_config_table(config_data, args.format)
     
     if args.stats:
         print()
-        display_statistics(config_data)
+        with TIMINGS.stage('display_statistics'):
+            display_statistics(config_data)
     
     if args.flows:
         print()
         config_name = os.path.basename(args.config_file).replace('.conf', '')
-        display_flow_mapping(flow_data, config_name)
+        with TIMINGS.stage('display_flow_mapping'):
+            display_flow_mapping(flow_data, config_name)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file